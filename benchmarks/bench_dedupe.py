@@ -0,0 +1,63 @@
+# Scaling benchmark for catalogue deduplication.
+# It builds a synthetic catalogue where some songs appear again as remasters, live versions,
+# songs with a featured artist or with a typo, then runs dedupe.assign_canonical_ids with
+# 1, 2, 4, ... worker processes (up to the number of cores) and reports the speedup.
+#
+# Usage: python benchmarks/bench_dedupe.py [song_count] [max_workers]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.dedupe import assign_canonical_ids
+from playlist_manager.song import Song
+
+WORDS = ["love", "night", "stay", "blue", "heart", "fire", "dream", "light", "summer", "road",
+         "rain", "gold", "wild", "home", "river", "star", "dance", "ghost", "city", "sky"]
+VERSIONS = [" (Remastered)", " - 2011 Remaster", " (Live)", " (feat. Guest)", " [Radio Edit]"]
+
+
+def catalogue(count, seed=0):
+    """Returns `count` songs, about one in ten of them another version of an earlier song."""
+    rng = random.Random(seed)
+    songs = []
+    for i in range(count):
+        if songs and rng.random() < 0.1:
+            original = songs[rng.randrange(len(songs))]
+            title = original.title
+            if rng.random() < 0.5:
+                title += rng.choice(VERSIONS)
+            else:
+                # A typo: drop one letter.
+                cut = rng.randrange(len(title))
+                title = title[:cut] + title[cut + 1:]
+            songs.append(Song(title, original.artist))
+        else:
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) + f" {i}"
+            songs.append(Song(title.title(), f"Artist {rng.randrange(count // 20 + 1)}"))
+    return songs
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    songs = catalogue(count)
+    print(f"Deduplicating {count} songs ({os.cpu_count()} cores)")
+
+    workers = 1
+    single = None
+    while workers <= max_workers:
+        start = time.perf_counter()
+        groups = assign_canonical_ids(songs, workers)
+        seconds = time.perf_counter() - start
+        single = single or seconds
+        print(f"{workers:>3} workers: {seconds:8.2f} s ({count / seconds:9.0f} songs/sec), "
+              f"{len(groups)} groups, speedup {single / seconds:.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
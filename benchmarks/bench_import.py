@@ -0,0 +1,47 @@
+# Throughput benchmark for the bulk importer.
+# It writes a synthetic CSV catalogue (with some duplicate rows) and imports it into an
+# empty library, reporting rows per second and the peak memory of the process.
+#
+# Usage: python benchmarks/bench_import.py [rows]
+
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.importer import read_catalogue, bulk_import
+
+
+def write_catalogue(path, rows):
+    """Writes a CSV catalogue where roughly one row in ten repeats an earlier song."""
+    rng = random.Random(3)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("title,artist\n")
+        for i in range(rows):
+            n = rng.randrange(i) if i and rng.random() < 0.1 else i
+            f.write(f"Song {n},Artist {n % 20000}\n")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalogue.csv")
+        write_catalogue(path, rows)
+
+        library = []
+        start = time.perf_counter()
+        imported, skipped = bulk_import(read_catalogue(path), library)
+        elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Rows: {rows}, imported: {imported}, skipped: {skipped}")
+    print(f"Throughput: {rows / elapsed:.0f} rows/sec ({elapsed:.2f} s)")
+    print(f"Peak memory: {peak:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
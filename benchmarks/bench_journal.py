@@ -0,0 +1,71 @@
+# Benchmark for the crash-recovery journal.
+# It runs a scripted command session with no journal, with the journal syncing to disk in groups,
+# and with the journal syncing after every command, and reports the cost per command.
+# Then it "crashes" sessions of different lengths and times recovering them, to show that
+# recovery depends on the snapshot interval rather than on the length of the session.
+#
+# Usage: python benchmarks/bench_journal.py [library_size] [commands] [snapshot_every]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from playlist_manager.commands import run_batch
+from playlist_manager.journal import Journal
+from playlist_manager.app import MusicManager
+import workloads
+
+
+def new_manager(songs, journal_dir=None, snapshot_every=10000, sync_every=64):
+    """Returns a MusicManager over the given songs, journaling to journal_dir if given."""
+    manager = MusicManager()
+    manager.song_library = songs
+    if journal_dir:
+        manager.journal = Journal(manager, journal_dir, snapshot_every, sync_every)
+        manager.journal.start()
+    return manager
+
+
+def main():
+    library_size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    snapshot_every = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+    songs = workloads.synthetic_songs(library_size)
+    script = workloads.session_script(library_size, count)
+    directory = tempfile.mkdtemp(prefix="journal-bench-")
+
+    print(f"{count} commands over a library of {library_size} songs")
+    plain = None
+    for name, journal_dir, sync_every in [("No journal", None, 0),
+                                          ("Group sync (64)", directory, 64),
+                                          ("Sync every command", directory, 1)]:
+        shutil.rmtree(directory, ignore_errors=True)
+        manager = new_manager(songs, journal_dir, snapshot_every, sync_every)
+        ran, failed, seconds = run_batch(manager.commands, script)
+        plain = plain or seconds
+        print(f"{name:>20}: {seconds / ran * 1e6:8.1f} us/command (+{(seconds - plain) / ran * 1e6:7.1f} us)")
+        if manager.journal:
+            manager.journal.close()
+
+    print(f"Recovery with a snapshot every {snapshot_every} commands:")
+    for length in (count // 4, count // 2, count):
+        shutil.rmtree(directory, ignore_errors=True)
+        manager = new_manager(songs, directory, snapshot_every)
+        run_batch(manager.commands, script[:length])
+        # Crash: the journal is left as it is, without a final snapshot.
+        manager.journal.close()
+        start = time.perf_counter()
+        recovered = new_manager(songs)
+        replayed = Journal(recovered, directory).recover()
+        print(f"  after {length:>7} commands: {time.perf_counter() - start:8.3f} s ({replayed} replayed)")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Benchmark for time-decayed party votes.
+# It compares the half-life and sliding-window scoring in priority_queue.py with the naive way
+# of decaying votes: multiply every song's score on each tick and rebuild the heap.
+# Votes follow a Zipf distribution and the clock moves forward one tick every `votes_per_tick` votes.
+#
+# Usage: python benchmarks/bench_party_decay.py [queue_size] [votes] [votes_per_tick]
+
+import heapq
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from playlist_manager.song import Song
+from playlist_manager.priority_queue import PartyModeQueue
+from workloads import zipf_votes
+
+
+class RescanDecayQueue:
+    """Decays every score on each tick and heapifies the whole queue again."""
+
+    def __init__(self, half_life):
+        self.factor = 0.5 ** (1 / half_life)
+        self.scores = {}
+        self.queue = []
+
+    def enqueue(self, song):
+        self.scores[song.title] = 0.0
+
+    def tick(self):
+        for title in self.scores:
+            self.scores[title] *= self.factor
+        self.queue = [(-score, title) for title, score in self.scores.items()]
+        heapq.heapify(self.queue)
+
+    def upvote_song(self, title):
+        self.scores[title] += 1
+
+
+def run(queue, titles, votes, per_tick, clock):
+    """Enqueues every title, then fires the votes, ticking the clock as it goes.
+    Returns the seconds spent voting."""
+    for title in titles:
+        queue.enqueue(Song(title, "Artist"))
+    start = time.perf_counter()
+    for i, title in enumerate(votes):
+        if i % per_tick == 0:
+            clock[0] += 1
+            if isinstance(queue, RescanDecayQueue):
+                queue.tick()
+        queue.upvote_song(title)
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    vote_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    per_tick = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    titles = [f"Song {i}" for i in range(size)]
+    votes = zipf_votes(titles, vote_count, seed=42)
+
+    print(f"Queue size: {size}, votes: {vote_count}, votes per tick: {per_tick}")
+    for name, make in [("Half-life (log offset)", lambda clock: PartyModeQueue(False, half_life=60, clock=lambda: clock[0])),
+                       ("Sliding window", lambda clock: PartyModeQueue(False, window=60, clock=lambda: clock[0])),
+                       ("Rescan every tick", lambda clock: RescanDecayQueue(60))]:
+        clock = [0.0]
+        seconds = run(make(clock), titles, votes, per_tick, clock)
+        print(f"{name:>22}: {vote_count / seconds:12.0f} votes/sec")
+
+
+if __name__ == "__main__":
+    main()
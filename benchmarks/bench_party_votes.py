@@ -0,0 +1,75 @@
+# Vote-storm benchmark for the party mode queue.
+# It compares the indexed heap in priority_queue.py with the old approach,
+# which rebuilt the whole heap on every upvote.
+#
+# Usage: python benchmarks/bench_party_votes.py [queue_size] [votes]
+
+import contextlib
+import heapq
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.song import Song
+from playlist_manager.priority_queue import PartyModeQueue
+
+
+class RebuildPartyQueue:
+    """The original upvote strategy: copy the heap and push every entry again."""
+
+    def __init__(self):
+        self.queue = []
+        self.song_map = {}
+        self.counter = 0
+
+    def enqueue(self, song):
+        self.song_map[song.title] = song
+        heapq.heappush(self.queue, (-song.upvotes, self.counter, song))
+        self.counter += 1
+
+    def upvote_song(self, song_title):
+        song = self.song_map[song_title]
+        song.upvotes += 1
+        temp_list = list(self.queue)
+        self.queue = []
+        for priority, order, s in temp_list:
+            if s.title == song_title:
+                heapq.heappush(self.queue, (-s.upvotes, order, s))
+            else:
+                heapq.heappush(self.queue, (priority, order, s))
+
+
+def run_storm(queue, titles, votes):
+    """Enqueues every title, then fires the given votes. Returns the seconds spent voting."""
+    for title in titles:
+        queue.enqueue(Song(title, "Artist"))
+    start = time.perf_counter()
+    for title in votes:
+        queue.upvote_song(title)
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    vote_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(42)
+    titles = [f"Song {i}" for i in range(size)]
+    votes = [rng.choice(titles) for _ in range(vote_count)]
+
+    # The queue prints a line per vote, so send that output nowhere.
+    with contextlib.redirect_stdout(io.StringIO()):
+        indexed = run_storm(PartyModeQueue(), titles, votes)
+        rebuild = run_storm(RebuildPartyQueue(), titles, votes)
+
+    print(f"Queue size: {size}, votes: {vote_count}")
+    print(f"Indexed heap: {vote_count / indexed:12.0f} votes/sec")
+    print(f"Heap rebuild: {vote_count / rebuild:12.0f} votes/sec")
+    print(f"Speedup:      {rebuild / indexed:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Benchmark for the title index in DoublyLinkedList.
+# It measures add and remove throughput at several playlist sizes, with the
+# indexed playlist and with the old approach of walking the list to find a title.
+#
+# Usage: python benchmarks/bench_playlist_index.py [size ...]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.song import Song
+from playlist_manager.doubly_linked_list import DoublyLinkedList, Node
+
+
+class ScanPlaylist:
+    """The original playlist: no index, so removing a title walks the list."""
+
+    def __init__(self):
+        self.head = None
+        self.tail = None
+        self.size = 0
+
+    def add_song(self, song):
+        new_node = Node(song)
+        if not self.head:
+            self.head = new_node
+        else:
+            self.tail.next = new_node
+            new_node.prev = self.tail
+        self.tail = new_node
+        self.size += 1
+
+    def remove_song(self, song_title):
+        temp = self.head
+        while temp:
+            if temp.song.title.lower() == song_title.lower():
+                if temp.prev:
+                    temp.prev.next = temp.next
+                else:
+                    self.head = temp.next
+                if temp.next:
+                    temp.next.prev = temp.prev
+                else:
+                    self.tail = temp.prev
+                self.size -= 1
+                return True
+            temp = temp.next
+        return False
+
+
+def measure(playlist_class, songs, removals):
+    """Returns (adds per second, removes per second) for one playlist class."""
+    playlist = playlist_class()
+    start = time.perf_counter()
+    for song in songs:
+        playlist.add_song(song)
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for title in removals:
+        playlist.remove_song(title)
+    remove_time = time.perf_counter() - start
+    return len(songs) / add_time, len(removals) / remove_time
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    rng = random.Random(7)
+    print(f"{'size':>8} {'adds/s (index)':>15} {'adds/s (scan)':>14} "
+          f"{'removes/s (index)':>18} {'removes/s (scan)':>17}")
+    for size in sizes:
+        songs = [Song(f"Song {i}", f"Artist {i % 500}") for i in range(size)]
+        # Removing from a scanned list is slow, so only time a small sample.
+        removals = [song.title for song in rng.sample(songs, min(size, 200))]
+        indexed_add, indexed_remove = measure(DoublyLinkedList, songs, removals)
+        scan_add, scan_remove = measure(ScanPlaylist, songs, removals)
+        print(f"{size:>8} {indexed_add:>15.0f} {scan_add:>14.0f} "
+              f"{indexed_remove:>18.0f} {scan_remove:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
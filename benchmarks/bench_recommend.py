@@ -0,0 +1,65 @@
+# Benchmark for the autoplay recommender.
+# It plays a long Zipf-distributed listening history over a large catalogue (popular songs are
+# played far more often, like in real listening data), then times how fast plays are learned and
+# how long suggest() takes for the top K, both right after the rows changed (the neighbour list is
+# worked out again) and with the neighbour lists precomputed.
+#
+# Usage: python benchmarks/bench_recommend.py [catalogue_size] [plays] [k]
+
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from playlist_manager.recommend import Recommender
+from workloads import synthetic_songs, zipf_votes
+
+
+def latencies(recommender, songs, k):
+    """Returns the milliseconds suggest() took for each song."""
+    times = []
+    for song in songs:
+        start = time.perf_counter()
+        recommender.suggest(song, k)
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+
+def report(name, times):
+    p50 = times[len(times) // 2]
+    p99 = times[min(len(times) - 1, len(times) * 99 // 100)]
+    print(f"{name:>28}: p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {times[-1]:.3f} ms")
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    play_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    songs = synthetic_songs(size)
+    by_title = {song.title: song for song in songs}
+    plays = [by_title[title] for title in zipf_votes(list(by_title), play_count, seed=42)]
+
+    print(f"Catalogue: {size} songs, plays: {play_count}, k: {k}")
+    by_key = {(song.title, song.artist): song for song in songs}
+    recommender = Recommender(lambda title, artist: by_key.get((title, artist)))
+    start = time.perf_counter()
+    recommender.learn_history(plays)
+    seconds = time.perf_counter() - start
+    entries = sum(len(targets) for targets, weights, positions in recommender.rows.values())
+    print(f"{'Learning':>28}: {play_count / seconds:12.0f} plays/sec "
+          f"({len(recommender.rows)} rows, {entries} links)")
+
+    # The most played songs have the longest rows, so they are the slowest to suggest from.
+    sample = [by_key[recommender.keys[song_id]] for song_id, count in recommender.play_counts.most_common(1000)]
+    report("suggest, after a change", latencies(recommender, sample, k))
+    start = time.perf_counter()
+    recommender.precompute()
+    print(f"{'precompute':>28}: {time.perf_counter() - start:.2f} s")
+    report("suggest, precomputed", latencies(recommender, sample, k))
+
+
+if __name__ == "__main__":
+    main()
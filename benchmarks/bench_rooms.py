@@ -0,0 +1,46 @@
+# Memory benchmark for rooms.
+# It builds a song library, then many rooms whose playlists and party queues hold songs from it,
+# and uses tracemalloc to measure how much memory the rooms take per song reference.
+# Songs are shared with the library, so this should stay close to the cost of one list node.
+#
+# Usage: python benchmarks/bench_rooms.py [library_size] [room_count] [songs_per_room]
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.rooms import RoomRegistry
+from playlist_manager.song import Song
+
+
+def main():
+    library_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    room_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    songs_per_room = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    rng = random.Random(1)
+
+    library = [Song(f"Song {i}", f"Artist {i % 5000}") for i in range(library_size)]
+    print(f"Library of {library_size} songs, {room_count} rooms with {songs_per_room} songs each")
+
+    tracemalloc.start()
+    registry = RoomRegistry()
+    empty = tracemalloc.get_traced_memory()[0]
+    for r in range(room_count):
+        room = registry.create(f"room {r}")
+        songs = [library[rng.randrange(library_size)] for _ in range(songs_per_room)]
+        room.playlist.add_songs(songs)
+        for song in songs[:songs_per_room // 4]:
+            room.party_queue.enqueue(song)
+    rooms_size = tracemalloc.get_traced_memory()[0] - empty
+    tracemalloc.stop()
+
+    references = room_count * (songs_per_room + songs_per_room // 4)
+    print(f"Rooms: {rooms_size / 2**20:8.1f} MiB ({rooms_size / room_count:8.1f} bytes/room)")
+    print(f"       {rooms_size / references:8.1f} bytes per song reference (including each room's own structures)")
+
+
+if __name__ == "__main__":
+    main()
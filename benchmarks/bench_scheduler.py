@@ -0,0 +1,66 @@
+# Benchmark for the PlaybackScheduler pick loop.
+# It drives the scheduler without any menu or printing, over sources that never run dry,
+# and reports how many "next" calls it can make per second.
+#
+# Usage: python benchmarks/bench_scheduler.py [calls]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.song import Song
+from playlist_manager.scheduler import PlaybackScheduler
+
+
+class EndlessSource:
+    """A source that always has a song, so only the scheduler's own work is measured.
+    Every `gap` calls to is_empty() it reports being empty once, to exercise the fallback path."""
+
+    def __init__(self, name, gap=0):
+        self.name = name
+        self.song = Song(name, "Benchmark")
+        self.gap = gap
+        self.calls = 0
+
+    def is_empty(self):
+        self.calls += 1
+        return bool(self.gap) and self.calls % self.gap == 0
+
+    def take(self):
+        return self.song
+
+    def peek(self, n):
+        return [self.song] * n
+
+
+def run(scheduler, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        scheduler.next()
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    def sources():
+        return [EndlessSource("party", gap=3), EndlessSource("play_next", gap=2), EndlessSource("playlist")]
+
+    strict = PlaybackScheduler(sources())
+    weighted = PlaybackScheduler(sources(), weights={"party": 1, "play_next": 1, "playlist": 3})
+    listened = PlaybackScheduler(sources(), weights={"party": 1, "playlist": 3})
+    played = []
+    listened.subscribe(lambda song, source: played.append(song))
+    prefetching = PlaybackScheduler(sources(), weights={"party": 1, "playlist": 3}, prefetch=5)
+
+    print(f"{calls} next() calls per scheduler:")
+    print(f"strict priority:      {run(strict, calls):12.0f} calls/sec")
+    print(f"weighted:             {run(weighted, calls):12.0f} calls/sec")
+    print(f"weighted + listener:  {run(listened, calls):12.0f} calls/sec")
+    print(f"weighted + prefetch:  {run(prefetching, calls // 10):12.0f} calls/sec")
+
+
+if __name__ == "__main__":
+    main()
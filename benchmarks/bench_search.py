@@ -0,0 +1,58 @@
+# Benchmark for the song search index.
+# It builds a SongSearch over a synthetic library and times autocomplete, substring and fuzzy queries.
+#
+# Usage: python benchmarks/bench_search.py [song_count]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.song import Song
+from playlist_manager.search import SongSearch
+
+WORDS = ("love night stay blue world dance heart fire rain time light dream summer "
+         "river golden neon echo shadow paper ocean wild silver city star").split()
+
+
+def synthetic_songs(count, seed=11):
+    rng = random.Random(seed)
+    for i in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).title()
+        yield Song(f"{title} {i}", f"Artist {rng.randrange(count // 20 + 1)}")
+
+
+def time_queries(finder, queries, repeat=20):
+    """Returns the average milliseconds per query."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            finder(query, 10)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(queries))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    songs = list(synthetic_songs(count))
+    search = SongSearch(songs)
+    start = time.perf_counter()
+    search.update()
+    # The first text search builds the trie and trigram index.
+    search.autocomplete("", 1)
+    build = time.perf_counter() - start
+    print(f"Indexed {count} songs in {build:.1f} s ({count / build:.0f} songs/sec)")
+
+    rng = random.Random(5)
+    picks = [songs[rng.randrange(count)] for _ in range(50)]
+    prefixes = [song.title[:rng.randint(2, 8)] for song in picks]
+    substrings = [song.title[-7:] for song in picks]
+    typos = [song.title[:-3].replace("e", "a", 1) for song in picks]
+    print(f"autocomplete: {time_queries(search.autocomplete, prefixes):.3f} ms/query")
+    print(f"substring:    {time_queries(search.substring, substrings):.3f} ms/query")
+    print(f"fuzzy:        {time_queries(search.fuzzy, typos, repeat=2):.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Memory benchmark for song storage.
+# It uses tracemalloc to measure how much memory a catalogue of songs takes when stored as
+# Song objects with __slots__, as the old dict-based Song objects, and in a SongStore.
+#
+# Usage: python benchmarks/bench_song_memory.py [song_count]
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.song import Song
+from playlist_manager.song_store import SongStore
+
+
+class DictSong:
+    """The original Song: a plain object with a per-instance __dict__ and no artist sharing."""
+
+    def __init__(self, title, artist):
+        self.title = title
+        self.artist = artist
+        self.upvotes = 0
+
+
+def catalogue(count):
+    """Yields (title, artist) pairs. Every artist string is a new object, like rows read from a file."""
+    for i in range(count):
+        yield f"Song {i}", "".join(["Artist ", str(i % 5000)])
+
+
+def measure(build, count):
+    """Returns the bytes still allocated after building a catalogue of songs."""
+    tracemalloc.start()
+    songs = build(count)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del songs
+    return size
+
+
+def build_dict_songs(count):
+    return [DictSong(title, artist) for title, artist in catalogue(count)]
+
+
+def build_slotted_songs(count):
+    return [Song(title, artist) for title, artist in catalogue(count)]
+
+
+def build_song_store(count):
+    store = SongStore()
+    for title, artist in catalogue(count):
+        store.add(title, artist)
+    return store
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print(f"Memory for {count} songs:")
+    for name, build in [("dict Song", build_dict_songs),
+                        ("slotted Song", build_slotted_songs),
+                        ("SongStore", build_song_store)]:
+        size = measure(build, count)
+        print(f"{name:>13}: {size / 2**20:8.1f} MiB ({size / count:6.1f} bytes/song)")
+
+
+if __name__ == "__main__":
+    main()
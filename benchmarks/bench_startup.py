@@ -0,0 +1,102 @@
+# Startup benchmark: how long `python main.py` takes from launch to its first menu prompt.
+# It starts the application in a fresh interpreter several times (choosing Exit at the prompt),
+# then runs it once more with -X importtime and shows which imports the time went to.
+#
+# It fails (exit status 1) if the fastest start is over the budget, or if a module that should
+# only be imported when it is used (the party server, search, persistence, ...) was imported
+# on the way to the first prompt.
+#
+# Usage: python benchmarks/bench_startup.py [--runs N] [--budget-ms MS] [--top N]
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(REPO_DIR, "main.py")
+
+# Modules that starting the menu must not import
+LAZY_MODULES = [
+    "playlist_manager.party_server",
+    "playlist_manager.search",
+    "playlist_manager.persistence",
+    "playlist_manager.journal",
+    "playlist_manager.importer",
+    "playlist_manager.dedupe",
+    "asyncio",
+    "concurrent.futures",
+    "multiprocessing",
+]
+
+
+def start(*options):
+    """Starts the menu, chooses Exit and returns (seconds taken, standard error)."""
+    begin = time.perf_counter()
+    process = subprocess.run([sys.executable, *options, MAIN], input="16\n", cwd=REPO_DIR,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return time.perf_counter() - begin, process.stderr
+
+
+def empty_interpreter():
+    """Returns the seconds an interpreter that does nothing takes to start and exit."""
+    begin = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - begin
+
+
+def parse_importtime(stderr):
+    """Returns (self microseconds, cumulative microseconds, module) for every import in -X importtime output.
+    The cumulative time includes the modules it imported."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(own), int(cumulative), name.strip()))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Music Playlist Manager startup benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="starts to time; the fastest one counts")
+    parser.add_argument("--budget-ms", type=float, default=150,
+                        help="the most the fastest start may take, in milliseconds (default 150)")
+    parser.add_argument("--top", type=int, default=10, help="how many of the slowest imports to show")
+    args = parser.parse_args()
+
+    # The first start compiles the bytecode caches, so it isn't timed.
+    start()
+    times = sorted(start()[0] for _ in range(args.runs))
+    baseline = min(empty_interpreter() for _ in range(args.runs))
+    best = times[0] * 1000
+    print(f"Start to first prompt: best {best:.1f} ms, median {times[len(times) // 2] * 1000:.1f} ms "
+          f"({args.runs} runs; an empty interpreter takes {baseline * 1000:.1f} ms)")
+
+    imports = parse_importtime(start("-X", "importtime")[1])
+    total = sum(own for own, cumulative, name in imports)
+    package = sum(own for own, cumulative, name in imports if name.startswith("playlist_manager"))
+    print(f"Imports: {len(imports)} modules, {total / 1000:.1f} ms "
+          f"({package / 1000:.1f} ms in playlist_manager itself, -X importtime adds some overhead)")
+    print("\nSlowest imports (including what they import):")
+    for own, cumulative, name in sorted(imports, key=lambda entry: entry[1], reverse=True)[:args.top]:
+        print(f"{name:>40}: {cumulative / 1000:7.1f} ms (itself {own / 1000:.1f} ms)")
+
+    failures = []
+    loaded = {name for own, cumulative, name in imports}
+    for module in LAZY_MODULES:
+        if module in loaded:
+            failures.append(f"{module} was imported before the first prompt")
+    if best > args.budget_ms:
+        failures.append(f"the fastest start took {best:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAILED: {failure}")
+        sys.exit(1)
+    print(f"\nWithin the {args.budget_ms:.0f} ms budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Benchmark for the windowed views.
+# It compares showing the top 20 of a large party mode queue by walking the heap (top) with
+# sorting the whole heap, and showing the songs around the current one in a large playlist
+# (window) with listing the whole playlist.
+#
+# Usage: python benchmarks/bench_views.py [size] [k]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.doubly_linked_list import DoublyLinkedList
+from playlist_manager.priority_queue import PartyModeQueue
+from playlist_manager.song import Song
+
+
+def timed(function, repeat=5):
+    """Returns the best time of several calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = random.Random(42)
+    songs = [Song(f"Song {i}", "Artist") for i in range(size)]
+
+    party = PartyModeQueue(verbose=False)
+    for song in songs:
+        party.enqueue(song, upvotes=rng.randrange(1000))
+    playlist = DoublyLinkedList()
+    playlist.add_songs(songs)
+    for _ in range(size // 2):
+        playlist.get_next()
+
+    print(f"{size} songs, showing {k}")
+    top = timed(lambda: list(party.top(k)))
+    full = timed(lambda: party.ranked()[:k])
+    print(f"Party top {k}:      {top * 1000:10.3f} ms (full sort: {full * 1000:10.3f} ms, {full / top:8.0f}x)")
+    window = timed(lambda: list(playlist.window(k // 2, k // 2)))
+    listing = timed(lambda: list(playlist._nodes()), repeat=1)
+    print(f"Playlist window:   {window * 1000:10.3f} ms (whole list: {listing * 1000:10.3f} ms, {listing / window:8.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
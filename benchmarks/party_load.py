@@ -0,0 +1,76 @@
+# Load generator for the party mode server.
+# Start a server first (python main.py --serve), then run this script. It opens many guest
+# connections that upvote songs as fast as they can, and reports votes/sec and latency percentiles.
+#
+# Usage: python benchmarks/party_load.py [--address HOST:PORT] [--guests N] [--seconds S]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playlist_manager.app import MusicManager
+
+
+async def request(reader, writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def guest(host, port, titles, deadline, latencies, seed):
+    """One guest: upvotes random songs until the deadline, recording the latency of every vote."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await request(reader, writer, {"op": "upvote", "title": rng.choice(titles)})
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run(host, port, guests, seconds, titles):
+    # Make sure every song being voted on is in the party mode queue.
+    reader, writer = await asyncio.open_connection(host, port)
+    for title in titles:
+        await request(reader, writer, {"op": "enqueue", "title": title})
+    writer.close()
+
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(guest(host, port, titles, deadline, latencies, i) for i in range(guests)))
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Party mode server load generator")
+    parser.add_argument("--address", default="127.0.0.1:8765")
+    parser.add_argument("--guests", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    host, _, port = args.address.rpartition(":")
+    titles = [song.title for song in MusicManager.default_library()]
+    latencies, elapsed = asyncio.run(run(host, int(port), args.guests, args.seconds, titles))
+    latencies.sort()
+    print(f"Guests: {args.guests}, votes: {len(latencies)} in {elapsed:.1f} s")
+    print(f"Sustained: {len(latencies) / elapsed:.0f} votes/sec")
+    print(f"Latency p50: {percentile(latencies, 0.50) * 1000:.1f} ms, "
+          f"p99: {percentile(latencies, 0.99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# The benchmark suite: every data structure and a scripted MusicManager command session,
+# at several sizes, with results written as JSON and compared against a stored baseline.
+#
+# Usage:
+#   python benchmarks/run_suite.py                       run and compare with benchmarks/baseline.json
+#   python benchmarks/run_suite.py --sizes 100,1000000   pick the sizes to run
+#   python benchmarks/run_suite.py --save-baseline       store this run as the new baseline
+#
+# Results are stored as ratios: each benchmark's operations per second divided by the speed of a
+# fixed reference loop measured right before it. A machine that is faster or slower overall,
+# or busier while the suite runs, changes both the same way, so the ratios can be compared
+# across machines and runs where raw operations per second can't.
+#
+# Exits with status 1 if any benchmark got slower than the baseline by more than --tolerance,
+# or has no baseline to compare with.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from playlist_manager.doubly_linked_list import DoublyLinkedList
+from playlist_manager.priority_queue import PartyModeQueue
+from playlist_manager.play_next_queue import PlayNextQueue
+from playlist_manager.stack import PlaybackHistory
+from playlist_manager.app import MusicManager
+from playlist_manager.commands import run_batch
+import workloads
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 1000000]
+# Version of the results format; version 2 stores ratios to the reference loop instead of operations per second.
+RESULTS_FORMAT = 2
+REFERENCE_OPERATIONS = 100000
+
+def reference_loop():
+    """A fixed mix of what the data structures spend their time on (dictionary lookups and
+    updates, list appends, integer arithmetic), used to measure how fast Python runs right now."""
+    counts = {}
+    order = []
+    for i in range(REFERENCE_OPERATIONS):
+        key = i % 1000
+        counts[key] = counts.get(key, 0) + 1
+        order.append(key)
+    return order
+
+def reference_speed(repeat):
+    """Returns the best operations per second of the reference loop over `repeat` runs."""
+    best = min(_elapsed(reference_loop) for _ in range(repeat))
+    return REFERENCE_OPERATIONS / best
+
+def _elapsed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def playlist_add(size):
+    songs = workloads.synthetic_songs(size)
+    def run():
+        playlist = DoublyLinkedList()
+        for song in songs:
+            playlist.add_song(song)
+    return size, run
+
+def playlist_remove(size):
+    songs = workloads.synthetic_songs(size)
+    removals = workloads.random_removals([song.title for song in songs], size // 2)
+    def setup():
+        playlist = DoublyLinkedList()
+        playlist.add_songs(songs)
+        return playlist
+    def run(playlist):
+        for title in removals:
+            playlist.remove_song(title)
+    return len(removals), run, setup
+
+def playlist_shuffle(size):
+    songs = workloads.synthetic_songs(size)
+    playlist = DoublyLinkedList()
+    playlist.add_songs(songs)
+    def run():
+        playlist.shuffle(seed=1)
+    return size, run
+
+def history_push(size):
+    songs = workloads.synthetic_songs(min(size, 1000))
+    def run():
+        history = PlaybackHistory(capacity=1000)
+        for i in range(size):
+            history.push(songs[i % len(songs)], timestamp=i)
+    return size, run
+
+def play_next_bursts(size):
+    bursts = workloads.bursty_enqueues(workloads.synthetic_songs(min(size, 1000)), size)
+    def run():
+        queue = PlayNextQueue()
+        for burst in bursts:
+            queue.enqueue_many(burst)
+            queue.dequeue()
+        while not queue.is_empty():
+            queue.dequeue()
+    return size, run
+
+def party_votes(size):
+    songs = workloads.synthetic_songs(size)
+    votes = workloads.zipf_votes([song.title for song in songs], size)
+    def setup():
+        queue = PartyModeQueue(verbose=False)
+        for song in songs:
+            queue.enqueue(song)
+        return queue
+    def run(queue):
+        for title in votes:
+            queue.upvote_song(title)
+        while not queue.is_empty():
+            queue.dequeue()
+    return len(votes), run, setup
+
+def manager_session(size):
+    script = workloads.session_script(size, size)
+    def setup():
+        manager = MusicManager()
+        manager.song_library = workloads.synthetic_songs(size)
+        return manager
+    def run(manager):
+        run_batch(manager.commands, script)
+    return size, run, setup
+
+BENCHMARKS = {
+    "DoublyLinkedList.add_song": playlist_add,
+    "DoublyLinkedList.remove_song": playlist_remove,
+    "DoublyLinkedList.shuffle": playlist_shuffle,
+    "PlaybackHistory.push": history_push,
+    "PlayNextQueue.bursts": play_next_bursts,
+    "PartyModeQueue.zipf_votes": party_votes,
+    "MusicManager.session": manager_session,
+}
+
+def measure(benchmark, size, repeat):
+    """Runs one benchmark `repeat` times and returns the best operations per second."""
+    prepared = benchmark(size)
+    operations, run = prepared[0], prepared[1]
+    setup = prepared[2] if len(prepared) > 2 else None
+    best = None
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        elapsed = _elapsed(run, *args)
+        best = elapsed if best is None else min(best, elapsed)
+    return operations / best if best else float("inf")
+
+def compare(results, baseline, tolerance):
+    """Prints how each result compares to the baseline and returns the list of failures:
+    results that regressed and results the baseline has nothing for."""
+    failures = []
+    for key, ratio in sorted(results.items()):
+        if key not in baseline:
+            failures.append(key)
+            print(f"{key:>42}: not in the baseline  <-- MISSING")
+            continue
+        change = ratio / baseline[key] - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  <-- REGRESSION"
+            failures.append(key)
+        print(f"{key:>42}: {change:+7.1%} vs baseline{flag}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Music Playlist Manager benchmark suite")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated workload sizes, from 100 up to 1000000")
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the best one counts")
+    parser.add_argument("--output", default=os.path.join(BENCHMARK_DIR, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCHMARK_DIR, "baseline.json"))
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed slowdown before a result counts as a regression (0.3 = 30%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    results = {}
+    ops_per_sec = {}
+    for name in names:
+        for size in sizes:
+            key = f"{name}@{size}"
+            # The reference loop is timed again before every benchmark, so a slowdown of the
+            # whole machine partway through the suite only affects the benchmarks it overlaps.
+            reference = reference_speed(args.repeat)
+            ops = measure(BENCHMARKS[name], size, args.repeat)
+            ops_per_sec[key] = ops
+            results[key] = ops / reference
+            print(f"{key:>42}: {ops:14.0f} ops/sec ({results[key]:8.4f} x the reference loop)")
+
+    report = {
+        "format": RESULTS_FORMAT,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+        "ops_per_sec": ops_per_sec,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}.")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("format") != RESULTS_FORMAT:
+        print(f"The baseline at {args.baseline} uses an older results format; run with --save-baseline to record it again.")
+        sys.exit(1)
+    print()
+    failures = compare(results, baseline["results"], args.tolerance)
+    if failures:
+        print(f"\n{len(failures)} benchmark(s) regressed by more than {args.tolerance:.0%} or have no baseline.")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Synthetic workload generators for the benchmark suite.
+# Every generator takes a seed, so the same arguments always give the same workload.
+
+import bisect
+import itertools
+import random
+
+from playlist_manager.song import Song
+
+def synthetic_songs(count, seed=0):
+    """Returns a list of songs with unique titles and a few thousand artists."""
+    rng = random.Random(seed)
+    return [Song(f"Track {i:07d}", f"Artist {rng.randrange(max(1, count // 50) + 1)}") for i in range(count)]
+
+def zipf_votes(titles, count, exponent=1.1, seed=0):
+    """Returns `count` titles to vote for, Zipf-distributed: the first titles get most of the votes,
+    like a few crowd favourites at a party."""
+    rng = random.Random(seed)
+    weights = [1 / (rank ** exponent) for rank in range(1, len(titles) + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    total = cumulative[-1]
+    return [titles[bisect.bisect_left(cumulative, rng.random() * total)] for _ in range(count)]
+
+def bursty_enqueues(songs, count, burst_size=50, seed=0):
+    """Returns `count` songs split into bursts of random size up to burst_size,
+    like a DJ queueing a whole album and then a few single tracks."""
+    rng = random.Random(seed)
+    bursts = []
+    remaining = count
+    while remaining > 0:
+        size = min(remaining, rng.randint(1, burst_size))
+        bursts.append([rng.choice(songs) for _ in range(size)])
+        remaining -= size
+    return bursts
+
+def random_removals(titles, count, seed=0):
+    """Returns `count` different titles to remove, in random order."""
+    rng = random.Random(seed)
+    return rng.sample(titles, min(count, len(titles)))
+
+def session_script(library_size, steps, seed=0):
+    """Returns the command lines (see commands.py) of a random session:
+    adding songs, playing, queueing, upvoting and removing, with an occasional shuffle
+    (a shuffle touches the whole playlist, so it is kept rare like in a real session)."""
+    rng = random.Random(seed)
+    actions = ["add", "add", "next", "next", "previous", "enqueue", "party", "upvote", "remove"]
+    lines = []
+    for _ in range(steps):
+        action = "shuffle" if rng.random() < 0.001 else rng.choice(actions)
+        if action in ("add", "enqueue", "party"):
+            lines.append(f"{action} #{rng.randint(1, library_size)}")
+        elif action in ("upvote", "remove"):
+            lines.append(f'{action} "Track {rng.randrange(library_size):07d}"')
+        elif action == "shuffle":
+            lines.append(f"shuffle {rng.randrange(1000)}")
+        else:
+            lines.append(action)
+    return lines
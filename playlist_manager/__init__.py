@@ -0,0 +1,53 @@
+# The Music Playlist Manager package.
+#
+# The main classes can be imported straight from the package (from playlist_manager import MusicManager),
+# but their modules are only imported the first time one of them is used, so importing the package
+# is free and each part (party server, search, persistence, ...) is only loaded if it is needed.
+
+import importlib
+
+# Name -> the module in this package that defines it
+_EXPORTS = {
+    "MusicManager": "app",
+    "main": "app",
+    "PlaylistCommands": "commands",
+    "CommandResult": "commands",
+    "run_batch": "commands",
+    "Song": "song",
+    "SongStore": "song_store",
+    "DoublyLinkedList": "doubly_linked_list",
+    "PlaybackHistory": "stack",
+    "PlayNextQueue": "play_next_queue",
+    "PartyModeQueue": "priority_queue",
+    "PlaybackScheduler": "scheduler",
+    "Room": "rooms",
+    "RoomRegistry": "rooms",
+    "SongSearch": "search",
+    "Recommender": "recommend",
+    "Journal": "journal",
+    "LibraryFile": "persistence",
+    "save_library": "persistence",
+    "save_session": "persistence",
+    "load_session": "persistence",
+    "bulk_import": "importer",
+    "read_catalogue": "importer",
+    "assign_canonical_ids": "dedupe",
+    "PartyServer": "party_server",
+    "run_server": "party_server",
+    "VoteRateLimiter": "rate_limiter",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    """Imports the module that defines a name the first time the name is used."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Later lookups find it directly, without calling __getattr__ again.
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+# Runs the application with `python -m playlist_manager`.
+
+from .app import main
+
+main()
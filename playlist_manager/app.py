@@ -0,0 +1,622 @@
+# This file contains the MusicManager, which runs the Music Playlist Manager application,
+# and main(), which reads the command line and starts it.
+#
+# Only what every session needs is imported here. The party server, search, persistence, journal,
+# importer and dedupe modules are imported where they are first used, so starting the menu doesn't
+# pay for asyncio, multiprocessing and the rest unless the session uses them.
+
+import argparse
+import os
+import sys
+import time
+
+from .song import Song
+from .recommend import Recommender
+from .rooms import RoomRegistry
+from .commands import PlaylistCommands, run_batch
+from . import metrics
+
+# The song library used when no library file is given: (title, artist)
+DEFAULT_LIBRARY = (
+    ("Stay", "Blackpink"),
+    ("Dynamite", "BTS"),
+    ("World", "Seventeen"),
+    ("Love", "Wave to Earth"),
+    ("Blue", "Yung Kai"),
+    ("Die with a smile", "Bruno Mars"),
+    ("August", "Taylor Swift"),
+    ("Birds of a Feather", "Billie Eilish"),
+    ("Pretty", "JVKE"),
+    ("Best Part", "Daniel Caesar"),
+)
+
+@metrics.instrumented
+class MusicManager:
+    """The main class for music app. It holds all the different data structures (playlist, history, queues)
+    and handles all the user interactions through a menu."""
+
+    def __init__(self, library_path=None, session_path=None, history_dir=None, weights=None, party_options=None,
+                 journal_dir=None, snapshot_every=10000, autoplay=True):
+        """Initializes the MusicManager with our starting song library and
+        creates an instance of each data structure we'll be using.
+        If library_path is given, the song library is opened from that library file.
+        If session_path is given, the session is restored from it at startup and saved to it on exit.
+        If history_dir is given, plays that no longer fit in the in-memory history are logged there.
+        weights (e.g. {"party": 1, "playlist": 3}) interleave the song sources instead of
+        always playing the party queue first (see PlaybackScheduler).
+        party_options (e.g. {"half_life": 600} or {"window": 900}) make party votes count
+        less as they get older (see PartyModeQueue).
+        If journal_dir is given, every change is journaled there, with a snapshot every
+        snapshot_every changes, and a crashed session is recovered from it at startup (see Journal).
+        With autoplay, recommended songs are added when the playlist runs out (see Recommender)."""
+        self.session_path = session_path
+        # Our main list of songs that the user can pick from.
+        self.library_path = library_path
+        if library_path:
+            from .persistence import LibraryFile
+            self.song_library = LibraryFile(library_path)
+        else:
+            self.song_library = self.default_library()
+
+        # Learns which songs follow which from every room's plays and party votes.
+        self.recommender = Recommender(self.library_song) if autoplay else None
+        # Every room has its own playlist, history, queues and scheduler, sharing this song library.
+        # The menu works on the current room, which starts as "main".
+        self.rooms = RoomRegistry(weights, history_dir, party_options, self.recommender)
+        self.room = self.rooms.create("main", history_dir=history_dir)
+        # The search index over the song library. It is built the first time it is needed.
+        self.search = None
+        # The crash-recovery journal, started by start_session if a journal directory was given.
+        self.journal_dir = journal_dir
+        self.snapshot_every = snapshot_every
+        self.journal = None
+        # Every operation as a command that returns a result instead of printing.
+        # The menu below is just one way of calling them.
+        self.commands = PlaylistCommands(self)
+
+    # The current room's data structures, so the rest of the app can use them directly.
+    @property
+    def playlist(self):
+        return self.room.playlist
+
+    @playlist.setter
+    def playlist(self, playlist):
+        self.room.playlist = playlist
+
+    @property
+    def history(self):
+        return self.room.history
+
+    @history.setter
+    def history(self, history):
+        self.room.history = history
+
+    @property
+    def play_next_queue(self):
+        return self.room.play_next_queue
+
+    @play_next_queue.setter
+    def play_next_queue(self, play_next_queue):
+        self.room.play_next_queue = play_next_queue
+
+    @property
+    def party_queue(self):
+        return self.room.party_queue
+
+    @party_queue.setter
+    def party_queue(self, party_queue):
+        self.room.party_queue = party_queue
+
+    @property
+    def scheduler(self):
+        return self.room.scheduler
+
+    @staticmethod
+    def default_library():
+        """Returns the built-in starter library used when no library file is given."""
+        return [Song(title, artist) for title, artist in DEFAULT_LIBRARY]
+
+    def display_menu(self):
+        """Prints the main menu to the user, showing all available options."""
+        print(f"\n--- Music Playlist Manager (room: {self.room.name}) ---")
+        print("1. View Song Library")
+        print("2. Add Song to Playlist")
+        print("3. View Current Playlist")
+        print("4. Play Next Song")
+        print("5. Play Previous Song")
+        print("6. Shuffle Playlist")
+        print("7. Add to Play Next Queue")
+        print("8. View Playback History")
+        print("9. Remove Song from Playlist")
+        print("10. Add to Party Mode Queue")
+        print("11. Upvote a Song")
+        print("12. View Party Mode Queue")
+        print("13. Search Songs")
+        print("14. Import Songs from File")
+        print("15. Switch Room")
+        print("16. Exit")
+        print("------------------------------")
+
+    def run(self):
+        """It runs a loop that continuously
+        displays the menu and processes the user's choices."""
+        print("Welcome to the Music Playlist Manager!")
+        self.start_session()
+
+        while True:
+            self.display_menu()
+            choice = input("Enter your choice: ")
+            if not self.handle_choice(choice):
+                break
+
+    def handle_choice(self, choice):
+        """Carries out one menu choice. Returns False when the user chose to exit."""
+        # Use an if/elif chain to handle each menu choice.
+        if choice == '1':
+            self.browse_song_library()
+        elif choice == '2':
+            self.add_song_to_playlist()
+        elif choice == '3':
+            self.view_playlist()
+        elif choice == '4':
+            self.play_next_song()
+        elif choice == '5':
+            self.play_previous_song()
+        elif choice == '6':
+            self.shuffle_playlist()
+        elif choice == '7':
+            self.add_to_play_next_queue()
+        elif choice == '8':
+            self.view_history()
+        elif choice == '9':
+            self.remove_song_from_playlist()
+        elif choice == '10':
+            self.add_to_party_queue()
+        elif choice == '11':
+            self.upvote_song()
+        elif choice == '12':
+            self.view_party_queue()
+        elif choice == '13':
+            self.search_songs()
+        elif choice == '14':
+            self.import_songs()
+        elif choice == '15':
+            self.switch_room()
+        elif choice == '16':
+            self.end_session()
+            print("Thank you for using the Music Player. Goodbye!")
+            return False
+        else:
+            print("Invalid choice. Please try again.")
+        return True
+
+    def start_session(self):
+        """Recovers the journaled session if there is one, or restores the saved session,
+        or otherwise starts a playlist with a few songs."""
+        journal = None
+        if self.journal_dir:
+            from .journal import Journal
+            journal = Journal(self, self.journal_dir, self.snapshot_every)
+        start = time.perf_counter()
+        replayed = journal.recover() if journal else None
+        if replayed is not None:
+            print(f"Recovered the session from {self.journal_dir} "
+                  f"({replayed} changes replayed in {time.perf_counter() - start:.2f} s).")
+        elif self.session_path and os.path.exists(self.session_path):
+            self.load_session(self.session_path)
+        else:
+            self.add_initial_songs()
+        if journal:
+            journal.start()
+            self.journal = journal
+
+    def end_session(self):
+        """Saves the session if a session file was given, and closes the journal and history files."""
+        if self.session_path:
+            self.save_session(self.session_path)
+        if self.journal is not None:
+            # A last snapshot means the next start has nothing to replay.
+            self.journal.snapshot()
+            self.journal.close()
+        for room in self.rooms:
+            room.history.close()
+
+    def add_initial_songs(self):
+        """A simple helper method to add a few songs to the playlist when the app starts."""
+        print("\nAdding a few songs to your playlist to get you started...")
+        self.playlist.add_songs(self.song_library[:3])
+        print("Playlist created!")
+
+    def save_session(self, path):
+        """Saves the playlist, history and queues so they can be restored next time."""
+        from .persistence import save_session
+        save_session(self, path)
+        print(f"Session saved to {path}.")
+
+    def load_session(self, path):
+        """Restores the playlist, history and queues from a saved session."""
+        from .persistence import load_session
+        load_session(self, path)
+        # The playlist and queues were replaced, so the scheduler needs to use the new ones.
+        self.room.scheduler = self.room.build_scheduler()
+        if self.recommender is not None:
+            self.recommender.learn_history(self.history)
+        print(f"Session restored from {path}.")
+
+    def import_songs(self):
+        """Asks for a CSV, JSON Lines or M3U file and imports its songs into the library."""
+        path = input("Enter the path of the file to import: ").strip()
+        add_to_playlist = input("Also add the new songs to the playlist? (y/n): ").strip().lower() == 'y'
+        try:
+            self.import_catalogue(path, add_to_playlist)
+        except (OSError, ValueError) as error:
+            print(f"Could not import '{path}': {error}")
+
+    def import_catalogue(self, path, add_to_playlist=False):
+        """Streams the songs from a catalogue file into the library, skipping duplicates,
+        and prints progress as it goes."""
+        from .importer import read_catalogue, bulk_import
+
+        def show_progress(imported, skipped):
+            print(f"  ...{imported} songs imported, {skipped} skipped")
+
+        playlist = self.playlist if add_to_playlist else None
+        # A library file keeps the new songs in memory after its own, so it is never loaded in full.
+        imported, skipped = bulk_import(read_catalogue(path), self.song_library, playlist, progress=show_progress)
+        print(f"Imported {imported} songs from {path} ({skipped} duplicates or blank rows skipped).")
+
+    def import_at_startup(self, paths, cache_dir=None):
+        """Imports catalogue files into the library at startup.
+        With a cache_dir, the library they build is saved there as a library file, and the next
+        start with the same library and unchanged files opens that file instead of importing again."""
+        if not cache_dir:
+            for path in paths:
+                self.import_catalogue(path)
+            return
+        import zlib
+        from .persistence import LIBRARY_VERSION, LibraryFile, save_library
+        # The cache file is named after everything the library is built from, so editing
+        # one of the files (or the order of the --import options) builds it again.
+        sources = [LIBRARY_VERSION, self.library_path and os.path.abspath(self.library_path)]
+        for path in [self.library_path, *paths]:
+            if path:
+                status = os.stat(path)
+                sources.append([os.path.abspath(path), status.st_size, status.st_mtime_ns])
+        key = zlib.crc32(repr(sources).encode())
+        cache_path = os.path.join(cache_dir, f"library-{key:08x}.bin")
+        if os.path.exists(cache_path):
+            if isinstance(self.song_library, LibraryFile):
+                self.song_library.close()
+            self.song_library = LibraryFile(cache_path)
+            print(f"Opened the song library from the startup cache ({len(self.song_library)} songs).")
+            return
+        for path in paths:
+            self.import_catalogue(path)
+        os.makedirs(cache_dir, exist_ok=True)
+        save_library(cache_path, self.song_library)
+        # Only the latest library is kept.
+        for file_name in os.listdir(cache_dir):
+            if file_name.startswith("library-") and file_name != os.path.basename(cache_path):
+                os.remove(os.path.join(cache_dir, file_name))
+
+    def dedupe_library(self, workers=None):
+        """Finds the songs in the library that are versions of the same song and gives each song
+        its canonical ID, so the playlist can refuse a second version. workers is the number of
+        processes to use (default: one per core)."""
+        from .dedupe import assign_canonical_ids
+        start = time.perf_counter()
+        groups = assign_canonical_ids(self.song_library, workers)
+        # Songs already in a playlist were counted under their old IDs.
+        for room in self.rooms:
+            room.playlist.count_versions()
+        extra = sum(len(group) - 1 for group in groups)
+        print(f"Found {len(groups)} songs with more than one version ({extra} extra versions) "
+              f"in {time.perf_counter() - start:.1f} s.")
+        return groups
+
+    def song_search(self):
+        """Returns the search index, first adding any library songs it hasn't seen yet.
+        A new index is started if the library was replaced (by the startup cache)."""
+        if self.search is None or self.search.library is not self.song_library:
+            from .search import SongSearch
+            self.search = SongSearch(self.song_library)
+        self.search.update()
+        return self.search
+
+    def find_song(self, title):
+        """Returns the library song with this title (ignoring case), or None."""
+        return self.song_search().find(title)
+
+    def library_song(self, title, artist):
+        """Returns the library song with exactly this title and artist, or None.
+        Every library song with the title is checked, however many there are."""
+        return next((song for song in self.song_search().find_all(title)
+                     if song.title == title and song.artist == artist), None)
+
+    def search_songs(self):
+        """Asks for some text and shows the library songs whose title or artist matches it."""
+        text = input("Enter part of a title or artist to search for: ").strip()
+        result = self.commands.search(text)
+        if not result.ok:
+            print(result.message)
+            return
+        print(f"\n--- Songs matching '{text}' ---")
+        for i, song in enumerate(result.data):
+            print(f"{i+1}. {song['title']} by {song['artist']} (Upvotes: {song['upvotes']})")
+        print("--------------------")
+
+    def choose_song(self, prompt):
+        """Shows the library and lets the user pick a song by its number or by typing (part of) its title.
+        Returns the chosen song, or None if nothing was chosen."""
+        self.view_song_library()
+        choice = input(f"{prompt} (or type a title to search): ")
+        song, error = self.commands.resolve_song(choice)
+        if song:
+            return song
+        if not (error.data and "matches" in error.data):
+            print(error.message)
+            return None
+        # Several songs matched, so let the user pick one of them.
+        matches = error.data["matches"]
+        for i, match in enumerate(matches):
+            print(f"{i+1}. {match['title']} by {match['artist']} (Upvotes: {match['upvotes']})")
+        try:
+            song_index = int(input("Enter the number of the song you meant: ")) - 1
+        except ValueError:
+            print("Please enter a valid number.")
+            return None
+        if 0 <= song_index < len(matches):
+            return self.find_song(matches[song_index]["title"])
+        print("Invalid song number.")
+        return None
+
+    def view_song_library(self, page=1, page_size=20):
+        """Displays one page of the song library. Only the songs on that page are loaded."""
+        pages = max(-(-len(self.song_library) // page_size), 1)
+        print(f"\n--- Song Library (page {page} of {pages}) ---")
+        for song in self.commands.view("library", page_size, page).data:
+            print(f"{song['number']}. {song['title']} by {song['artist']} (Upvotes: {song['upvotes']})")
+        print("--------------------")
+        return pages
+
+    def browse_song_library(self, page_size=20):
+        """Shows the song library a page at a time until the user goes back to the menu."""
+        page = 1
+        while True:
+            pages = self.view_song_library(page, page_size)
+            if pages == 1:
+                return
+            choice = input("Press Enter for the next page, type a page number, or 'q' to go back: ").strip().lower()
+            if choice == "q":
+                return
+            if choice.isdigit() and 1 <= int(choice) <= pages:
+                page = int(choice)
+            elif not choice and page < pages:
+                page += 1
+            else:
+                return
+
+    def add_song_to_playlist(self):
+        """Allows the user to select and add a song to their main playlist."""
+        song_to_add = self.choose_song("Enter the number of the song to add")
+        if song_to_add:
+            print(self.commands.add(song_to_add).message)
+
+    def view_playlist(self, radius=10):
+        """Displays the songs around the one currently playing (up to `radius` before and after it),
+        marking the current song with an asterisk (*). Numbers are relative to the current song."""
+        if not self.playlist.head:
+            print("\nYour playlist is empty. Add some songs!")
+            return
+        
+        print(f"\n--- Current Playlist ({self.playlist.size} songs) ---")
+        for song in self.commands.view("around", radius).data:
+            prefix = "* " if song["current"] else "   "
+            position = f"{song['offset']:+d}" if song["offset"] else "0"
+            print(f"{prefix}{position}. {song['title']} by {song['artist']} (Upvotes: {song['upvotes']})")
+        print("------------------------")
+
+    def play_next_song(self):
+        """Plays the next song, picked by the scheduler from (in order of priority):
+        1. The Party Mode Queue
+        2. The Play Next Queue
+        3. The main playlist
+        4. Autoplay, when the playlist has run out
+        Returns the command result, whose data describes the song now playing."""
+        result = self.commands.next()
+        print(f"\n{result.message}")
+        return result
+
+    def switch_room(self):
+        """Lists the rooms and switches to one, creating it if it is new."""
+        print(f"\n{self.commands.room().message}")
+        name = input("Enter the name of the room to switch to (a new name creates a room): ").strip()
+        if name:
+            print(self.commands.room(name).message)
+
+    def view_history(self, limit=20):
+        """Displays the most recent plays, from most recent to oldest."""
+        entries = self.commands.view("history", limit).data
+        if not entries:
+            print("History is empty.")
+            return
+
+        print("\n--- Playback History (Most Recent First) ---")
+        for i, song in enumerate(entries):
+            played_at = time.strftime("%H:%M:%S", time.localtime(song["played_at"]))
+            print(f"{i+1}. [{played_at}] {song['title']} by {song['artist']} (Upvotes: {song['upvotes']})")
+        if len(self.history) > limit:
+            print(f"... and {len(self.history) - limit} older plays")
+        print("------------------------------------------")
+
+    def view_party_queue(self, limit=20):
+        """Displays the `limit` songs in the party mode queue with the most upvotes, highest first."""
+        entries = self.commands.view("party", limit).data
+        if not entries:
+            print("\nParty mode queue is empty.")
+            return
+
+        print("\n--- Party Mode Queue (Highest Upvotes First) ---")
+        for i, song in enumerate(entries):
+            print(f"{i+1}. {song['title']} by {song['artist']} (Upvotes: {song['upvotes']})")
+        if len(self.party_queue.queue) > limit:
+            print(f"... and {len(self.party_queue.queue) - limit} more")
+        print("--------------------------------------------------")
+
+    def play_previous_song(self):
+        """Plays the previous song in the playlist and adds the current song to history."""
+        print(f"\n{self.commands.previous().message}")
+
+    def shuffle_playlist(self):
+        """Randomizes the order of the songs in the main playlist,
+        or turns on shuffle play, which plays them in a random order without reordering them."""
+        lazy = input("Keep the playlist's order and just play it in a random order? (y/n): ").strip().lower() == 'y'
+        result = self.commands.shuffle("--lazy") if lazy else self.commands.shuffle()
+        print(f"\n{result.message}")
+        if result.ok and not lazy:
+            self.view_playlist()
+
+    def remove_song_from_playlist(self):
+        """Removes a song from the playlist by its title."""
+        song_title = input("Enter the title of the song to remove: ")
+        print(self.commands.remove(song_title).message)
+
+    def add_to_play_next_queue(self):
+        """Adds a song from the library to the play next queue."""
+        song = self.choose_song("Enter the number of the song to add to the play next queue")
+        if song:
+            print(self.commands.enqueue(song).message)
+
+    def add_to_party_queue(self):
+        """Adds a song from the library to the party mode priority queue."""
+        song = self.choose_song("Enter the number of the song to add to the party mode queue")
+        if song:
+            print(self.commands.party(song).message)
+            
+    def upvote_song(self):
+        """Increases the upvote count of a song."""
+        song_title = input("Enter the title of the song to upvote: ")
+        print(self.commands.upvote(song_title).message)
+
+def default_cache_dir():
+    """Returns the directory where the startup library is cached: playlist_manager in the user's cache directory."""
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "playlist_manager")
+
+# The song sources that --weights can name
+SOURCE_NAMES = ("party", "play_next", "playlist")
+
+def parse_weights(text):
+    """Turns "party=1,playlist=3" into {"party": 1, "playlist": 3}.
+    Raises ValueError for an unknown source or a weight that isn't a whole number of 0 or more."""
+    weights = {}
+    for pair in text.split(","):
+        name, _, weight = pair.partition("=")
+        name = name.strip()
+        if name not in SOURCE_NAMES:
+            raise ValueError(f"unknown source '{name}' (use {', '.join(SOURCE_NAMES)})")
+        try:
+            weights[name] = int(weight)
+        except ValueError:
+            raise ValueError(f"the weight of '{name}' must be a whole number, not '{weight.strip()}'") from None
+        if weights[name] < 0:
+            raise ValueError(f"the weight of '{name}' can't be negative")
+    return weights
+
+def main(argv=None):
+    """Runs the application with the given command line arguments (default: sys.argv)."""
+    parser = argparse.ArgumentParser(description="Music Playlist Manager")
+    parser.add_argument("--library", help="library file to open instead of the built-in song library")
+    parser.add_argument("--session", help="session file to restore at startup and save on exit")
+    parser.add_argument("--history-dir", help="directory where older playback history is logged")
+    parser.add_argument("--weights", metavar="SOURCE=N,...",
+                        help="interleave song sources by weight, e.g. party=1,play_next=1,playlist=3 "
+                             "(a weight of 0 only plays when the others are empty)")
+    parser.add_argument("--import", dest="imports", action="append", default=[], metavar="PATH",
+                        help="import songs from a CSV, JSON Lines or M3U file at startup (can be repeated)")
+    parser.add_argument("--cache-dir", default=default_cache_dir(), metavar="DIR",
+                        help="directory where the library built by --import is cached for the next start "
+                             "(default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="import the --import files again instead of using the cache")
+    parser.add_argument("--export-library", metavar="PATH", help="write the song library to a library file and exit")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="run the commands in FILE ('-' for standard input) instead of the menu")
+    parser.add_argument("--results", metavar="FILE", help="with --batch, write each command's result to FILE as JSON lines")
+    parser.add_argument("--serve", metavar="HOST:PORT", nargs="?", const="127.0.0.1:8765",
+                        help="run the party mode server instead of the menu (default 127.0.0.1:8765)")
+    parser.add_argument("--journal", metavar="DIR",
+                        help="journal every change in DIR and recover the session from it after a crash")
+    parser.add_argument("--snapshot-every", type=int, default=10000, metavar="N",
+                        help="with --journal, snapshot the session every N changes (default 10000)")
+    parser.add_argument("--no-autoplay", action="store_true",
+                        help="stop at the end of the playlist instead of adding recommended songs")
+    parser.add_argument("--dedupe", metavar="WORKERS", type=int, nargs="?", const=0,
+                        help="find different versions of the same song in the library, "
+                             "using WORKERS processes (default: one per core)")
+    scoring = parser.add_mutually_exclusive_group()
+    scoring.add_argument("--half-life", type=float, metavar="SECONDS",
+                         help="party votes lose half their weight every SECONDS")
+    scoring.add_argument("--vote-window", type=float, metavar="SECONDS",
+                         help="only party votes from the last SECONDS count")
+    parser.add_argument("--vote-rate", type=float, metavar="N",
+                        help="with --serve, allow each guest (IP address, or address and name) N votes per second on average")
+    parser.add_argument("--vote-burst", type=int, default=5, metavar="N",
+                        help="with --vote-rate, let a guest cast up to N votes at once (default 5)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="measure every playlist operation and write the numbers to PATH on exit "
+                             "(Prometheus text format if PATH ends in .prom, JSON otherwise)")
+    parser.add_argument("--profile", metavar="PATH", help="run the session under cProfile and save the stats to PATH")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+    weights = None
+    if args.weights:
+        try:
+            weights = parse_weights(args.weights)
+        except ValueError as error:
+            parser.error(f"argument --weights: {error}")
+    party_options = {}
+    if args.half_life:
+        party_options["half_life"] = args.half_life
+    if args.vote_window:
+        party_options["window"] = args.vote_window
+    manager = MusicManager(library_path=args.library, session_path=args.session, history_dir=args.history_dir,
+                           weights=weights, party_options=party_options,
+                           journal_dir=args.journal, snapshot_every=args.snapshot_every,
+                           autoplay=not args.no_autoplay)
+    try:
+        if args.imports:
+            manager.import_at_startup(args.imports, None if args.no_cache else args.cache_dir)
+        if args.dedupe is not None:
+            manager.dedupe_library(args.dedupe or None)
+        if args.export_library:
+            from .persistence import save_library
+            save_library(args.export_library, manager.song_library)
+            print(f"Song library written to {args.export_library}.")
+        elif args.batch:
+            manager.start_session()
+            batch = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+            results = open(args.results, "w", encoding="utf-8") if args.results else None
+            try:
+                count, failed, seconds = run_batch(manager.commands, batch, results)
+            finally:
+                if results:
+                    results.close()
+                if batch is not sys.stdin:
+                    batch.close()
+            print(f"Ran {count} commands ({failed} failed) in {seconds:.3f} s ({count / seconds if seconds else 0:.0f} commands/sec).")
+            manager.end_session()
+        elif args.serve:
+            from .party_server import run_server
+            manager.start_session()
+            run_server(manager, args.serve, vote_rate=args.vote_rate, vote_burst=args.vote_burst)
+            manager.end_session()
+        elif args.profile:
+            with metrics.profile(args.profile):
+                manager.run()
+        else:
+            manager.run()
+    finally:
+        # Write the numbers even if the session ended with an error.
+        if args.metrics:
+            metrics.write_snapshot(args.metrics)
+            print(f"Metrics written to {args.metrics}.")
@@ -0,0 +1,447 @@
+# This file contains the command layer of the Music Playlist Manager.
+# Every operation is a method that takes plain arguments and returns a CommandResult;
+# nothing here reads input or prints. The interactive menu, the batch runner and
+# scripts are all clients of this layer.
+#
+# Batch files hold one command per line, with shell-style quoting for titles:
+#   add "Birds of a Feather"
+#   enqueue #3
+#   insert 1 "Die with a smile"
+#   move Stay 2
+#   unqueue Stay
+#   upvote Stay
+#   upvote "Die with a smile" 5
+#   next
+#   view playlist 20
+#   view around 5
+#   view library 20 3
+# Songs are found by title, or by library number written as #3 (a bare 3 is a title first,
+# so a song called "1999" can still be found, and a library number if no title matches).
+# Unquoted words after a command are joined into one title; quote the title to give more
+# arguments after it, like the upvote amount above.
+# Blank lines and lines starting with # are ignored.
+#
+# Commands that change the session are also recorded in the manager's journal (see journal.py),
+# if it has one, with songs given as [title, artist] so they can be found again when replaying.
+
+import itertools
+import json
+import random
+import shlex
+import time
+
+from .metrics import instrumented
+
+class CommandResult:
+    """The outcome of a command: whether it worked, a message for people, and data for programs."""
+    __slots__ = ("ok", "message", "data")
+
+    def __init__(self, ok, message, data=None):
+        self.ok = ok
+        self.message = message
+        self.data = data
+
+    def to_dict(self):
+        return {"ok": self.ok, "message": self.message, "data": self.data}
+
+    def __repr__(self):
+        return f"CommandResult(ok={self.ok!r}, message={self.message!r})"
+
+def song_data(song):
+    """The plain-data form of a song used in command results."""
+    return {"title": song.title, "artist": song.artist, "upvotes": song.upvotes}
+
+# How many entries a view returns when it needs a limit and none is given
+PAGE_SIZE = 20
+
+@instrumented
+class PlaylistCommands:
+    """The operations of a MusicManager as commands with structured results."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def resolve_song(self, reference):
+        """Finds a library song from a title, a 1-based library number (an int, or "#n"),
+        or a [title, artist] pair (a Song is returned as it is).
+        A reference made only of digits is looked up as a title first, then as a number.
+        Returns (song, None), or (None, CommandResult) explaining why no single song was found."""
+        if isinstance(reference, (list, tuple)):
+            return self._find_exact(*reference)
+        if isinstance(reference, int):
+            return self._library_song(reference)
+        if not isinstance(reference, str):
+            return reference, None
+        reference = reference.strip()
+        if reference.startswith("#") and reference[1:].isdigit():
+            return self._library_song(int(reference[1:]))
+        if not reference:
+            return None, CommandResult(False, "Please enter a valid number or title.")
+        song = self.manager.find_song(reference)
+        if song:
+            return song, None
+        if reference.isdigit():
+            return self._library_song(int(reference))
+        results = self.manager.song_search().search(reference)
+        if len(results) == 1:
+            return results[0], None
+        if not results:
+            return None, CommandResult(False, f"No songs match '{reference}'.")
+        return None, CommandResult(False, f"'{reference}' matches several songs.",
+                                   {"matches": [self._song_data(song) for song in results]})
+
+    def add(self, reference):
+        """Adds a library song to the playlist, unless it is already there."""
+        song, error = self.resolve_song(reference)
+        if error:
+            return error
+        playlist = self.manager.playlist
+        if playlist.contains(song.title):
+            return CommandResult(False, f"'{song.title}' is already in the playlist. Duplicates are not allowed.")
+        if playlist.contains_version_of(song):
+            return CommandResult(False, f"Another version of '{song.title}' is already in the playlist. Duplicates are not allowed.")
+        self.manager.playlist.add_song(song)
+        self._record("add", [song.title, song.artist])
+        return CommandResult(True, f"'{song.title}' has been added to the playlist.", self._song_data(song))
+
+    def remove(self, title):
+        """Removes a song from the playlist by its title."""
+        if self.manager.playlist.remove_song(title):
+            self._record("remove", title)
+            return CommandResult(True, f"'{title}' has been removed from the playlist.")
+        return CommandResult(False, f"'{title}' was not found in the playlist.")
+
+    def next(self, title=None, source=None):
+        """Plays the next song, picked by the scheduler.
+        The journal replays a next with the title it played and the source it came from, and that
+        song is played again: the party queue's order depends on when votes were cast and expired."""
+        self.manager.room.record_start()
+        if source is not None:
+            song = self.manager.scheduler.replay(source, title)
+            if song is None:
+                return CommandResult(False, f"'{title}' is no longer in the {source} source.")
+        else:
+            song, source = self.manager.scheduler.next()
+            if song is None:
+                return CommandResult(False, "End of playlist. No more songs to play.")
+        if source == "autoplay":
+            # Autoplay depends on what the recommender has learned, so journal the song it picked.
+            self._record("autoplay", [song.title, song.artist])
+        else:
+            self._record("next", song.title, source)
+        if source == "party":
+            message = f"Playing from party mode queue: {song}"
+        elif source == "play_next":
+            message = f"Playing from regular queue: {song}"
+        elif source == "autoplay":
+            message = f"Autoplay: {song}"
+        else:
+            message = f"Playing: {song}"
+        return CommandResult(True, message, dict(self._song_data(song), source=source))
+
+    def autoplay(self, reference=None):
+        """Adds a song to the end of the playlist and plays it: the given library song,
+        or the one the recommender suggests."""
+        scheduler = self.manager.scheduler
+        if scheduler.fallback is None:
+            return CommandResult(False, "Autoplay is turned off.")
+        self.manager.room.record_start()
+        if reference is None:
+            song = scheduler.fallback.take()
+            if song is None:
+                return CommandResult(False, "Autoplay has nothing to suggest yet.")
+        else:
+            song, error = self.resolve_song(reference)
+            if error:
+                return error
+            scheduler.fallback.play(song)
+        scheduler.notify(song, "autoplay")
+        self._record("autoplay", [song.title, song.artist])
+        return CommandResult(True, f"Autoplay: {song}", dict(self._song_data(song), source="autoplay"))
+
+    def suggest(self, reference=None, limit=10):
+        """Lists the songs the recommender suggests after a library song (default: the current song)."""
+        manager = self.manager
+        if manager.recommender is None:
+            return CommandResult(False, "Autoplay is turned off.")
+        if reference is None:
+            if manager.playlist.current is None:
+                return CommandResult(False, "No song is currently playing.")
+            song = manager.playlist.current.song
+        else:
+            song, error = self.resolve_song(reference)
+            if error:
+                return error
+        suggestions = manager.recommender.suggest(song, int(limit))
+        return CommandResult(True, f"{len(suggestions)} suggestions after '{song.title}'",
+                             [self._song_data(suggestion) for suggestion in suggestions])
+
+    def previous(self):
+        """Plays the previous song in the playlist."""
+        playlist = self.manager.playlist
+        if not playlist.current:
+            return CommandResult(False, "No song is currently playing.")
+        self.manager.room.record_start()
+        song = playlist.get_previous()
+        if song is None:
+            return CommandResult(False, "Start of playlist. No previous song to play.")
+        self.manager.history.push(song)
+        self._record("previous")
+        return CommandResult(True, f"Playing previous: {song}", self._song_data(song))
+
+    def shuffle(self, *options):
+        """Shuffles the playlist: 'shuffle [seed]'. With 'shuffle --lazy [seed]' the playlist keeps
+        its order and shuffle play picks its songs in a random order instead, one at a time.
+        The seed used is returned, so the same order can be reproduced."""
+        lazy = "--lazy" in options
+        options = [option for option in options if option != "--lazy"]
+        if len(options) > 1:
+            raise TypeError("usage: shuffle [--lazy] [seed]")
+        if self.manager.playlist.size < 2:
+            return CommandResult(False, "Cannot shuffle a playlist with less than two songs.")
+        seed = random.randrange(2 ** 32) if not options else int(options[0])
+        if lazy:
+            self.manager.room.shuffle_play(seed)
+            self._record("shuffle", "--lazy", seed)
+            return CommandResult(True, "Shuffle play is on: the playlist will play in a random order.",
+                                 {"seed": seed, "lazy": True})
+        self.manager.room.shuffle_play(None)
+        self.manager.playlist.shuffle(seed)
+        self._record("shuffle", seed)
+        return CommandResult(True, "Playlist shuffled!", {"seed": seed})
+
+    def enqueue(self, reference):
+        """Adds a library song to the play next queue."""
+        song, error = self.resolve_song(reference)
+        if error:
+            return error
+        if not self.manager.play_next_queue.enqueue(song):
+            return CommandResult(False, "The play next queue is full.")
+        self._record("enqueue", [song.title, song.artist])
+        return CommandResult(True, f"'{song.title}' has been added to the play next queue.", self._song_data(song))
+
+    def insert(self, position, reference):
+        """Adds a library song to the play next queue at a position (1 is the front)."""
+        position = int(position)
+        if position < 1:
+            return CommandResult(False, "Queue positions start at 1.")
+        song, error = self.resolve_song(reference)
+        if error:
+            return error
+        queue = self.manager.play_next_queue
+        if not queue.insert(position - 1, song):
+            return CommandResult(False, "The play next queue is full.")
+        self._record("insert", position, [song.title, song.artist])
+        position = min(position, len(queue))
+        return CommandResult(True, f"'{song.title}' has been added to the play next queue at position {position}.",
+                             dict(self._song_data(song), position=position))
+
+    def move(self, title, position):
+        """Moves a song in the play next queue to a position (1 is the front).
+        If the title is queued more than once, the one nearest the front is moved."""
+        position = int(position)
+        if position < 1:
+            return CommandResult(False, "Queue positions start at 1.")
+        queue = self.manager.play_next_queue
+        if not queue.move(title, position - 1):
+            return CommandResult(False, f"'{title}' was not found in the play next queue.")
+        self._record("move", title, position)
+        position = min(position, len(queue))
+        return CommandResult(True, f"'{title}' has been moved to position {position} in the play next queue.",
+                             {"title": title, "position": position})
+
+    def unqueue(self, title):
+        """Removes a song from the play next queue. If the title is queued more than once,
+        the one nearest the front is removed."""
+        if not self.manager.play_next_queue.remove(title):
+            return CommandResult(False, f"'{title}' was not found in the play next queue.")
+        self._record("unqueue", title)
+        return CommandResult(True, f"'{title}' has been removed from the play next queue.")
+
+    def party(self, reference):
+        """Adds a library song to the party mode queue."""
+        song, error = self.resolve_song(reference)
+        if error:
+            return error
+        party_queue = self.manager.party_queue
+        if song.title in party_queue.song_map:
+            return CommandResult(False, f"'{song.title}' is already in the party mode queue.")
+        party_queue.enqueue(song, upvotes=self.manager.room.library_upvotes(song))
+        self._record("party", [song.title, song.artist])
+        return CommandResult(True, f"'{song.title}' has been added to the party mode queue with a default upvote.",
+                             self._song_data(song))
+
+    def upvote(self, title, amount=1, voted_at=None):
+        """Upvotes a song in the party mode queue, or in the library if it isn't queued.
+        amount gives several votes at once. voted_at is when the votes were cast (a time.time()
+        value, default now); the journal records it so replayed votes decay or expire from then."""
+        amount = int(amount)
+        if amount < 1:
+            return CommandResult(False, "The upvote amount must be at least 1.")
+        if voted_at is None:
+            voted_at = time.time()
+            at = None
+        else:
+            voted_at = float(voted_at)
+            # The party queue has its own (monotonic) clock, so go back from its now by the vote's age.
+            at = self.manager.party_queue.clock() - max(0.0, time.time() - voted_at)
+        # Use the library's spelling of the title, since the party queue matches titles exactly.
+        song = self.manager.find_song(title)
+        if song:
+            title = song.title
+        party_queue = self.manager.party_queue
+        if party_queue.upvote_song(title, amount, at):
+            self._record("upvote", title, amount, voted_at)
+            self.manager.room.learn_vote(party_queue.song_map[title], amount)
+            upvotes = party_queue.upvotes(title)
+            return CommandResult(True, f"'{title}' has been upvoted! Upvotes: {upvotes}",
+                                 dict(self._song_data(party_queue.song_map[title]), upvotes=upvotes, queue="party"))
+        if song:
+            # The library song is shared by every room, so the vote is kept in this room.
+            self.manager.room.library_votes[song] += amount
+            self._record("upvote", title, amount, voted_at)
+            upvotes = self.manager.room.library_upvotes(song)
+            return CommandResult(True, f"'{song.title}' has been upvoted! Upvotes: {upvotes}",
+                                 dict(self._song_data(song), queue="library"))
+        return CommandResult(False, f"'{title}' was not found in the party mode queue or song library.")
+
+    def search(self, text, limit=10):
+        """Searches the library by title or artist."""
+        results = self.manager.song_search().search(text, int(limit))
+        if not results:
+            return CommandResult(False, f"No songs match '{text}'.", [])
+        return CommandResult(True, f"{len(results)} songs match '{text}'.", [self._song_data(song) for song in results])
+
+    def view(self, what="playlist", limit=None, page=None):
+        """Lists the library, playlist, play next queue ("queue"), party mode queue ("party") or history.
+        limit caps how many entries are returned. Only the entries returned are ever visited:
+          history   the `limit` (default 20) most recent plays, reading the log on disk only as far as needed
+          library   page `page` (from 1) of `limit` songs each, if a page is given
+          around    the songs within `limit` (default 5) of the current playlist song
+          party     the top `limit` songs, picked from the heap without sorting it"""
+        limit = int(limit) if limit is not None else None
+        manager = self.manager
+        if what == "library":
+            library = manager.song_library
+            start = 0
+            if page is not None:
+                limit = limit or PAGE_SIZE
+                start = (int(page) - 1) * limit
+                if start < 0:
+                    return CommandResult(False, "Pages start at 1.")
+            end = len(library) if limit is None else min(start + limit, len(library))
+            entries = [dict(self._song_data(library[index]), number=index + 1) for index in range(start, end)]
+        elif what == "playlist":
+            entries = []
+            node = manager.playlist.head
+            while node and (limit is None or len(entries) < limit):
+                entries.append(dict(self._song_data(node.song), current=node is manager.playlist.current))
+                node = node.next
+        elif what == "around":
+            radius = 5 if limit is None else limit
+            entries = [dict(self._song_data(song), offset=offset, current=offset == 0)
+                       for offset, song in manager.playlist.window(radius, radius)]
+        elif what == "queue":
+            entries = [self._song_data(song) for song in itertools.islice(manager.play_next_queue, limit)]
+        elif what == "party":
+            entries = [dict(self._song_data(song), upvotes=upvotes) for song, upvotes in manager.party_queue.top(limit)]
+        elif what == "history":
+            entries = [dict(self._song_data(song), played_at=timestamp)
+                       for timestamp, song in manager.history.last(PAGE_SIZE if limit is None else limit)]
+        else:
+            return CommandResult(False, f"Unknown view '{what}'. Use library, playlist, around, queue, party or history.")
+        return CommandResult(True, f"{len(entries)} entries", entries)
+
+    def room(self, name=None):
+        """Switches to the room with this name, creating it if it doesn't exist.
+        Without a name, lists the rooms."""
+        manager = self.manager
+        if name is None:
+            names = [room.name for room in manager.rooms]
+            listing = ", ".join(f"*{room}" if room == manager.room.name else room for room in names)
+            return CommandResult(True, f"Rooms: {listing}", {"rooms": names, "current": manager.room.name})
+        room = manager.rooms.get(name)
+        created = room is None
+        if created:
+            room = manager.rooms.create(name)
+        manager.room = room
+        self._record("room", name)
+        message = f"Created and switched to room '{name}'." if created else f"Switched to room '{name}'."
+        return CommandResult(True, message, {"room": name, "created": created})
+
+    def _song_data(self, song):
+        """song_data() with the upvotes the song has in the current room."""
+        return dict(song_data(song), upvotes=self.manager.room.library_upvotes(song))
+
+    def _library_song(self, number):
+        """Returns the library song with this 1-based number."""
+        library = self.manager.song_library
+        if 1 <= number <= len(library):
+            return library[number - 1], None
+        return None, CommandResult(False, "Invalid song number.")
+
+    def _find_exact(self, title, artist):
+        """Finds the library song with exactly this title and artist (as recorded in the journal)."""
+        song = self.manager.library_song(title, artist)
+        if song is None:
+            return None, CommandResult(False, f"'{title}' by {artist} is not in the song library.")
+        return song, None
+
+    def _record(self, command, *args):
+        """Writes a command that changed the session to the journal, if there is one."""
+        journal = self.manager.journal
+        if journal is not None:
+            journal.record(command, *args)
+
+    def execute(self, line):
+        """Runs one command line like 'add "Birds of a Feather"' and returns its result.
+        Returns None for blank lines and comments."""
+        if line.lstrip().startswith("#"):
+            return None
+        try:
+            # Only whole lines are comments, so "#3" can be a library number.
+            words = shlex.split(line)
+        except ValueError as error:
+            return CommandResult(False, f"Could not read command: {error}")
+        if not words:
+            return None
+        name, args = words[0].lower(), words[1:]
+        method = getattr(self, name, None) if name in COMMAND_NAMES else None
+        if method is None:
+            return CommandResult(False, f"Unknown command '{name}'. Commands: {', '.join(COMMAND_NAMES)}.")
+        if not any(quote in line for quote in "\"'"):
+            # Let unquoted titles with spaces work too. A quoted title keeps the arguments after it.
+            if name in ("add", "remove", "enqueue", "party", "upvote", "room", "unqueue") and len(args) > 1:
+                args = [" ".join(args)]
+            elif name == "insert" and len(args) > 2:
+                args = [args[0], " ".join(args[1:])]
+            elif name == "move" and len(args) > 2:
+                args = [" ".join(args[:-1]), args[-1]]
+        try:
+            return method(*args)
+        except (TypeError, ValueError) as error:
+            return CommandResult(False, f"Bad arguments for '{name}': {error}")
+
+# The methods that can be called from a command line
+COMMAND_NAMES = ("add", "remove", "next", "previous", "shuffle", "enqueue", "insert", "move", "unqueue", "party",
+                 "upvote", "search", "view", "room", "autoplay", "suggest")
+
+def run_batch(commands, lines, results_file=None, stop_on_error=False):
+    """Runs command lines one after another as fast as possible.
+    If results_file is given, each result is written to it as a JSON line.
+    Returns (commands run, commands that failed, seconds taken)."""
+    count = 0
+    failed = 0
+    start = time.perf_counter()
+    for line in lines:
+        result = commands.execute(line)
+        if result is None:
+            continue
+        count += 1
+        if not result.ok:
+            failed += 1
+        if results_file is not None:
+            results_file.write(json.dumps(dict(result.to_dict(), command=line.strip())) + "\n")
+        if stop_on_error and not result.ok:
+            break
+    return count, failed, time.perf_counter() - start
@@ -0,0 +1,185 @@
+# This file finds near-duplicate songs in the song library, like "Stay (Remastered)" and "Stay"
+# by the same artist, and gives every song a canonical ID: the library index of the first song
+# in its group of duplicates.
+#
+# It works in three steps:
+#   1. Normalise titles and artists: fold accents and case, and strip tags like "(feat. X)",
+#      "(Remastered 2011)" or "- Live", so versions of the same song usually become identical.
+#   2. Give every normalised title a MinHash signature of its character trigrams.
+#      Titles with mostly the same trigrams get mostly the same signature values.
+#      Steps 1 and 2 are the slow part, so the catalogue is split into shards that are normalised
+#      and signed in a ProcessPoolExecutor, one shard per task, which lets it use every core.
+#   3. Only compare songs whose signatures agree on a whole band of values (locality-sensitive
+#      hashing), by the same artist. Pairs that really are similar enough are merged with a
+#      union-find, so groups form even when A looks like B and B looks like C.
+
+import os
+import random
+import re
+import unicodedata
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# Tags that mark another version or a guest artist rather than a different song. A tag has to
+# make up the whole bracket (or everything after " - "), so "(Live Forever)" or "(With Me)" are
+# part of the title, while "(Live)", "(Live at Wembley)" and "(with Ed Sheeran)" are tags.
+VERSION_TAGS = (r"(\d{4} )?remaster(ed)?( \d{4})?( version)?|live( version)?|radio edit|single version"
+                r"|album version|mono|stereo|explicit|clean|bonus track|deluxe( edition)?|acoustic( version)?")
+# Tags followed by a name: a guest artist ("with" only if what follows isn't a pronoun), or a venue.
+NAMED_TAGS = (r"(feat\.?|ft\.?|featuring|with(?!\s+(me|you|us|him|her|them|it|myself|yourself)\b))\s+[^)\]]+"
+              r"|live\s+(at|from|in|on)\s+[^)\]]+")
+TAG = "(" + NAMED_TAGS + "|" + VERSION_TAGS + ")"
+BRACKETED_TAG = re.compile(r"[(\[]\s*" + TAG + r"\s*[)\]]")
+DASH_TAG = re.compile(r"\s+-\s+" + TAG + r"\s*$")
+FEATURING = re.compile(r"\s+(feat\.?|ft\.?|featuring)\s.*$")
+PUNCTUATION = re.compile(r"[^\w\s]")
+
+# MinHash settings: NUM_PERM values per signature, split into BANDS bands of ROWS values.
+# Two titles with trigram similarity s share at least one band with probability 1 - (1 - s**ROWS)**BANDS,
+# which is about 0.9 at s = 0.6 and about 0.25 at s = 0.3.
+BANDS = 10
+ROWS = 3
+NUM_PERM = BANDS * ROWS
+# Each of the NUM_PERM hash functions is a trigram's CRC-32 XORed with its own random mask.
+# That is much cheaper in Python than (a * x + b) mod p and good enough for picking candidates.
+# The masks are fixed, so every process agrees on them.
+MASKS = random.Random(20240601).sample(range(1 << 32), NUM_PERM)
+
+def fold(text):
+    """Case-folds text and removes accents, so "Beyoncé" and "BEYONCE" are the same."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def normalise_title(title):
+    """Returns a title with version and featuring tags, punctuation and extra spaces removed.
+    A title with nothing else in it (only emoji, punctuation or a tag, like "🔥", "!!!" or "(Live)")
+    is only case-folded, so different titles like that don't all become "" and match each other."""
+    folded = fold(title)
+    text = BRACKETED_TAG.sub(" ", folded)
+    text = DASH_TAG.sub("", text)
+    text = FEATURING.sub("", text)
+    text = PUNCTUATION.sub("", text)
+    return " ".join(text.split()) or " ".join(folded.split())
+
+def normalise_artist(artist):
+    """Returns an artist name without featured artists, "the", punctuation or extra spaces."""
+    text = FEATURING.sub("", fold(artist))
+    text = text.replace("&", " and ")
+    text = " ".join(PUNCTUATION.sub("", text).split())
+    if text.startswith("the "):
+        text = text[4:]
+    return text
+
+def signature(text):
+    """Returns the MinHash signature of a normalised title's character trigrams, packed as bytes
+    (NUM_PERM unsigned 32-bit values)."""
+    padded = f" {text} "
+    hashes = {zlib.crc32(padded[i:i + 3].encode()) for i in range(max(len(padded) - 2, 1))}
+    return array("I", [min([h ^ mask for h in hashes]) for mask in MASKS]).tobytes()
+
+def sign_shard(pairs):
+    """Returns a (normalised title, normalised artist, signature) for every (title, artist) pair.
+    Runs in a worker process."""
+    signed = []
+    for title, artist in pairs:
+        title = normalise_title(title)
+        signed.append((title, normalise_artist(artist), signature(title)))
+    return signed
+
+def similarity(first, second):
+    """Estimates the trigram (Jaccard) similarity of two titles from their signatures."""
+    first = memoryview(first).cast("I")
+    second = memoryview(second).cast("I")
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+class DisjointSet:
+    """Union-find over the numbers 0..size-1, with path halving and union by size."""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first, second):
+        """Merges the groups of two items. Returns True if they were in different groups."""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return True
+
+def sign_all(pairs, workers=None):
+    """Runs sign_shard over a list of (title, artist) pairs, in shards in parallel processes,
+    and yields the results in order. workers=1 does everything in this process."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(pairs) < 1000:
+        yield from sign_shard(pairs)
+        return
+    # A few shards per worker, so a slow shard doesn't leave the other cores idle at the end.
+    shard_size = -(-len(pairs) // (workers * 4))
+    shards = [pairs[i:i + shard_size] for i in range(0, len(pairs), shard_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard in executor.map(sign_shard, shards):
+            yield from shard
+
+def find_duplicates(songs, workers=None, threshold=0.6):
+    """Groups the songs that look like versions of the same song by the same artist.
+    Titles count as alike when their estimated trigram similarity is at least `threshold`
+    (dropping one letter from a 15-letter title still gives about 0.65).
+    Returns the list of groups (lists of indices into songs, in order) with more than one song,
+    and a list giving the group root of every song's normalised (title, artist) pair."""
+    # Songs whose normalised title and artist are identical are duplicates without comparing them.
+    keys = {}
+    song_keys = []
+    distinct = []
+    signatures = []
+    for title, artist, sig in sign_all([(song.title, song.artist) for song in songs], workers):
+        key_id = keys.setdefault((title, artist), len(keys))
+        if key_id == len(distinct):
+            distinct.append((title, artist))
+            signatures.append(sig)
+        song_keys.append(key_id)
+
+    groups = DisjointSet(len(distinct))
+    for band in range(BANDS):
+        start = band * ROWS * 4
+        end = start + ROWS * 4
+        # Keys that agree on this band of values, by the same artist, land in the same bucket,
+        # and every key is compared with all the keys before it in its bucket (not just the first:
+        # A can match C without matching B). Members already in the key's group are skipped.
+        buckets = {}
+        for key_id, ((title, artist), sig) in enumerate(zip(distinct, signatures)):
+            members = buckets.setdefault((artist, sig[start:end]), [])
+            for other in members:
+                if groups.find(other) != groups.find(key_id) and similarity(signatures[other], sig) >= threshold:
+                    groups.union(other, key_id)
+            members.append(key_id)
+
+    roots = [groups.find(key_id) for key_id in song_keys]
+    members = {}
+    for index, root in enumerate(roots):
+        members.setdefault(root, []).append(index)
+    return [group for group in members.values() if len(group) > 1], roots
+
+def assign_canonical_ids(songs, workers=None, threshold=0.6):
+    """Sets song.canonical_id on every song to the library index of the first song in its group of
+    duplicates (its own index if it has none). Returns the groups with more than one song."""
+    duplicates, roots = find_duplicates(songs, workers, threshold)
+    first_index = {}
+    for index, song in enumerate(songs):
+        song.canonical_id = first_index.setdefault(roots[index], index)
+    return duplicates
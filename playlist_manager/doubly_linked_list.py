@@ -0,0 +1,236 @@
+# This file contains the implementation of a doubly linked list for the playlist.
+import random
+from collections import Counter
+
+from .metrics import instrumented
+
+# A node for doubly linked list.
+class Node:
+    """Node for a doubly linked list, containing a song and pointers to next and previous nodes."""
+    __slots__ = ("song", "next", "prev")
+
+    def __init__(self, song):
+        self.song = song
+        self.next = None
+        self.prev = None
+
+# The Doubly Linked List for the main playlist.
+@instrumented
+class DoublyLinkedList:
+    """A doubly linked list to manage the playlist
+        It allows for efficient insertion, deletion, and traversal (next/previous)."""
+
+    def __init__(self):
+        self.head = None
+        self.tail = None
+        self.current = None # Pointer to the currently playing song
+        self.size = 0
+        # A dictionary from case-folded title to the nodes with that title,
+        # so finding or removing a song doesn't have to walk the list.
+        self.index = {}
+        # How many songs of each canonical ID (see dedupe.py) are in the playlist,
+        # so other versions of a song already in it can be spotted.
+        self.canonical = Counter()
+
+    def add_song(self,song):
+        """Adds a new song to the end of the playlist"""
+        new_node = Node(song)
+        if not self.head:
+            self.head = new_node
+            self.tail = new_node
+            self.current = new_node
+        else:
+            self.tail.next = new_node
+            new_node.prev = self.tail
+            self.tail = new_node
+        self.index.setdefault(song.title.casefold(), []).append(new_node)
+        if song.canonical_id is not None:
+            self.canonical[song.canonical_id] += 1
+        self.size += 1
+
+    def add_songs(self, songs):
+        """Adds several songs to the end of the playlist in one go."""
+        index = self.index
+        canonical = self.canonical
+        tail = self.tail
+        count = 0
+        for song in songs:
+            new_node = Node(song)
+            if tail:
+                tail.next = new_node
+                new_node.prev = tail
+            else:
+                self.head = new_node
+                self.current = new_node
+            tail = new_node
+            index.setdefault(song.title.casefold(), []).append(new_node)
+            if song.canonical_id is not None:
+                canonical[song.canonical_id] += 1
+            count += 1
+        self.tail = tail
+        self.size += count
+
+    def find(self, song_title):
+        """Returns the node for a song title (ignoring case), or None if it isn't in the playlist."""
+        nodes = self.index.get(song_title.casefold())
+        return nodes[0] if nodes else None
+
+    def contains(self, song_title):
+        """Checks if a song with this title is in the playlist."""
+        return song_title.casefold() in self.index
+
+    def contains_version_of(self, song):
+        """Checks if the playlist has this song or another version of it (same canonical ID)."""
+        if song.canonical_id is None:
+            return self.contains(song.title)
+        return self.canonical[song.canonical_id] > 0 or self.contains(song.title)
+
+    def count_versions(self):
+        """Counts the canonical IDs of the playlist's songs again. Call it after the songs'
+        canonical IDs change (see MusicManager.dedupe_library), since removing a song takes
+        its current ID off the counts."""
+        canonical = Counter()
+        node = self.head
+        while node:
+            if node.song.canonical_id is not None:
+                canonical[node.song.canonical_id] += 1
+            node = node.next
+        self.canonical = canonical
+
+    def jump_to(self, song_title):
+        """Moves the current pointer straight to a song and returns it."""
+        node = self.find(song_title)
+        if node:
+            self.current = node
+            return node.song
+        return None
+
+    def remove_song(self, song_title):
+        """Removes a song by its title."""
+        key = song_title.casefold()
+        nodes = self.index.get(key)
+        if not nodes:
+            return False
+
+        temp = nodes.pop(0)
+        if not nodes:
+            del self.index[key]
+        canonical_id = temp.song.canonical_id
+        if canonical_id is not None:
+            self.canonical[canonical_id] -= 1
+            if not self.canonical[canonical_id]:
+                del self.canonical[canonical_id]
+
+        # If it's the head node
+        if temp.prev is None:
+            self.head = temp.next
+            if self.head:
+                self.head.prev = None
+            else:
+                self.tail = None # The list is now empty
+        # If it is the tail node
+        elif temp.next is None:
+            temp.prev.next = None
+            self.tail = temp.prev
+        # In the middle
+        else:
+            temp.prev.next = temp.next
+            temp.next.prev = temp.prev
+
+        # Adjust current pointer if the current song is removed
+        if self.current == temp:
+            self.current = temp.next if temp.next else temp.prev
+        self.size -= 1
+        return True
+
+    def get_next(self):
+        """Moves to the next song in the playlist."""
+        if self.current and self.current.next:
+            self.current = self.current.next
+            return self.current.song
+        return None
+
+    def get_previous(self):
+        """Moves to the previous song in the playlist."""
+        if self.current and self.current.prev:
+            self.current = self.current.prev
+            return self.current.song
+        return None
+        
+    def window(self, before=5, after=5):
+        """Yields (offset, song) for the songs around the current one, from up to `before` songs
+        before it to up to `after` songs after it. The current song has offset 0.
+        Only the nodes inside the window are visited, however long the playlist is."""
+        node = self.current
+        if node is None:
+            return
+        offset = 0
+        while offset > -before and node.prev:
+            node = node.prev
+            offset -= 1
+        while node and offset <= after:
+            yield offset, node.song
+            node = node.next
+            offset += 1
+
+    def shuffle(self, seed=None):
+        """Shuffles the playlist with a Fisher-Yates shuffle in O(n) time.
+        The existing nodes are relinked in their new order, so no songs or nodes are copied.
+        Passing a seed gives the same order every time."""
+        
+        if self.size <= 1:
+            return
+
+        rng = random.Random(seed)
+        nodes = self._nodes()
+
+        # Fisher-Yates: swap each position with a random position at or before it
+        for i in range(len(nodes) - 1, 0, -1):
+            j = rng.randint(0, i)
+            nodes[i], nodes[j] = nodes[j], nodes[i]
+
+        # Relink the nodes in their shuffled order
+        previous = None
+        for node in nodes:
+            node.prev = previous
+            if previous:
+                previous.next = node
+            previous = node
+        previous.next = None
+        self.head = nodes[0]
+        self.tail = previous
+        # Reset current pointer to the new head
+        self.current = self.head
+
+    def shuffle_on_demand(self, seed=None):
+        """Yields the songs in a random order, one at a time, without changing the playlist."""
+        for node in self.shuffled_nodes(seed):
+            yield node.song
+
+    def shuffled_nodes(self, seed=None):
+        """Yields the playlist nodes in a random order, one at a time, without changing the playlist.
+        The nodes are gathered into a list first, which takes O(n) memory (one reference per
+        song, nothing is copied) and a single walk. After that each pick is O(1): the shuffle
+        only remembers the swaps made so far instead of shuffling a whole copy up front."""
+        rng = random.Random(seed)
+        nodes = self._nodes()
+        # Positions that have been swapped so far (a lazy Fisher-Yates shuffle)
+        swapped = {}
+        for i in range(len(nodes)):
+            j = rng.randint(i, len(nodes) - 1)
+            pick = swapped.get(j, j)
+            swapped[j] = swapped.pop(i, i)
+            yield nodes[pick]
+
+    def contains_node(self, node):
+        """Checks if a node is still in the playlist (it hasn't been removed)."""
+        return any(other is node for other in self.index.get(node.song.title.casefold(), ()))
+
+    def _nodes(self):
+        """Returns the playlist nodes in order as a Python list."""
+        nodes = []
+        temp = self.head
+        while temp:
+            nodes.append(temp)
+            temp = temp.next
+        return nodes
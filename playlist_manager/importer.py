@@ -0,0 +1,131 @@
+# This file contains the bulk importer that loads large song catalogues from CSV, JSON Lines and M3U files.
+# Files are read one row at a time with generators, so memory use doesn't grow with the file size.
+
+import csv
+import json
+import os
+
+from .song import Song
+
+def read_csv(path):
+    """Yields (title, artist) pairs from a CSV file with "title" and "artist" columns.
+    Without a header row, the first two columns are used as title and artist."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [name.strip().lower() for name in header]
+        if "title" in columns:
+            title_column = columns.index("title")
+            artist_column = columns.index("artist") if "artist" in columns else None
+        else:
+            title_column, artist_column = 0, 1
+            yield _csv_pair(header, title_column, artist_column)
+        for row in reader:
+            if len(row) > title_column:
+                yield _csv_pair(row, title_column, artist_column)
+            else:
+                # A row without a title is counted as skipped.
+                yield "", ""
+
+def read_jsonl(path):
+    """Yields (title, artist) pairs from a JSON Lines file with one {"title": ..., "artist": ...} object per line.
+    A line that isn't valid JSON, isn't an object or whose title isn't a string gives a blank title,
+    so it is counted as skipped instead of stopping the import. A missing or non-string artist is blank."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield "", ""
+                continue
+            if not isinstance(record, dict):
+                yield "", ""
+                continue
+            title = record.get("title")
+            artist = record.get("artist")
+            yield (title if isinstance(title, str) else ""), (artist if isinstance(artist, str) else "")
+
+def read_m3u(path):
+    """Yields (title, artist) pairs from an M3U playlist.
+    "#EXTINF:<seconds>,Artist - Title" lines are used when present, otherwise the file name
+    of each entry is split on " - " the same way."""
+    with open(path, encoding="utf-8") as f:
+        info = None
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                info = line.partition(",")[2]
+            elif line and not line.startswith("#"):
+                if not info:
+                    info = os.path.splitext(os.path.basename(line))[0]
+                artist, separator, title = info.partition(" - ")
+                if not separator:
+                    title, artist = info, ""
+                yield title, artist
+                info = None
+
+# Which reader to use for each file extension
+READERS = {
+    ".csv": read_csv,
+    ".jsonl": read_jsonl,
+    ".ndjson": read_jsonl,
+    ".m3u": read_m3u,
+    ".m3u8": read_m3u,
+}
+
+def read_catalogue(path):
+    """Yields (title, artist) pairs from a catalogue file, picking the reader from the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported catalogue file type '{extension}'. Use one of: {', '.join(sorted(READERS))}.")
+    return READERS[extension](path)
+
+def normalise_key(title, artist):
+    """Returns the key used to spot duplicates: title and artist, case-folded with spacing tidied up."""
+    return " ".join(title.casefold().split()), " ".join(artist.casefold().split())
+
+def bulk_import(rows, library, playlist=None, batch_size=50000, progress=None):
+    """Adds songs from an iterable of (title, artist) pairs to a song library (a list or a LibraryFile),
+    skipping blank titles and songs that are already in the library.
+    New songs are added in batches, to the playlist as well if one is given.
+    progress(imported, skipped) is called after every batch.
+    Returns (imported, skipped)."""
+    # A library file can list its titles and artists without creating a Song for each one.
+    pairs = library.pairs() if hasattr(library, "pairs") else ((song.title, song.artist) for song in library)
+    seen = {normalise_key(title, artist) for title, artist in pairs}
+    imported = 0
+    skipped = 0
+    batch = []
+    for title, artist in rows:
+        title = title.strip()
+        key = normalise_key(title, artist)
+        if not title or key in seen:
+            skipped += 1
+            continue
+        seen.add(key)
+        batch.append(Song(title, artist.strip()))
+        if len(batch) >= batch_size:
+            imported += _add_batch(batch, library, playlist)
+            batch = []
+            if progress:
+                progress(imported, skipped)
+    if batch:
+        imported += _add_batch(batch, library, playlist)
+        if progress:
+            progress(imported, skipped)
+    return imported, skipped
+
+def _add_batch(batch, library, playlist):
+    library.extend(batch)
+    if playlist is not None:
+        playlist.add_songs(batch)
+    return len(batch)
+
+def _csv_pair(row, title_column, artist_column):
+    artist = row[artist_column] if artist_column is not None and len(row) > artist_column else ""
+    return row[title_column], artist
@@ -0,0 +1,208 @@
+# This file contains the Journal, which keeps a live session safe from crashes.
+#
+# Every command that changes the session (add, next, upvote, ...) is appended to a journal file
+# as one JSON line: [sequence number, command, arguments...]. Every so often the whole session is
+# written as a snapshot (one session file per room, see persistence.py) and a new journal file is
+# started, so after a crash we only load the last snapshot and replay the commands after it.
+# Recovery time therefore depends on how often snapshots are taken, not on how long the party has
+# been going.
+#
+# Files in the journal directory:
+#   snapshot.json                   which snapshot is the latest: its sequence number and rooms,
+#                                   with each room's scheduler state (round robin credit, shuffle play)
+#   snapshot-<sequence>-<room>.bin  the session of each room when the snapshot was taken
+#   journal-<sequence>.log          the commands after <sequence>
+#
+# Each line is handed to the operating system as soon as it is written, so it survives the program
+# crashing. Forcing it onto the disk (fsync), so it also survives the machine losing power, is slow,
+# so lines are synced in groups: after sync_every lines, or at most sync_interval seconds after the
+# first line of the group was written (a timer syncs a group that stops growing, like the last
+# commands before the app sits waiting for input).
+
+import json
+import os
+import threading
+import time
+
+from .metrics import instrumented
+from .persistence import save_session, load_session
+
+MANIFEST = "snapshot.json"
+
+@instrumented
+class Journal:
+    """An append-only journal of session commands, with periodic snapshots, for a MusicManager."""
+
+    def __init__(self, manager, directory, snapshot_every=10000, sync_every=64, sync_interval=0.05):
+        self.manager = manager
+        self.directory = directory
+        # Commands between snapshots
+        self.snapshot_every = snapshot_every
+        # Lines that may be written before they are synced to the disk, and for how long
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        # The sequence number of the last command written, and of the latest snapshot
+        self.sequence = 0
+        self.snapshot_sequence = 0
+        # Lines written since the last sync
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        # The timer that syncs the pending lines if no more are written for a while, and a lock
+        # because it runs on its own thread
+        self.timer = None
+        self.lock = threading.RLock()
+        self.file = None
+        # True while replaying, so the replayed commands aren't written again
+        self.replaying = False
+        os.makedirs(directory, exist_ok=True)
+
+    def recover(self):
+        """Loads the latest snapshot and replays the commands journaled after it.
+        Returns the number of commands replayed, or None if there was nothing to recover."""
+        manifest_path = os.path.join(self.directory, MANIFEST)
+        journals = self._journal_files()
+        if not os.path.exists(manifest_path) and not journals:
+            return None
+
+        manager = self.manager
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            for room_name, file_name, *scheduler_state in manifest["rooms"]:
+                manager.room = manager.rooms.get(room_name) or manager.rooms.create(room_name)
+                load_session(manager, os.path.join(self.directory, file_name))
+                # The playlist and queues were replaced, so the scheduler is built over the new
+                # ones and then carries on where it was when the snapshot was taken.
+                manager.room.scheduler = manager.room.build_scheduler()
+                if scheduler_state:
+                    manager.room.scheduler.load_state(scheduler_state[0])
+                if manager.recommender is not None:
+                    manager.recommender.learn_history(manager.history)
+            manager.room = manager.rooms.get(manifest["current"])
+            self.snapshot_sequence = self.sequence = manifest["sequence"]
+
+        replayed = 0
+        self.replaying = True
+        try:
+            for first, path in journals:
+                for sequence, command, args in self._read_journal(path):
+                    if sequence <= self.sequence:
+                        continue
+                    getattr(manager.commands, command)(*args)
+                    self.sequence = sequence
+                    replayed += 1
+        finally:
+            self.replaying = False
+        return replayed
+
+    def start(self):
+        """Starts journaling. A new journal file is begun after the recovered commands, and if
+        there was no snapshot yet, one is taken so the journal has a starting point."""
+        if self.snapshot_sequence == 0 and not os.path.exists(os.path.join(self.directory, MANIFEST)):
+            self.snapshot()
+        else:
+            self._open_journal()
+
+    def record(self, command, *args):
+        """Appends a command to the journal. Takes a snapshot when enough commands have been written."""
+        if self.replaying or self.file is None:
+            return
+        with self.lock:
+            self.sequence += 1
+            self.file.write(json.dumps([self.sequence, command, *args]) + "\n")
+            self.file.flush()
+            self.pending += 1
+            if self.pending >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+                self.sync()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.sync_interval, self._sync_later)
+                self.timer.daemon = True
+                self.timer.start()
+        if self.sequence - self.snapshot_sequence >= self.snapshot_every:
+            self.snapshot()
+
+    def sync(self):
+        """Forces the journal lines written so far onto the disk (one fsync for the whole group)."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.pending and self.file is not None:
+                os.fsync(self.file.fileno())
+                self.pending = 0
+            self.last_sync = time.monotonic()
+
+    def snapshot(self):
+        """Saves every room's session and starts a new journal file. Older files are deleted."""
+        manager = self.manager
+        current = manager.room
+        rooms = []
+        for number, room in enumerate(manager.rooms):
+            file_name = f"snapshot-{self.sequence:012d}-{number}.bin"
+            manager.room = room
+            save_session(manager, os.path.join(self.directory, file_name))
+            rooms.append([room.name, file_name, room.scheduler.save_state()])
+        manager.room = current
+
+        manifest = {"sequence": self.sequence, "current": current.name, "rooms": rooms}
+        manifest_path = os.path.join(self.directory, MANIFEST)
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(manifest_path + ".tmp", manifest_path)
+        self.snapshot_sequence = self.sequence
+
+        self._open_journal()
+        keep = {file_name for room_name, file_name, state in rooms} | {MANIFEST, os.path.basename(self.file.name)}
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith(("snapshot-", "journal-")) and file_name not in keep:
+                os.remove(os.path.join(self.directory, file_name))
+
+    def close(self):
+        """Syncs and closes the journal file."""
+        with self.lock:
+            if self.file is not None:
+                self.sync()
+                self.file.close()
+                self.file = None
+
+    def _sync_later(self):
+        """Runs on the timer's thread, sync_interval seconds after a line was left unsynced."""
+        with self.lock:
+            # The timer may have been cancelled while it was waiting for the lock.
+            if self.timer is threading.current_thread():
+                self.timer = None
+                self.sync()
+
+    def _open_journal(self):
+        """Starts a new journal file for the commands after the current sequence number."""
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+        # If a file with this name exists, none of its lines were newer than the sequence number
+        # (or it would be higher), so it can be started over.
+        path = os.path.join(self.directory, f"journal-{self.sequence:012d}.log")
+        self.file = open(path, "w", encoding="utf-8")
+        self.pending = 0
+
+    def _journal_files(self):
+        """Returns (first sequence number, path) for every journal file, oldest first."""
+        files = []
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith("journal-") and file_name.endswith(".log"):
+                files.append((int(file_name[8:-4]), os.path.join(self.directory, file_name)))
+        return sorted(files)
+
+    def _read_journal(self, path):
+        """Yields (sequence number, command, arguments) from a journal file.
+        A line cut short by a crash ends the file."""
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    sequence, command, *args = json.loads(line)
+                except ValueError:
+                    break
+                yield sequence, command, args
@@ -0,0 +1,220 @@
+# This file contains the optional metrics layer: call counts and latency histograms for the
+# methods of the playlist data structures, plus cProfile and tracemalloc capture windows.
+#
+# Classes are marked with @instrumented when they are defined, which only records them.
+# Nothing is measured until enable() is called: it swaps each public method for a timed
+# wrapper, and disable() puts the original methods back. So when metrics are off,
+# the methods are exactly the original ones and cost nothing extra.
+# For a generator method (like PartyModeQueue.top), the time spent producing its items is
+# measured too, and recorded as one call when the generator finishes or is closed.
+
+import functools
+import io
+import json
+import time
+import types
+from contextlib import contextmanager
+
+# Latencies are counted in power-of-two nanosecond buckets: bucket i holds calls that
+# took less than 2**i nanoseconds (and at least 2**(i-1)). 2**40 ns is about 18 minutes.
+BUCKET_COUNT = 41
+
+class OperationStats:
+    """The call count, total time and latency histogram of one method."""
+    __slots__ = ("count", "total_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def record(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), BUCKET_COUNT - 1)] += 1
+
+    def percentile(self, fraction):
+        """Returns an upper bound in seconds for the given percentile, from the histogram."""
+        target = self.count * fraction
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return 2 ** i / 1e9
+        return 0.0
+
+# Classes marked with @instrumented
+registered_classes = []
+# "ClassName.method" -> OperationStats
+operations = {}
+# (class, method name, original function) for every method enable() replaced
+_patched = []
+# True between enable() and disable(). Classes defined meanwhile (in modules imported later) are measured too.
+_enabled = False
+
+def instrumented(cls):
+    """Class decorator that marks a class's public methods for measuring once metrics are enabled."""
+    registered_classes.append(cls)
+    if _enabled:
+        _patch_class(cls)
+    return cls
+
+def is_enabled():
+    return _enabled
+
+def enable():
+    """Starts measuring every public method of the instrumented classes."""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        for cls in registered_classes:
+            _patch_class(cls)
+
+def disable():
+    """Stops measuring and restores the original methods. The numbers recorded so far are kept."""
+    global _enabled
+    _enabled = False
+    while _patched:
+        cls, name, original = _patched.pop()
+        setattr(cls, name, original)
+
+def reset():
+    """Sets every recorded number back to zero."""
+    for stats in operations.values():
+        stats.__init__()
+
+def snapshot():
+    """Returns the recorded numbers as a dictionary: method name -> count, times and histogram.
+    Methods that were never called are left out."""
+    result = {}
+    for name, stats in sorted(operations.items()):
+        if not stats.count:
+            continue
+        result[name] = {
+            "count": stats.count,
+            "total_seconds": stats.total_ns / 1e9,
+            "mean_seconds": stats.total_ns / stats.count / 1e9 if stats.count else 0.0,
+            "p50_seconds": stats.percentile(0.50),
+            "p99_seconds": stats.percentile(0.99),
+            # Upper bound of each bucket in seconds -> number of calls, skipping empty buckets
+            "histogram": {f"{2 ** i / 1e9:g}": count for i, count in enumerate(stats.buckets) if count},
+        }
+    return result
+
+def write_json(path):
+    """Writes a snapshot to a JSON file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+
+def write_prometheus(path):
+    """Writes a snapshot in the Prometheus text format, as one histogram with an "op" label."""
+    lines = [
+        "# HELP playlist_operation_seconds Time spent in playlist data structure methods.",
+        "# TYPE playlist_operation_seconds histogram",
+    ]
+    for name, stats in sorted(operations.items()):
+        if not stats.count:
+            continue
+        cumulative = 0
+        for i, count in enumerate(stats.buckets):
+            cumulative += count
+            if count:
+                lines.append(f'playlist_operation_seconds_bucket{{op="{name}",le="{2 ** i / 1e9:g}"}} {cumulative}')
+        lines.append(f'playlist_operation_seconds_bucket{{op="{name}",le="+Inf"}} {stats.count}')
+        lines.append(f'playlist_operation_seconds_sum{{op="{name}"}} {stats.total_ns / 1e9}')
+        lines.append(f'playlist_operation_seconds_count{{op="{name}"}} {stats.count}')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_snapshot(path):
+    """Writes a snapshot, in the Prometheus format if the path ends in .prom and as JSON otherwise."""
+    if path.endswith(".prom"):
+        write_prometheus(path)
+    else:
+        write_json(path)
+
+@contextmanager
+def profile(path=None, limit=20):
+    """Runs the code inside the with block under cProfile.
+    The stats are saved to path (for pstats or snakeviz) if given, otherwise the top functions are printed."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        else:
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+            print(output.getvalue())
+
+@contextmanager
+def trace_memory(limit=10):
+    """Records the memory allocated inside the with block and prints the lines that allocated the most."""
+    import tracemalloc
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    try:
+        yield
+    finally:
+        after = tracemalloc.take_snapshot()
+        if not already_tracing:
+            tracemalloc.stop()
+        print(f"\n--- Top {limit} memory allocations ---")
+        for stat in after.compare_to(before, "lineno")[:limit]:
+            print(stat)
+
+def _patch_class(cls):
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") or not isinstance(member, types.FunctionType):
+            continue
+        _patched.append((cls, name, member))
+        setattr(cls, name, _timed(f"{cls.__name__}.{name}", member))
+
+def _timed(name, function):
+    import inspect
+
+    stats = operations.get(name)
+    if stats is None:
+        stats = operations[name] = OperationStats()
+    clock = time.perf_counter_ns
+
+    if inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def timed_generator(*args, **kwargs):
+            # Only the time spent inside the generator counts, not the time the caller
+            # spends between items.
+            start = clock()
+            generator = function(*args, **kwargs)
+            elapsed = clock() - start
+            try:
+                while True:
+                    start = clock()
+                    try:
+                        item = next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        elapsed += clock() - start
+                    yield item
+            finally:
+                generator.close()
+                stats.record(elapsed)
+        return timed_generator
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record(clock() - start)
+    return timed
@@ -0,0 +1,159 @@
+# This file contains the party mode server, which lets many guests use party mode at the same time.
+#
+# Guests connect over TCP and send one JSON request per line; the server answers each with one JSON line:
+#   {"op": "enqueue", "title": "Stay"}     adds a library song to the party mode queue
+#   {"op": "upvote", "title": "Stay"}      upvotes a song in the party mode queue
+#                                          (add "guest": "name" so guests sharing an address are rate limited
+#                                          separately; a connection keeps the first name it gives)
+#   {"op": "view", "limit": 10}            lists the top songs in the party mode queue
+#   {"op": "next"}                         plays the next song
+#
+# Upvotes are not applied one request at a time. They are collected for a short tick and then
+# applied together, so a song that got 50 votes in one tick is moved in the heap only once.
+# With a vote rate, each guest can only vote so often (see VoteRateLimiter).
+
+import asyncio
+import json
+import time
+from collections import Counter
+
+from .rate_limiter import VoteRateLimiter
+
+class PartyServer:
+    """Serves the party mode queue of a MusicManager to many guests over TCP."""
+
+    def __init__(self, manager, tick=0.01, vote_rate=None, vote_burst=5):
+        self.manager = manager
+        # Seconds between applying batches of upvotes
+        self.tick = tick
+        self.manager.party_queue.verbose = False
+        # Votes waiting for the next tick: title -> number of votes
+        self.pending_votes = Counter()
+        # Guests waiting for their vote to be applied: title -> list of futures
+        self.waiting = {}
+        # Limits how fast each guest can vote, if a vote rate is given
+        self.limiter = VoteRateLimiter(vote_rate, vote_burst) if vote_rate else None
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        """Starts the server and keeps applying vote batches until it is cancelled."""
+        server = await asyncio.start_server(self.handle_guest, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Party mode server listening on {address[0]}:{address[1]}")
+        async with server:
+            await self.apply_votes_forever()
+
+    async def handle_guest(self, reader, writer):
+        """Answers the requests of one connected guest until they disconnect."""
+        # Guests are told apart by their IP address, not the port, since every new connection
+        # gets a new port. A name only tells apart guests sharing an address: it is added to the
+        # address, and bound to the connection the first time it is given, so a guest can't dodge
+        # the vote limit by sending a new name with every vote.
+        peer = writer.get_extra_info("peername")
+        address = peer[0] if peer else str(id(writer))
+        guest = address
+        name_given = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    name = request.get("guest")
+                except (ValueError, AttributeError):
+                    response = {"ok": False, "error": "Requests must be JSON objects with an 'op' field."}
+                else:
+                    if name is not None and name_given is None:
+                        name_given = str(name)
+                        guest = f"{address}/{name_given}"
+                    if name is not None and str(name) != name_given:
+                        response = {"ok": False, "error": f"This connection is already voting as '{name_given}'."}
+                    else:
+                        response = await self.handle_request(request, guest)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request, guest=None):
+        """Runs one request and returns the response. guest identifies who sent it
+        (handle_guest() gives the connection's IP address, followed by the guest's name if they gave one)."""
+        op = request.get("op")
+        party_queue = self.manager.party_queue
+        if op in ("upvote", "enqueue"):
+            title = request.get("title")
+            if not isinstance(title, str) or not title.strip():
+                return {"ok": False, "error": "'title' must be a non-empty string."}
+        if op == "upvote":
+            # Match titles the way enqueue does, ignoring case, so every spelling counts towards the same song.
+            song = self.manager.find_song(title)
+            if song is not None:
+                title = song.title
+            if self.limiter is not None and not self.limiter.allow(guest):
+                wait = self.limiter.retry_after(guest)
+                return {"ok": False, "error": f"Too many votes. Try again in {wait:.1f} seconds.",
+                        "retry_after": wait}
+            # Wait for the next tick to apply this vote along with everyone else's.
+            vote = asyncio.get_running_loop().create_future()
+            self.pending_votes[title] += 1
+            self.waiting.setdefault(title, []).append(vote)
+            upvotes = await vote
+            if upvotes is None:
+                return {"ok": False, "error": f"'{title}' is not in the party mode queue."}
+            return {"ok": True, "title": title, "upvotes": upvotes}
+        if op == "enqueue":
+            song = self.manager.find_song(title)
+            if song is None:
+                return {"ok": False, "error": f"'{title}' is not in the song library."}
+            result = self.manager.commands.party(song)
+            if not result.ok:
+                return {"ok": False, "error": result.message}
+            return {"ok": True, "title": song.title}
+        if op == "view":
+            limit = request.get("limit", 10)
+            if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+                return {"ok": False, "error": "'limit' must be a whole number of 0 or more."}
+            return {"ok": True, "queue": [{"title": song.title, "artist": song.artist, "upvotes": upvotes}
+                                          for song, upvotes in party_queue.ranked(limit)]}
+        if op == "next":
+            result = self.manager.commands.next()
+            if not result.ok:
+                return {"ok": False, "error": result.message}
+            return {"ok": True, "title": result.data["title"], "artist": result.data["artist"]}
+        return {"ok": False, "error": f"Unknown op '{op}'."}
+
+    async def apply_votes_forever(self):
+        """Applies the collected votes once per tick."""
+        while True:
+            await asyncio.sleep(self.tick)
+            self.apply_votes()
+            # Votes from the tick are synced to the journal's disk file together.
+            if self.manager.journal is not None:
+                self.manager.journal.sync()
+
+    def apply_votes(self):
+        """Applies every pending vote (one heap update per song) and answers the waiting guests."""
+        votes, self.pending_votes = self.pending_votes, Counter()
+        waiting, self.waiting = self.waiting, {}
+        party_queue = self.manager.party_queue
+        for title, count in votes.items():
+            upvotes = None
+            if party_queue.upvote_song(title, count):
+                upvotes = party_queue.upvotes(title)
+                if self.manager.journal is not None:
+                    self.manager.journal.record("upvote", title, count, time.time())
+                self.manager.room.learn_vote(party_queue.song_map[title], count)
+            for vote in waiting.get(title, []):
+                if not vote.done():
+                    vote.set_result(upvotes)
+
+def run_server(manager, address="127.0.0.1:8765", tick=0.01, vote_rate=None, vote_burst=5):
+    """Runs the party mode server until Ctrl+C is pressed. address is "host:port"."""
+    host, _, port = address.rpartition(":")
+    server = PartyServer(manager, tick, vote_rate, vote_burst)
+    try:
+        asyncio.run(server.serve(host or "127.0.0.1", int(port)))
+    except KeyboardInterrupt:
+        print("\nParty mode server stopped.")
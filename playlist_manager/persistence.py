@@ -0,0 +1,338 @@
+# This file contains the binary file formats used to save the song library and the listening session.
+#
+# Library file (version 1, little-endian):
+#   header:  magic "MPLB", version (u16), flags (u16), song count (u32), string count (u32)
+#   records: one (title string ID u32, artist string ID u32, upvotes i32) record per song
+#   strings: (string count + 1) u64 offsets, followed by the UTF-8 bytes of every string
+#
+# The library file is opened with mmap, so opening it only reads the header.
+# A Song is only built when it is looked up.
+#
+# Session file (version 5, little-endian):
+#   header:  magic "MPSS", version (u16), flags (u16), current playlist position (i32, -1 for none)
+#   then four lists of library indices (u32 count followed by u32 indices):
+#   playlist order, history still in memory (oldest first), play next queue, library songs upvoted in the room
+#   (the history is followed by the f64 time of each play, and the last list by the matching i32 vote counts),
+#   then the party mode queue as a u32 count of (title, artist) strings and f64 upvotes in the queue,
+#   and with a vote window, a u32 count of (u32 party queue position, f64 time.time() cast, f64 amount) votes.
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from .song import Song
+
+LIBRARY_MAGIC = b"MPLB"
+SESSION_MAGIC = b"MPSS"
+LIBRARY_VERSION = 1
+# Version 2 added the history timestamps, version 3 made the party queue upvotes f64,
+# version 4 saves the room's votes for library songs instead of the songs' upvotes,
+# version 5 saves when each party vote was cast if they only count for a window of time.
+SESSION_VERSION = 5
+
+LIBRARY_HEADER = struct.Struct("<4sHHII")
+SONG_RECORD = struct.Struct("<IIi")
+SESSION_HEADER = struct.Struct("<4sHHi")
+COUNT = struct.Struct("<I")
+
+class LibraryFile:
+    """A song library backed by a memory-mapped library file.
+    It works like a list of songs: len(), indexing and iteration.
+    Songs are created the first time they are accessed and then reused.
+    Songs added with extend() come after the file's songs and are kept in memory;
+    the file itself is never changed."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, self.song_count, self.string_count = LIBRARY_HEADER.unpack_from(self.data, 0)
+        if magic != LIBRARY_MAGIC:
+            raise ValueError(f"{path} is not a song library file.")
+        if version != LIBRARY_VERSION:
+            raise ValueError(f"{path} uses library format version {version}, expected {LIBRARY_VERSION}.")
+        self.records_start = LIBRARY_HEADER.size
+        self.offsets_start = self.records_start + self.song_count * SONG_RECORD.size
+        self.strings_start = self.offsets_start + (self.string_count + 1) * 8
+        # Songs that have been accessed so far, by library index
+        self.songs = {}
+        # id(song) -> library index, so a loaded song can be found again when saving a session
+        self.positions = {}
+        # The number of songs added with extend(), after the file's songs
+        self.added = 0
+
+    def __len__(self):
+        return self.song_count + self.added
+
+    def __getitem__(self, index):
+        """Returns the song at an index, reading it from the file the first time.
+        A slice returns a list of songs."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("song index out of range")
+        song = self.songs.get(index)
+        if song is None:
+            title_id, artist_id, upvotes = SONG_RECORD.unpack_from(self.data, self.records_start + index * SONG_RECORD.size)
+            song = Song(self._string(title_id), self._string(artist_id))
+            song.upvotes = upvotes
+            self.songs[index] = song
+            self.positions[id(song)] = index
+        return song
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def extend(self, songs):
+        """Adds songs after the library's songs, without loading the songs in the file."""
+        for song in songs:
+            index = len(self)
+            self.songs[index] = song
+            self.positions[id(song)] = index
+            self.added += 1
+
+    def pairs(self, start=0):
+        """Yields the (title, artist) of every song from index start on, reading them from the file
+        without creating Song objects for the songs that haven't been loaded."""
+        for index in range(start, len(self)):
+            song = self.songs.get(index)
+            if song is not None:
+                yield song.title, song.artist
+            else:
+                title_id, artist_id, upvotes = SONG_RECORD.unpack_from(self.data, self.records_start + index * SONG_RECORD.size)
+                yield self._string(title_id), self._string(artist_id)
+
+    def index_of(self, song):
+        """Returns the library index of a song that was loaded from this file."""
+        return self.positions[id(song)]
+
+    def loaded_songs(self):
+        """Returns (index, song) pairs for the songs that have been accessed so far."""
+        return self.songs.items()
+
+    def close(self):
+        """Closes the memory map and the file."""
+        self.songs = {}
+        self.positions = {}
+        self.added = 0
+        self.data.close()
+        self.file.close()
+
+    def _string(self, string_id):
+        """Reads one string from the string table."""
+        start, end = struct.unpack_from("<QQ", self.data, self.offsets_start + string_id * 8)
+        return str(self.data[self.strings_start + start:self.strings_start + end], "utf-8")
+
+def save_library(path, songs):
+    """Writes a list of songs to a library file.
+    Titles and artists go into one string table, so a repeated artist is only stored once."""
+    strings = {}
+    records = bytearray()
+    for song in songs:
+        title_id = strings.setdefault(song.title, len(strings))
+        artist_id = strings.setdefault(song.artist, len(strings))
+        records += SONG_RECORD.pack(title_id, artist_id, song.upvotes)
+
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for text in strings: # dictionaries keep insertion order, which matches the IDs
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    _write_atomically(path, [
+        LIBRARY_HEADER.pack(LIBRARY_MAGIC, LIBRARY_VERSION, 0, len(records) // SONG_RECORD.size, len(strings)),
+        records,
+        _little_endian(offsets).tobytes(),
+        blob,
+    ])
+
+def save_session(manager, path):
+    """Saves the playlist order, current song, history, both queues and the library votes of a MusicManager's room."""
+    index_of = _index_lookup(manager.song_library)
+
+    playlist = array("I")
+    current = -1
+    temp = manager.playlist.head
+    while temp:
+        if temp == manager.playlist.current:
+            current = len(playlist)
+        playlist.append(index_of(temp.song))
+        temp = temp.next
+
+    history = array("I")
+    played_at = array("d")
+    for timestamp, song in manager.history.entries():
+        history.append(index_of(song))
+        played_at.append(timestamp)
+    play_next = array("I", [index_of(song) for song in manager.play_next_queue])
+
+    upvoted = array("I")
+    upvotes = array("i")
+    for song, count in manager.room.library_votes.items():
+        if count:
+            upvoted.append(index_of(song))
+            upvotes.append(count)
+
+    # Party queue songs are saved by title and artist, with the votes they got in the queue.
+    # With time-decayed scoring, the current score is saved as it is (not rounded) as if it were cast now,
+    # so a song's decay so far is kept. With a vote window, the votes that still count are saved
+    # with the (wall clock) time they were cast instead, so they expire when they would have.
+    party_queue = manager.party_queue
+    ranked = party_queue.ranked()
+    window_votes = party_queue.window_votes() if party_queue.window is not None else []
+    windowed = {}
+    for song, cast_at, amount in window_votes:
+        windowed[song.title] = windowed.get(song.title, 0) + amount
+    party = bytearray(COUNT.pack(len(ranked)))
+    positions = {}
+    for song, count in ranked:
+        positions[song.title] = len(positions)
+        count -= windowed.get(song.title, 0)
+        party += _pack_string(song.title) + _pack_string(song.artist) + struct.pack("<d", count)
+    party += COUNT.pack(len(window_votes))
+    now, wall = party_queue.clock(), time.time()
+    for song, cast_at, amount in window_votes:
+        party += struct.pack("<Idd", positions[song.title], wall - (now - cast_at), amount)
+
+    _write_atomically(path, [
+        SESSION_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, 0, current),
+        _pack_indices(playlist),
+        _pack_indices(history),
+        _little_endian(played_at).tobytes(),
+        _pack_indices(play_next),
+        _pack_indices(upvoted),
+        _little_endian(upvotes).tobytes(),
+        party,
+    ])
+
+def load_session(manager, path):
+    """Restores a session saved by save_session into a MusicManager with the same song library.
+    The manager's playlist, history and queues are replaced."""
+    from .doubly_linked_list import DoublyLinkedList
+    from .priority_queue import PartyModeQueue
+    from .play_next_queue import PlayNextQueue
+    from .stack import PlaybackHistory
+
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, flags, current = SESSION_HEADER.unpack_from(data, 0)
+    if magic != SESSION_MAGIC:
+        raise ValueError(f"{path} is not a session file.")
+    if version != SESSION_VERSION:
+        raise ValueError(f"{path} uses session format version {version}, expected {SESSION_VERSION}.")
+    offset = SESSION_HEADER.size
+    library = manager.song_library
+
+    playlist_indices, offset = _unpack_indices(data, offset)
+    manager.playlist = DoublyLinkedList()
+    for position, index in enumerate(playlist_indices):
+        manager.playlist.add_song(library[index])
+        if position == current:
+            manager.playlist.current = manager.playlist.tail
+
+    history_indices, offset = _unpack_indices(data, offset)
+    manager.history.close()
+    manager.history = PlaybackHistory(manager.history.capacity, manager.history.spill_dir)
+    played_at = array("d")
+    played_at.frombytes(data[offset:offset + 8 * len(history_indices)])
+    played_at = _little_endian(played_at)
+    offset += 8 * len(history_indices)
+    for index, timestamp in zip(history_indices, played_at):
+        manager.history.push(library[index], timestamp)
+
+    play_next_indices, offset = _unpack_indices(data, offset)
+    manager.play_next_queue = PlayNextQueue(manager.play_next_queue.capacity, manager.play_next_queue.overflow)
+    for index in play_next_indices:
+        manager.play_next_queue.enqueue(library[index])
+
+    upvoted, offset = _unpack_indices(data, offset)
+    upvotes = array("i")
+    upvotes.frombytes(data[offset:offset + 4 * len(upvoted)])
+    upvotes = _little_endian(upvotes)
+    offset += 4 * len(upvoted)
+    manager.room.library_votes.clear()
+    for index, count in zip(upvoted, upvotes):
+        manager.room.library_votes[library[index]] = count
+
+    old_party = manager.party_queue
+    manager.party_queue = PartyModeQueue(verbose=False, half_life=old_party.half_life,
+                                         window=old_party.window, clock=old_party.clock)
+    (party_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    party_titles = []
+    for _ in range(party_count):
+        title, offset = _unpack_string(data, offset)
+        artist, offset = _unpack_string(data, offset)
+        (count,) = struct.unpack_from("<d", data, offset)
+        offset += 8
+        if count.is_integer():
+            # Plain vote counts stay whole numbers.
+            count = int(count)
+        # Share the library's song when there is one, so the queue doesn't hold a copy.
+        song = manager.find_song(title)
+        if song is None or song.artist != artist:
+            song = Song(title, artist)
+        manager.party_queue.enqueue(song, upvotes=count)
+        party_titles.append(song.title)
+
+    (vote_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    now, wall = manager.party_queue.clock(), time.time()
+    for _ in range(vote_count):
+        position, cast_at, amount = struct.unpack_from("<Idd", data, offset)
+        offset += struct.calcsize("<Idd")
+        if amount.is_integer():
+            amount = int(amount)
+        # Back on the queue's own clock; votes older than the window expire straight away.
+        manager.party_queue.upvote_song(party_titles[position], amount, now - max(0.0, wall - cast_at))
+
+def _index_lookup(library):
+    """Returns a function that gives the library index of a song from the library."""
+    if hasattr(library, "index_of"):
+        return library.index_of
+    positions = {id(song): index for index, song in enumerate(library)}
+    return lambda song: positions[id(song)]
+
+def _little_endian(values):
+    """Arrays are stored in the machine's byte order, but the file formats are little-endian.
+    On a big-endian machine this returns a byte-swapped copy (swapping is its own inverse,
+    so it works for both reading and writing)."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+def _pack_indices(indices):
+    return COUNT.pack(len(indices)) + _little_endian(indices).tobytes()
+
+def _unpack_indices(data, offset):
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    indices = array("I")
+    indices.frombytes(data[offset:offset + 4 * count])
+    return _little_endian(indices), offset + 4 * count
+
+def _pack_string(text):
+    encoded = text.encode("utf-8")
+    return COUNT.pack(len(encoded)) + encoded
+
+def _unpack_string(data, offset):
+    (length,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    return str(data[offset:offset + length], "utf-8"), offset + length
+
+def _write_atomically(path, chunks):
+    """Writes a file next to its destination and renames it into place,
+    so a crash never leaves a half-written file behind."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
@@ -0,0 +1,189 @@
+# This file contains the implementation of a queue for the "play next" feature.
+
+import itertools
+
+from .doubly_linked_list import Node
+from .metrics import instrumented
+
+@instrumented
+class PlayNextQueue:
+    """A queue to hold songs that are next in line to be played.
+
+    It is a doubly linked list with a title index, so adding, playing and removing a song
+    are all O(1) no matter how long the queue is. insert() and move() have to reach their
+    position first, walking from the nearer end of the queue: at most half of it, so O(n/2)
+    for a position in the middle and O(1) near either end. A capacity can be set; when the queue is
+    full, overflow decides what happens: "reject" refuses the new song and "drop_oldest"
+    drops the song at the front to make room."""
+
+    OVERFLOW_POLICIES = ("reject", "drop_oldest")
+
+    def __init__(self, capacity=None, overflow="reject"):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {self.OVERFLOW_POLICIES}, not '{overflow}'.")
+        self.head = None
+        self.tail = None
+        self.size = 0
+        self.capacity = capacity
+        self.overflow = overflow
+        # A dictionary from case-folded title to the queued nodes with that title.
+        self.index = {}
+    
+    def enqueue(self, song):
+        """Adds a song to the play next queue. Returns False if the queue is full and the song was rejected."""
+        if not self._make_room():
+            return False
+        self._link_after(self.tail, Node(song))
+        return True
+
+    def enqueue_many(self, songs):
+        """Adds several songs (a whole album, say) to the end of the queue.
+        Returns how many were added before the queue was full."""
+        added = 0
+        for song in songs:
+            if not self.enqueue(song):
+                break
+            added += 1
+        return added
+
+    def insert(self, position, song):
+        """Adds a song at a position in the queue (0 is the front). Returns False if the queue is full.
+        Finding the position walks up to half the queue."""
+        if not self._make_room():
+            return False
+        self._link_after(self._node_before(position), Node(song))
+        return True
+
+    def dequeue(self):
+        """Removes and returns the next song to be played."""
+        if not self.is_empty():
+            node = self.head
+            self._unlink(node)
+            return node.song
+        return None
+
+    def remove(self, song_title):
+        """Removes the frontmost queued song with this title (ignoring case). Returns True if it was found."""
+        node = self._find(song_title)
+        if node is None:
+            return False
+        self._unlink(node)
+        return True
+
+    def move(self, song_title, position):
+        """Moves the frontmost queued song with this title to a new position (0 is the front).
+        Returns True if it was found. Finding the position walks up to half the queue."""
+        node = self._find(song_title)
+        if node is None:
+            return False
+        self._unlink(node)
+        self._link_after(self._node_before(position), node)
+        return True
+
+    def peek(self):
+        """Returns the next song to be played without removing it."""
+        return self.head.song if self.head else None
+    
+    def is_empty(self):
+        """Checks if the queue is empty."""
+        return self.size == 0
+
+    def is_full(self):
+        """Checks if the queue has reached its capacity."""
+        return self.capacity is not None and self.size >= self.capacity
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Iterates over the queued songs from front to back."""
+        temp = self.head
+        while temp:
+            yield temp.song
+            temp = temp.next
+
+    def view_queue(self, limit=20):
+        """Displays the first `limit` songs in the play next queue."""
+        if self.is_empty():
+            print("Play next queue is empty.")
+            return
+        
+        print("\n--- Play Next Queue (Up Next) ---")
+        for i, song in enumerate(itertools.islice(self, limit)):
+            print(f"{i+1}. {song}")
+        if len(self) > limit:
+            print(f"... and {len(self) - limit} more")
+        print("-----------------------------------")
+
+    def _make_room(self):
+        """Applies the overflow policy if the queue is full. Returns False if there is no room."""
+        if not self.is_full():
+            return True
+        if self.overflow == "drop_oldest" and self.head:
+            self._unlink(self.head)
+            return True
+        return False
+
+    def _find(self, song_title):
+        """Returns the frontmost queued node with this title (ignoring case), or None.
+        The index lists a title's nodes in the order they were added, not their order in the
+        queue, so when a title is queued more than once we walk from the front to the first of them."""
+        nodes = self.index.get(song_title.casefold())
+        if not nodes:
+            return None
+        if len(nodes) == 1:
+            return nodes[0]
+        candidates = {id(node) for node in nodes}
+        node = self.head
+        while id(node) not in candidates:
+            node = node.next
+        return node
+
+    def _node_before(self, position):
+        """Returns the node that a new node at this position goes after (None for the front).
+        It walks from whichever end of the queue is closer."""
+        position = max(0, min(position, self.size))
+        if position == 0:
+            return None
+        if position <= self.size // 2:
+            node = self.head
+            for _ in range(position - 1):
+                node = node.next
+        else:
+            node = self.tail
+            for _ in range(self.size - position):
+                node = node.prev
+        return node
+
+    def _link_after(self, before, node):
+        """Links a node in after `before`, or at the front if before is None."""
+        node.prev = before
+        node.next = before.next if before else self.head
+        if node.prev:
+            node.prev.next = node
+        else:
+            self.head = node
+        if node.next:
+            node.next.prev = node
+        else:
+            self.tail = node
+        self.index.setdefault(node.song.title.casefold(), []).append(node)
+        self.size += 1
+
+    def _unlink(self, node):
+        """Takes a node out of the queue."""
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+        key = node.song.title.casefold()
+        nodes = self.index[key]
+        nodes.remove(node)
+        if not nodes:
+            del self.index[key]
+        self.size -= 1
@@ -0,0 +1,282 @@
+# This file contains the PartyModeQueue class for the Music Playlist Manager.
+
+import bisect
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+
+from .metrics import instrumented
+
+# With a half-life, the priority of a song without votes: the log2 of a score too small to be
+# anything but 0 (2 ** NO_VOTES is 0.0 as a float), so it sorts after every song with votes
+# while staying an ordinary number.
+NO_VOTES = -1100.0
+
+@instrumented
+class PartyModeQueue:
+    """A priority queue to handle songs in party mode.
+    Songs with more upvotes have a higher priority and are played sooner.
+
+    It is an indexed binary heap: we remember where every song sits in the heap,
+    so an upvote only has to move that one song up instead of rebuilding the heap.
+
+    The queue holds references to the library's songs, not copies. Its upvotes are kept
+    in the heap entries, so every room's party queue counts its own votes for a shared song.
+
+    By default every upvote counts forever. Two other ways of scoring stop an early burst of
+    votes from keeping a song on top for the rest of the party:
+      half_life=seconds  a vote is worth half as much after every half_life seconds.
+      window=seconds     only the votes from the last `window` seconds count."""
+
+    def __init__(self, verbose=True, half_life=None, window=None, clock=time.monotonic):
+        # When verbose is False the queue doesn't print messages (used when loading or serving many guests).
+        self.verbose = verbose
+        if half_life is not None and window is not None:
+            raise ValueError("Use either half_life or window, not both.")
+        self.half_life = half_life
+        self.window = window
+        self.clock = clock
+        # With a half-life, decaying every song's score on every tick would mean fixing the whole heap.
+        # Instead, a vote cast t seconds after `epoch` is stored as if it were worth 2 ** (t / half_life)
+        # votes. All scores decay at the same rate, so this never changes their order; the real
+        # score is only worked out when it is shown. The priority is the log2 of the stored
+        # score, so it grows slowly with time and never overflows.
+        self.epoch = clock()
+        # With a window, every vote is also kept here, oldest first, as [time, entry, amount]
+        # so it can be taken off its song's score when it gets too old.
+        self.votes = deque()
+        # A min-heap of [priority, order, song] entries. The priority is the negative
+        # score in this queue, and the order number breaks ties so two songs are never compared.
+        self.queue = []
+        # A dictionary to quickly find songs in the queue by their title.
+        self.song_map = {}
+        # A dictionary from song title to that song's index in the heap.
+        self.position = {}
+        # Gives every new entry an increasing order number (first come, first served).
+        self.counter = itertools.count()
+
+    def enqueue(self, song, upvotes=None):
+        """Adds a song to the queue. It starts with the song's library upvotes as its priority,
+        or with `upvotes` if given."""
+        
+        if song.title not in self.song_map:
+            if upvotes is None:
+                upvotes = song.upvotes
+            self.expire()
+            self.song_map[song.title] = song
+            if self.half_life is None:
+                entry = [0, next(self.counter), song]
+                self._add_votes(entry, upvotes)
+            else:
+                # The entry starts at its decayed score, as if its upvotes were cast now.
+                entry = [-self._vote_value(upvotes), next(self.counter), song]
+            self.queue.append(entry)
+            self.position[song.title] = len(self.queue) - 1
+            self._sift_up(len(self.queue) - 1)
+            if self.verbose:
+                print(f"'{song.title}' added to party mode queue with priority {upvotes}.")
+        elif self.verbose:
+            print(f"'{song.title}' is already in the party mode queue.")
+
+    def dequeue(self):
+        """Removes and returns the song with the highest priority (most upvotes)."""
+        self.expire()
+        if not self.is_empty():
+            # Swap the top entry with the last one so it can be popped off the end.
+            self._swap(0, len(self.queue) - 1)
+            priority, order, song = self.queue.pop()
+            del self.song_map[song.title]
+            del self.position[song.title]
+            if self.queue:
+                self._sift_down(0)
+            return song
+        return None
+    
+    def remove(self, song_title):
+        """Removes a song from wherever it is in the queue and returns it, or None if it isn't queued."""
+        index = self.position.get(song_title)
+        if index is None:
+            return None
+        self._swap(index, len(self.queue) - 1)
+        priority, order, song = self.queue.pop()
+        del self.song_map[song_title]
+        del self.position[song_title]
+        if index < len(self.queue):
+            # The entry moved into its place can belong higher or lower.
+            moved = self.queue[index][2].title
+            self._sift_up(index)
+            self._sift_down(self.position[moved])
+        return song
+
+    def upvote_song(self, song_title, amount=1, at=None):
+        """Increases the upvote count of a song in the queue and updates its priority.
+        amount lets several votes for the same song be applied in one step.
+        at is when the votes were cast, on the queue's clock (default: now); replaying
+        a journal uses it so old votes have decayed or expired as they should have."""
+        self.expire()
+        if song_title in self.song_map:
+            # A higher upvote count can only move the song towards the top of the heap.
+            index = self.position[song_title]
+            self._add_votes(self.queue[index], amount, at)
+            self._sift_up(index)
+            if at is not None:
+                # Votes cast longer ago than the window come straight back off.
+                self.expire()
+            
+            if self.verbose:
+                print(f"'{song_title}' upvoted. New upvote count: {self.upvotes(song_title)}")
+            return True
+        else:
+            if self.verbose:
+                print(f"'{song_title}' not found in the party mode queue.")
+            return False
+
+    def upvotes(self, song_title):
+        """Returns a queued song's upvote count in this queue (its decayed score with a half-life)."""
+        self.expire()
+        return self._score(self.queue[self.position[song_title]][0])
+
+    def ranked(self, limit=None):
+        """Returns up to `limit` (song, upvotes) pairs, highest upvotes first."""
+        if limit is not None:
+            return list(self.top(limit))
+        self.expire()
+        return [(song, self._score(priority)) for priority, order, song in sorted(self.queue)]
+
+    def top(self, k=None):
+        """Yields (song, upvotes) for the k songs with the most upvotes (all of them if k is None),
+        highest first, without sorting the queue.
+        The next best song is always the top of the heap or a child of a song already yielded,
+        so those children are kept in a small heap of their own and only about k entries are
+        ever looked at. Don't change the queue while using the generator."""
+        self.expire()
+        queue = self.queue
+        if k is None:
+            k = len(queue)
+        candidates = [(queue[0], 0)] if queue and k > 0 else []
+        while candidates:
+            entry, index = heapq.heappop(candidates)
+            yield entry[2], self._score(entry[0])
+            k -= 1
+            if not k:
+                break
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(queue):
+                    heapq.heappush(candidates, (queue[child], child))
+
+    def window_votes(self):
+        """With a window, returns (song, time cast, amount) for the votes of queued songs that still
+        count, oldest first, so a saved session can keep when each one was cast."""
+        self.expire()
+        votes = []
+        for cast_at, entry, amount in self.votes:
+            # Skip votes for songs that have already been played.
+            index = self.position.get(entry[2].title)
+            if index is not None and self.queue[index] is entry:
+                votes.append((entry[2], cast_at, amount))
+        return votes
+
+    def expire(self, now=None):
+        """With a window, takes the votes that have become too old off their songs' scores.
+        Each one only moves its own song down the heap."""
+        if self.window is None:
+            return
+        if now is None:
+            now = self.clock()
+        votes = self.votes
+        cutoff = now - self.window
+        while votes and votes[0][0] <= cutoff:
+            _, entry, amount = votes.popleft()
+            # Skip votes for songs that have already been played.
+            index = self.position.get(entry[2].title)
+            if index is not None and self.queue[index] is entry:
+                entry[0] += amount
+                self._sift_down(index)
+
+    def is_empty(self):
+        """Checks if the priority queue is empty."""
+        return len(self.queue) == 0
+
+    def view_queue(self, limit=20):
+        """Displays the `limit` songs with the most upvotes."""
+        if self.is_empty():
+            print("\nParty mode queue is empty.")
+            return
+        
+        print("\n--- Party Mode Queue (Highest Upvotes First) ---")
+        for i, (song, upvotes) in enumerate(self.top(limit)):
+            print(f"{i+1}. {song.title} by {song.artist} (Upvotes: {upvotes})")
+        if len(self.queue) > limit:
+            print(f"... and {len(self.queue) - limit} more")
+        print("--------------------------------------------------")
+
+    def _add_votes(self, entry, amount, at=None):
+        """Adds `amount` votes, cast at time `at` (default: now), to a heap entry's priority."""
+        if self.half_life is None:
+            entry[0] -= amount
+            if self.window is not None and amount:
+                vote = [self.clock() if at is None else at, entry, amount]
+                if self.votes and vote[0] < self.votes[-1][0]:
+                    # An older vote (from a journal being replayed) goes in time order, so expire() still
+                    # finds the oldest votes at the front.
+                    self.votes.insert(bisect.bisect_right(self.votes, vote[0], key=lambda old: old[0]), vote)
+                else:
+                    self.votes.append(vote)
+        elif amount > 0:
+            # log2(2 ** score + 2 ** vote), worked out without leaving log space.
+            vote = self._vote_value(amount, at)
+            score = -entry[0]
+            high, low = max(score, vote), min(score, vote)
+            entry[0] = -(high + math.log2(1 + 2 ** (low - high)))
+
+    def _vote_value(self, amount, at=None):
+        """Returns the priority of `amount` votes cast at time `at`, default now (the negative of
+        what goes into the heap). Without a half-life it is just the vote count."""
+        if self.half_life is None:
+            return amount
+        if amount <= 0:
+            return NO_VOTES
+        if at is None:
+            at = self.clock()
+        return math.log2(amount) + (at - self.epoch) / self.half_life
+
+    def _score(self, priority):
+        """Turns a heap priority back into the song's upvotes right now."""
+        if self.half_life is None:
+            return -priority
+        score = 2 ** (-priority - (self.clock() - self.epoch) / self.half_life)
+        return round(score, 2)
+
+    def _swap(self, i, j):
+        """Swaps two heap entries and updates their recorded positions."""
+        self.queue[i], self.queue[j] = self.queue[j], self.queue[i]
+        self.position[self.queue[i][2].title] = i
+        self.position[self.queue[j][2].title] = j
+
+    def _sift_up(self, index):
+        """Moves an entry up the heap until its parent has a higher priority."""
+        while index > 0:
+            parent = (index - 1) // 2
+            if self.queue[index] < self.queue[parent]:
+                self._swap(index, parent)
+                index = parent
+            else:
+                break
+
+    def _sift_down(self, index):
+        """Moves an entry down the heap until both children have a lower priority."""
+        size = len(self.queue)
+        while True:
+            smallest = index
+            left = 2 * index + 1
+            right = left + 1
+            if left < size and self.queue[left] < self.queue[smallest]:
+                smallest = left
+            if right < size and self.queue[right] < self.queue[smallest]:
+                smallest = right
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
@@ -0,0 +1,62 @@
+# This file contains the VoteRateLimiter, which stops a single party guest from flooding the votes.
+
+import time
+from collections import OrderedDict
+
+from .metrics import instrumented
+
+@instrumented
+class VoteRateLimiter:
+    """Allows each guest `rate` votes per second on average, with bursts of up to `burst` votes.
+
+    It uses the generic cell rate algorithm: for every guest we only remember one number, the
+    time at which their allowance is completely refilled (their "theoretical arrival time").
+    A vote is allowed if that time is no more than (burst - 1) votes' worth in the future, and
+    each allowed vote pushes it one vote's worth later.
+
+    A guest whose time has passed is back to a full allowance, which is the same as not being
+    remembered at all, so those guests are forgotten. Guests are kept oldest-vote first, so the
+    forgotten ones are found at the front without looking at everyone."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        # Seconds between votes at the steady rate
+        self.interval = 1.0 / rate
+        # How far ahead of now a guest's refill time may be and still vote
+        self.tolerance = self.interval * (burst - 1)
+        self.clock = clock
+        # guest -> refill time, least recently voted first
+        self.refill_times = OrderedDict()
+
+    def allow(self, guest, now=None):
+        """Records a vote from a guest. Returns True if it is allowed, False if they are voting too fast."""
+        if now is None:
+            now = self.clock()
+        self._forget_idle(now)
+        refill_time = max(self.refill_times.get(guest, now), now)
+        if refill_time - now > self.tolerance:
+            return False
+        self.refill_times[guest] = refill_time + self.interval
+        self.refill_times.move_to_end(guest)
+        return True
+
+    def retry_after(self, guest, now=None):
+        """Returns how many seconds the guest has to wait before their next vote is allowed."""
+        if now is None:
+            now = self.clock()
+        refill_time = self.refill_times.get(guest, now)
+        return max(refill_time - self.tolerance - now, 0.0)
+
+    def __len__(self):
+        """Returns the number of guests currently remembered."""
+        return len(self.refill_times)
+
+    def _forget_idle(self, now):
+        """Forgets guests at the front whose allowance has completely refilled."""
+        refill_times = self.refill_times
+        while refill_times:
+            guest, refill_time = next(iter(refill_times.items()))
+            if refill_time > now:
+                break
+            del refill_times[guest]
@@ -0,0 +1,186 @@
+# This file contains the Recommender, which learns which songs go well after which, and the
+# AutoplaySource, which uses it to keep the music going when the playlist runs out.
+#
+# Every time a song is played, the songs played just before it get a link to it: weight 1 from the
+# song right before, 1/2 from the one before that, and so on. Upvoting a party song while another
+# one is playing links the playing song to it as well. The links form a sparse matrix with one row
+# per song that has been followed by anything: an array of the songs that followed it, an array of
+# the weights and a dict from song to position, so a link is found without scanning the row.
+# Only songs that have actually been played get a row, so a million-song library
+# costs nothing until it is used.
+#
+# Songs are remembered by (title, artist) only, not as Song objects: the songs played can be
+# copies (plays read back from the history log on disk are new Song objects), and a suggestion has
+# to be the library's own song, so it is looked up in the library when it is suggested.
+#
+# Each row's best K neighbours are kept in a precomputed list, which is only worked out again after
+# that row changes, so a suggestion never looks at more than one row.
+
+import heapq
+from array import array
+from collections import Counter
+
+from .metrics import instrumented
+
+@instrumented
+class Recommender:
+    """Learns song-to-song transitions from plays and party votes and suggests what to play next."""
+
+    def __init__(self, find_song, k=20, window=3, vote_weight=0.5):
+        # find_song(title, artist) returns the library song with exactly this title and artist, or None
+        self.find_song = find_song
+        # How many neighbours are kept per song
+        self.k = k
+        # How many earlier plays each play is linked to
+        self.window = window
+        # How much one party vote counts, compared to one play
+        self.vote_weight = vote_weight
+        # Songs get a small number (ID) the first time they are seen: (title, artist) -> ID, and back
+        self.ids = {}
+        self.keys = []
+        # ID -> (array of following song IDs, array of their weights, {following ID: position})
+        self.rows = {}
+        # ID -> array of the IDs of its k best neighbours, best first (missing if the row changed)
+        self.neighbours = {}
+        # How often each song has been played, for suggestions when a song has no neighbours yet
+        self.play_counts = Counter()
+
+    def observe_play(self, song, recent):
+        """Learns from a song being played. recent holds the songs played before it, most recent first."""
+        target = self._id(song)
+        self.play_counts[target] += 1
+        for distance, previous in enumerate(recent[:self.window], 1):
+            if previous is not song:
+                self._add(self._id(previous), target, 1.0 / distance)
+
+    def observe_vote(self, song, amount, playing):
+        """Learns from a party vote for `song` while `playing` was playing."""
+        if playing is not None and playing is not song:
+            self._add(self._id(playing), self._id(song), self.vote_weight * amount)
+
+    def learn_history(self, songs):
+        """Learns from songs played earlier, given oldest first (like iterating a PlaybackHistory)."""
+        recent = []
+        for song in songs:
+            self.observe_play(song, recent)
+            recent.insert(0, song)
+            del recent[self.window:]
+
+    def suggest(self, song, k=10, exclude=()):
+        """Returns up to k songs that often come after `song`, best first.
+        Songs whose titles are in `exclude`, or that aren't in the library, are skipped."""
+        source = self.ids.get((song.title, song.artist))
+        if source is None or source not in self.rows:
+            return []
+        neighbours = self.neighbours.get(source)
+        if neighbours is None:
+            neighbours = self._rank(source)
+        return self._take(neighbours, k, exclude)
+
+    def popular(self, k=10, exclude=()):
+        """Returns up to k of the most played library songs, skipping titles in `exclude`."""
+        ranked = [song_id for song_id, count in self.play_counts.most_common(k + len(exclude))]
+        return self._take(ranked, k, exclude)
+
+    def precompute(self):
+        """Works out the neighbour list of every row that changed since it was last worked out."""
+        for source in self.rows:
+            if source not in self.neighbours:
+                self._rank(source)
+
+    def __len__(self):
+        """Returns the number of songs the recommender has seen."""
+        return len(self.keys)
+
+    def _id(self, song):
+        """Returns the ID of a song, giving it one if it is new."""
+        key = (song.title, song.artist)
+        song_id = self.ids.get(key)
+        if song_id is None:
+            song_id = len(self.keys)
+            self.ids[key] = song_id
+            self.keys.append(key)
+        return song_id
+
+    def _add(self, source, target, weight):
+        """Adds weight to the link from source to target."""
+        row = self.rows.get(source)
+        if row is None:
+            row = self.rows[source] = (array("I"), array("f"), {})
+        targets, weights, positions = row
+        position = positions.get(target)
+        if position is None:
+            positions[target] = len(targets)
+            targets.append(target)
+            weights.append(weight)
+        else:
+            weights[position] += weight
+        # The row changed, so its neighbour list has to be worked out again.
+        self.neighbours.pop(source, None)
+
+    def _rank(self, source):
+        """Works out and keeps the k best neighbours of a row."""
+        targets, weights, positions = self.rows[source]
+        best = heapq.nlargest(self.k, range(len(targets)), key=weights.__getitem__)
+        neighbours = self.neighbours[source] = array("I", [targets[position] for position in best])
+        return neighbours
+
+    def _take(self, song_ids, k, exclude):
+        """Returns the library songs for up to k of the IDs, skipping titles in `exclude`
+        and songs the library doesn't have."""
+        songs = []
+        for song_id in song_ids:
+            title, artist = self.keys[song_id]
+            if title in exclude:
+                continue
+            song = self.find_song(title, artist)
+            if song is not None:
+                songs.append(song)
+                if len(songs) == k:
+                    break
+        return songs
+
+class AutoplaySource:
+    """A scheduler source that adds a recommended song to the end of the playlist and plays it.
+    It suggests from the last song played in the room, or the most played songs if that has no
+    neighbours, skipping songs already in the playlist or played recently."""
+
+    def __init__(self, name, recommender, playlist, history, avoid_recent=20):
+        self.name = name
+        self.recommender = recommender
+        self.playlist = playlist
+        self.history = history
+        self.avoid_recent = avoid_recent
+
+    def is_empty(self):
+        return self._choose() is None
+
+    def take(self):
+        song = self._choose()
+        return self.play(song) if song else None
+
+    def peek(self, n):
+        song = self._choose()
+        return [song] if song else []
+
+    def play(self, song):
+        """Adds a song to the end of the playlist and moves to it."""
+        self.playlist.add_song(song)
+        if self.playlist.current is not self.playlist.tail:
+            self.playlist.current = self.playlist.tail
+        return song
+
+    def _choose(self):
+        """Returns the song autoplay would pick now, or None."""
+        recent = [song for timestamp, song in self.history.last(self.avoid_recent)]
+        exclude = {song.title for song in recent}
+        # Songs in the playlist can't be added again, so they are skipped too.
+        for song in self._candidates(recent, exclude):
+            if not self.playlist.contains(song.title):
+                return song
+        return None
+
+    def _candidates(self, recent, exclude):
+        if recent:
+            yield from self.recommender.suggest(recent[0], self.recommender.k, exclude)
+        yield from self.recommender.popular(self.recommender.k, exclude)
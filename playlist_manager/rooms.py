@@ -0,0 +1,128 @@
+# This file contains rooms: several independent playlists (with their own history, queues and
+# playing position) that all use the same song library.
+#
+# A room never copies a song. Its playlist, queues and history hold references to the library's
+# Song objects, so memory grows with the number of songs placed in rooms, not with copies of them.
+# Anything that differs per room, like party votes or the current song, is kept in the room.
+
+import os
+from collections import Counter
+
+from .doubly_linked_list import DoublyLinkedList
+from .metrics import instrumented
+from .priority_queue import PartyModeQueue
+from .recommend import AutoplaySource
+from .play_next_queue import PlayNextQueue
+from .scheduler import PlaybackScheduler, QueueSource, PartySource, PlaylistSource
+from .stack import PlaybackHistory
+
+class Room:
+    """One room (or user playlist) with its own playlist, history, queues and scheduler."""
+
+    def __init__(self, name, weights=None, history_dir=None, party_options=None, recommender=None):
+        self.name = name
+        # This is the room's playlist, which is a doubly linked list.
+        self.playlist = DoublyLinkedList()
+        # This stack keeps track of the songs played in this room.
+        self.history = PlaybackHistory(spill_dir=history_dir)
+        # This is the queue for songs to play right after the current one.
+        self.play_next_queue = PlayNextQueue()
+        # This is the room's party mode queue, with its own votes.
+        # party_options (e.g. {"half_life": 600}) choose how its votes are scored.
+        self.party_queue = PartyModeQueue(verbose=False, **(party_options or {}))
+        # Upvotes given here to library songs that aren't in the party mode queue: song -> votes.
+        # They are kept per room because the library's songs are shared and never changed.
+        self.library_votes = Counter()
+        # The recommender shared by all rooms learns from this room's plays and votes, and if there
+        # is one, autoplay adds recommended songs when the playlist runs out.
+        self.recommender = recommender
+        # The scheduler picks which of the above the next song comes from.
+        self.weights = weights
+        self.scheduler = self.build_scheduler()
+
+    def build_scheduler(self):
+        """Creates the scheduler over this room's queues and playlist, with autoplay last.
+        Every song it plays is added to the room's history."""
+        autoplay = None
+        if self.recommender is not None:
+            autoplay = AutoplaySource("autoplay", self.recommender, self.playlist, self.history)
+        scheduler = PlaybackScheduler([
+            PartySource("party", self.party_queue),
+            QueueSource("play_next", self.play_next_queue),
+            PlaylistSource("playlist", self.playlist),
+        ], self.weights, fallback=autoplay)
+        scheduler.subscribe(self.played)
+        return scheduler
+
+    def shuffle_play(self, seed=None):
+        """Starts shuffle play of the playlist with a seed (see PlaylistSource), or stops it if seed is None."""
+        for source in self.scheduler.sources:
+            if isinstance(source, PlaylistSource):
+                source.shuffle_play(seed)
+
+    def record_start(self):
+        """Records the playlist's current song as played if nothing has been played in this room yet.
+        The history lists every song as it starts playing, but the first song of a playlist becomes
+        current without the scheduler picking it, so this is called before a song is picked.
+        Only the plays in memory count: plays logged on disk by an earlier run were of another playlist."""
+        if self.history.count == 0 and self.playlist.current is not None:
+            self.played(self.playlist.current.song, "playlist")
+
+    def library_upvotes(self, song):
+        """Returns a library song's upvotes in this room: the upvotes it has in the library plus
+        the votes it got here. A song added to this room's party mode queue starts with these."""
+        return song.upvotes + self.library_votes[song]
+
+    def played(self, song, source):
+        """Records a song the scheduler played."""
+        if self.recommender is not None:
+            recent = [previous for timestamp, previous in self.history.last(self.recommender.window)]
+            self.recommender.observe_play(song, recent)
+        self.history.push(song)
+
+    def learn_vote(self, song, amount=1):
+        """Lets the recommender learn from a party vote for a song while the last song played is playing."""
+        if self.recommender is not None:
+            last = self.history.last(1)
+            self.recommender.observe_vote(song, amount, last[0][1] if last else None)
+
+@instrumented
+class RoomRegistry:
+    """Keeps the rooms by name. New rooms get the registry's scheduler weights, party
+    vote scoring and recommender, and if a history directory is given, each room logs its older plays in
+    its own subdirectory."""
+
+    def __init__(self, weights=None, history_dir=None, party_options=None, recommender=None):
+        self.weights = weights
+        self.history_dir = history_dir
+        self.party_options = party_options
+        self.recommender = recommender
+        self.rooms = {}
+
+    def create(self, name, history_dir=None):
+        """Creates a room. history_dir overrides the room's own history subdirectory."""
+        if name in self.rooms:
+            raise ValueError(f"A room called '{name}' already exists.")
+        if history_dir is None and self.history_dir:
+            history_dir = os.path.join(self.history_dir, "rooms", name)
+        room = Room(name, self.weights, history_dir, self.party_options, self.recommender)
+        self.rooms[name] = room
+        return room
+
+    def get(self, name):
+        """Returns the room with this name, or None."""
+        return self.rooms.get(name)
+
+    def remove(self, name):
+        """Removes a room. Returns True if it existed."""
+        room = self.rooms.pop(name, None)
+        if room is None:
+            return False
+        room.history.close()
+        return True
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def __iter__(self):
+        return iter(self.rooms.values())
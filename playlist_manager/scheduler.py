@@ -0,0 +1,270 @@
+# This file contains the PlaybackScheduler, which decides where the next song comes from.
+# Each place songs can come from (party mode queue, play next queue, playlist) is a "source".
+
+import itertools
+
+from .metrics import instrumented
+
+class QueueSource:
+    """A source backed by a queue with is_empty() and dequeue(), like PlayNextQueue."""
+
+    def __init__(self, name, queue):
+        self.name = name
+        self.queue = queue
+
+    def is_empty(self):
+        return self.queue.is_empty()
+
+    def take(self):
+        return self.queue.dequeue()
+
+    def take_title(self, title):
+        """Takes the queued song with this title (normally the next one), for a replayed pick."""
+        for song in self.queue:
+            if song.title == title:
+                self.queue.remove(title)
+                return song
+        return None
+
+    def peek(self, n):
+        """Returns up to n songs that would be taken next, without taking them."""
+        return list(itertools.islice(self.queue, n))
+
+class PartySource(QueueSource):
+    """A source backed by the party mode queue. Songs come out highest upvotes first."""
+
+    def peek(self, n):
+        return [song for song, upvotes in self.queue.top(n)]
+
+    def take_title(self, title):
+        return self.queue.remove(title)
+
+class PlaylistSource:
+    """A source that moves through the playlist from the current song onwards.
+    With shuffle play, it picks the playlist's songs in a random order instead, without
+    changing the playlist, until every song has been played once."""
+
+    def __init__(self, name, playlist):
+        self.name = name
+        self.playlist = playlist
+        # With shuffle play, the nodes still to come in random order (see DoublyLinkedList.shuffled_nodes)
+        # and the ones already drawn from it by peek().
+        self.shuffled = None
+        self.ahead = []
+        # The song playing when shuffle play started, which isn't played again
+        self.started_at = None
+
+    def shuffle_play(self, seed):
+        """Starts shuffle play with a seed, or stops it if seed is None.
+        Songs added after it starts are not part of the shuffle."""
+        self.shuffled = None if seed is None else self.playlist.shuffled_nodes(seed)
+        self.ahead = []
+        self.started_at = self.playlist.current
+
+    def is_empty(self):
+        if self.shuffled is not None and self._shuffled_ahead(1):
+            return False
+        current = self.playlist.current
+        return current is None or current.next is None
+
+    def take(self):
+        if self.shuffled is not None and self._shuffled_ahead(1):
+            node = self.ahead.pop(0)
+            self.playlist.current = node
+            return node.song
+        return self.playlist.get_next()
+
+    def take_title(self, title):
+        """The playlist (and shuffle play) order doesn't depend on the time, so the song a replayed
+        pick took is the one take() gives."""
+        return self.take()
+
+    def peek(self, n):
+        if self.shuffled is not None and self._shuffled_ahead(n):
+            return [node.song for node in self._shuffled_ahead(n)]
+        songs = []
+        node = self.playlist.current.next if self.playlist.current else None
+        while node and len(songs) < n:
+            songs.append(node.song)
+            node = node.next
+        return songs
+
+    def save_state(self):
+        """Returns the shuffle play state as plain data (for a journal snapshot): None when shuffle
+        play is off, otherwise the playlist positions of the songs still to come, in shuffled order,
+        and of the song that was playing when it started. The rest of the shuffle is drawn to do
+        this, so it takes O(n) memory like the start of a shuffle does."""
+        if self.shuffled is None:
+            return None
+        positions = {id(node): position for position, node in enumerate(self._nodes())}
+        upcoming = [node for node in [*self.ahead, *self.shuffled] if id(node) in positions]
+        self.shuffled = iter(upcoming)
+        self.ahead = []
+        return {"upcoming": [positions[id(node)] for node in upcoming],
+                "started_at": positions.get(id(self.started_at))}
+
+    def load_state(self, state):
+        """Restores a shuffle play state from save_state() over the same playlist."""
+        if state is None:
+            self.shuffle_play(None)
+            return
+        nodes = self._nodes()
+        self.shuffled = iter([nodes[position] for position in state["upcoming"]])
+        self.ahead = []
+        started_at = state["started_at"]
+        self.started_at = None if started_at is None else nodes[started_at]
+
+    def _nodes(self):
+        nodes = []
+        node = self.playlist.head
+        while node:
+            nodes.append(node)
+            node = node.next
+        return nodes
+
+    def _shuffled_ahead(self, n):
+        """Returns up to n of the next shuffled nodes, skipping removed songs and the one playing
+        when shuffle play started.
+        When the shuffle runs out, shuffle play ends and the playlist continues in its own order
+        from the last song played."""
+        playlist = self.playlist
+        self.ahead = [node for node in self.ahead if playlist.contains_node(node)]
+        while len(self.ahead) < n:
+            node = next(self.shuffled, None)
+            if node is None:
+                break
+            if node is not self.started_at and playlist.contains_node(node):
+                self.ahead.append(node)
+        if not self.ahead:
+            self.shuffled = None
+        return self.ahead[:n]
+
+@instrumented
+class PlaybackScheduler:
+    """Picks the next song from a list of sources, given in order of priority.
+
+    Without weights, the first source that has a song wins (strict priority).
+    With weights, e.g. {"party": 1, "playlist": 3}, the sources that have songs take turns
+    in proportion to their weights (smooth weighted round robin), and priority order only
+    breaks ties. Sources missing from the weights get a weight of 1; a source with a weight
+    of 0 is a last resort, only picked (in priority order) when every weighted source is empty.
+    The fallback source, if given, is only used when every other source is empty.
+
+    Listeners registered with subscribe() are called as listener(song, source_name)
+    every time a song is picked. If prefetch is more than 0, the next `prefetch`
+    picks are worked out after every pick and kept in `upcoming_songs`."""
+
+    def __init__(self, sources, weights=None, prefetch=0, fallback=None):
+        self.sources = list(sources)
+        self.fallback = fallback
+        self.weights = weights
+        self.prefetch = prefetch
+        self.listeners = []
+        # The smooth weighted round robin credit of each source
+        self.credit = {source.name: 0 for source in self.sources}
+        self.upcoming_songs = []
+
+    def subscribe(self, listener):
+        """Registers a function to call with (song, source_name) for every song played."""
+        self.listeners.append(listener)
+
+    def next(self):
+        """Takes the next song. Returns (song, source_name), or (None, None) if every source is empty."""
+        source = self._pick(self.credit)
+        if source is None:
+            if self.fallback is None or self.fallback.is_empty():
+                return None, None
+            source = self.fallback
+        song = source.take()
+        self.notify(song, source.name)
+        return song, source.name
+
+    def replay(self, source_name, title):
+        """Takes the song a journaled next() picked: `title` from the source called source_name,
+        rather than whatever that source would give now (the party queue's order depends on
+        which votes have expired by now). The credit is updated as next() would have.
+        Returns the song, or None if the source doesn't have it."""
+        self._pick(self.credit)
+        source = next((source for source in self.sources if source.name == source_name), None)
+        song = source.take_title(title) if source is not None else None
+        if song is not None:
+            self.notify(song, source_name)
+        return song
+
+    def notify(self, song, source_name):
+        """Tells the listeners a song was played. next() does this itself; it is also for songs
+        played from a source directly, like when the journal replays an autoplay pick."""
+        for listener in self.listeners:
+            listener(song, source_name)
+        if self.prefetch:
+            self.upcoming_songs = self.upcoming(self.prefetch)
+
+    def save_state(self):
+        """Returns what the scheduler has to remember between picks as plain data (for a journal
+        snapshot): the round robin credit and the state of sources that have one, like shuffle play."""
+        return {"credit": dict(self.credit),
+                "sources": {source.name: source.save_state() for source in self.sources if hasattr(source, "save_state")}}
+
+    def load_state(self, state):
+        """Restores a state from save_state(), after the scheduler was built over the same sources."""
+        self.credit.update(state["credit"])
+        for source in self.sources:
+            if source.name in state["sources"]:
+                source.load_state(state["sources"][source.name])
+
+    def upcoming(self, k):
+        """Returns the next k (song, source_name) picks without taking anything or changing any state."""
+        peeked = {source.name: source.peek(k) for source in self.sources}
+        taken = {source.name: 0 for source in self.sources}
+        simulated = [PeekedSource(source.name, peeked[source.name], taken) for source in self.sources]
+        credit = dict(self.credit)
+        picks = []
+        while len(picks) < k:
+            source = self._pick(credit, simulated)
+            if source is None:
+                # When the other sources run out, the fallback's next pick (as things stand now) comes last.
+                if self.fallback is not None:
+                    picks.extend((song, self.fallback.name) for song in self.fallback.peek(1))
+                break
+            picks.append((peeked[source.name][taken[source.name]], source.name))
+            taken[source.name] += 1
+        return picks
+
+    def _pick(self, credit, sources=None):
+        """Returns the source to take the next song from, updating the credit if weights are used."""
+        sources = self.sources if sources is None else sources
+        if self.weights is None:
+            for source in sources:
+                if not source.is_empty():
+                    return source
+            return None
+
+        best = None
+        total = 0
+        for source in sources:
+            weight = self.weights.get(source.name, 1)
+            if weight <= 0 or source.is_empty():
+                continue
+            credit[source.name] += weight
+            total += weight
+            if best is None or credit[source.name] > credit[best.name]:
+                best = source
+        if best is None:
+            for source in sources:
+                if self.weights.get(source.name, 1) <= 0 and not source.is_empty():
+                    return source
+            return None
+        credit[best.name] -= total
+        return best
+
+class PeekedSource:
+    """Stands in for a source while upcoming() simulates picks from the songs it peeked."""
+    __slots__ = ("name", "songs", "taken")
+
+    def __init__(self, name, songs, taken):
+        self.name = name
+        self.songs = songs
+        self.taken = taken
+
+    def is_empty(self):
+        return self.taken[self.name] >= len(self.songs)
@@ -0,0 +1,271 @@
+# This file contains the song search: a prefix trie for autocomplete and a trigram index
+# for substring and fuzzy matches on titles and artists.
+# Both are updated one song at a time as songs are added, and hold library indices, not songs.
+
+from array import array
+from collections import Counter
+
+from .metrics import instrumented
+
+class PrefixTrie:
+    """A burst trie for autocomplete.
+    Keys are kept in small buckets. When a bucket gets bigger than `bucket_size`,
+    it "bursts": its node gets a child per next character and the keys move down a level.
+    So the trie only grows nodes where there are many keys, which keeps it small
+    for a million keys while every bucket stays quick to scan."""
+
+    def __init__(self, bucket_size=128):
+        self.bucket_size = bucket_size
+        # A node is a dict of character -> child node. The None entry holds the node's bucket
+        # (a list of (key, song id)) and the "" entry marks a node that has burst.
+        self.root = {}
+        # ids of the buckets that need sorting before the next query
+        self.unsorted = set()
+
+    def add(self, key, song_id):
+        """Adds a key for a song."""
+        node = self.root
+        depth = 0
+        while depth < len(key) and "" in node:
+            node = node.setdefault(key[depth], {})
+            depth += 1
+        bucket = node.setdefault(None, [])
+        bucket.append((key, song_id))
+        self.unsorted.add(id(bucket))
+        if "" not in node and len(bucket) > self.bucket_size:
+            self._burst(node, depth)
+
+    def complete(self, prefix, limit=10):
+        """Returns up to `limit` song IDs whose key starts with the prefix, in alphabetical order of key."""
+        node = self.root
+        depth = 0
+        while depth < len(prefix) and "" in node:
+            node = node.get(prefix[depth])
+            if node is None:
+                return []
+            depth += 1
+        results = []
+        if depth < len(prefix):
+            # We reached a bucket before using up the prefix, so check each key in it.
+            for key, song_id in self._bucket(node):
+                if key.startswith(prefix):
+                    results.append(song_id)
+                    if len(results) >= limit:
+                        break
+            return results
+        # Every key below this node starts with the prefix: walk it in alphabetical order.
+        self._collect(node, results, limit)
+        return results
+
+    def _burst(self, node, depth):
+        """Moves the keys of a full bucket down into child nodes by their next character."""
+        bucket = node.pop(None)
+        self.unsorted.discard(id(bucket))
+        node[""] = True
+        for key, song_id in bucket:
+            if len(key) == depth:
+                # The key ends here, so it stays in this node.
+                node.setdefault(None, []).append((key, song_id))
+            else:
+                child_bucket = node.setdefault(key[depth], {}).setdefault(None, [])
+                child_bucket.append((key, song_id))
+                self.unsorted.add(id(child_bucket))
+
+    def _collect(self, node, results, limit):
+        for key, song_id in self._bucket(node):
+            results.append(song_id)
+            if len(results) >= limit:
+                return
+        for char in sorted(char for char in node if char):
+            self._collect(node[char], results, limit)
+            if len(results) >= limit:
+                return
+
+    def _bucket(self, node):
+        bucket = node.get(None, [])
+        if id(bucket) in self.unsorted:
+            bucket.sort()
+            self.unsorted.discard(id(bucket))
+        return bucket
+
+class TrigramIndex:
+    """An inverted index from every three-character piece of a key to the songs containing it.
+    Song IDs are added in increasing order, so each list of IDs stays sorted."""
+
+    def __init__(self):
+        self.postings = {}
+
+    def add(self, key, song_id):
+        """Adds a key for a song."""
+        for trigram in set(trigrams(key)):
+            postings = self.postings.get(trigram)
+            if postings is None:
+                postings = self.postings[trigram] = array("I")
+            if not postings or postings[-1] != song_id:
+                postings.append(song_id)
+
+    def candidates(self, query):
+        """Returns the IDs of songs that might contain the query: those in the shortest
+        posting list among the query's trigrams. The caller checks each one."""
+        shortest = None
+        # The query can match anywhere in a key, so it isn't padded like the keys are.
+        for trigram in {query[i:i + 3] for i in range(len(query) - 2)}:
+            postings = self.postings.get(trigram)
+            if postings is None:
+                return []
+            if shortest is None or len(postings) < len(shortest):
+                shortest = postings
+        return shortest or []
+
+    def overlap(self, query, max_postings=20000):
+        """Counts, for each song, how many of the query's trigrams it shares.
+        Very common trigrams (more than max_postings songs) are ignored as they say little.
+        Returns (counts, number of trigrams in the query)."""
+        counts = Counter()
+        query_trigrams = set(trigrams(query))
+        for trigram in query_trigrams:
+            postings = self.postings.get(trigram)
+            if postings is not None and len(postings) <= max_postings:
+                counts.update(postings)
+        return counts, len(query_trigrams)
+
+def trigrams(text):
+    """Returns the three-character pieces of a text, padded so short words still have some."""
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def normalise(text):
+    """Case-folds a title or artist and tidies its spacing, so searches ignore case."""
+    return " ".join(text.casefold().split())
+
+@instrumented
+class SongSearch:
+    """Search over a growing song library by title and artist.
+    The index only keeps library indices and the normalised titles and artists, so songs in a
+    library file are not loaded to index them: a song is only read when it is returned.
+    Exact title lookups (like the ones upvote and the journal make) only need the title map,
+    so the trie and trigram index are built the first time a text search is made."""
+
+    def __init__(self, library):
+        self.library = library
+        self.keys = [] # library index -> (normalised title, normalised artist)
+        self.titles = {} # normalised title -> library index of the first song with that title
+        self.same_titles = {} # normalised title -> library indices of the other songs with that title
+        self.prefixes = PrefixTrie()
+        self.grams = TrigramIndex()
+        # The number of songs in the trie and trigram index so far
+        self.text_indexed = 0
+
+    def update(self):
+        """Indexes the library songs added since the last update.
+        Songs are only ever appended to the library, so the index just picks up where it left off."""
+        start = len(self.keys)
+        if start >= len(self.library):
+            return
+        if hasattr(self.library, "pairs"):
+            pairs = self.library.pairs(start)
+        else:
+            pairs = ((song.title, song.artist) for song in self.library[start:])
+        for title, artist in pairs:
+            self.add(title, artist)
+
+    def add(self, title, artist):
+        """Indexes the next library song by its title and artist."""
+        song_id = len(self.keys)
+        title = normalise(title)
+        artist = normalise(artist)
+        self.keys.append((title, artist))
+        if title in self.titles:
+            self.same_titles.setdefault(title, []).append(song_id)
+        else:
+            self.titles[title] = song_id
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, title):
+        """Returns the song with exactly this title (ignoring case), or None."""
+        song_id = self.titles.get(normalise(title))
+        return None if song_id is None else self.library[song_id]
+
+    def find_all(self, title):
+        """Returns every song with exactly this title (ignoring case), in library order."""
+        title = normalise(title)
+        first = self.titles.get(title)
+        if first is None:
+            return []
+        return [self.library[song_id] for song_id in (first, *self.same_titles.get(title, ()))]
+
+    def autocomplete(self, prefix, limit=10):
+        """Returns songs whose title or artist starts with the prefix."""
+        return self._songs(self._autocomplete(normalise(prefix), limit))
+
+    def substring(self, text, limit=10):
+        """Returns songs whose title or artist contains the text."""
+        return self._songs(self._substring(normalise(text), limit))
+
+    def fuzzy(self, text, limit=10):
+        """Returns the songs that share the most trigrams with the text, for misspelled searches.
+        A song has to share at least a third of the text's trigrams to count as a match."""
+        return self._songs(self._fuzzy(normalise(text), limit))
+
+    def search(self, text, limit=10):
+        """Returns the best matches for the text: exact title first, then titles or artists
+        starting with it, then ones containing it. Fuzzy matches are only used if nothing else matched."""
+        query = normalise(text)
+        results = []
+        exact = self.titles.get(query)
+        if exact is not None:
+            results.append(exact)
+        for finder in (self._autocomplete, self._substring):
+            if len(results) >= limit:
+                break
+            for song_id in finder(query, limit):
+                if song_id not in results:
+                    results.append(song_id)
+        if not results:
+            results = self._fuzzy(query, limit)
+        return self._songs(results[:limit])
+
+    def _index_text(self):
+        """Adds the songs indexed since the last text search to the trie and trigram index."""
+        for song_id in range(self.text_indexed, len(self.keys)):
+            title, artist = self.keys[song_id]
+            self.prefixes.add(title, song_id)
+            if artist:
+                self.prefixes.add(artist, song_id)
+            self.grams.add(title, song_id)
+            self.grams.add(artist, song_id)
+        self.text_indexed = len(self.keys)
+
+    def _autocomplete(self, query, limit):
+        self._index_text()
+        results = []
+        for song_id in self.prefixes.complete(query, limit * 2):
+            if song_id not in results:
+                results.append(song_id)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _substring(self, query, limit):
+        if len(query) < 3:
+            return self._autocomplete(query, limit)
+        self._index_text()
+        results = []
+        for song_id in self.grams.candidates(query):
+            title, artist = self.keys[song_id]
+            if query in title or query in artist:
+                results.append(song_id)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _fuzzy(self, query, limit):
+        self._index_text()
+        counts, total = self.grams.overlap(query)
+        return [song_id for song_id, count in counts.most_common(limit) if count * 3 >= total]
+
+    def _songs(self, song_ids):
+        """Returns the library songs for a list of library indices."""
+        return [self.library[song_id] for song_id in song_ids]
@@ -0,0 +1,49 @@
+# This file defines the song class, a simple data object.
+
+class ArtistTable:
+    """Keeps one shared copy of every artist name and gives each name a small number (its ID).
+    Thousands of songs by the same artist then point at the same string."""
+    __slots__ = ("names", "ids")
+
+    def __init__(self):
+        self.names = [] # ID -> artist name
+        self.ids = {} # artist name -> ID
+
+    def id_of(self, name):
+        """Returns the ID for an artist name, adding the name if it is new."""
+        artist_id = self.ids.get(name)
+        if artist_id is None:
+            artist_id = len(self.names)
+            self.names.append(name)
+            self.ids[name] = artist_id
+        return artist_id
+
+    def name_of(self, artist_id):
+        """Returns the artist name for an ID."""
+        return self.names[artist_id]
+
+    def intern(self, name):
+        """Returns the shared copy of an artist name."""
+        return self.names[self.id_of(name)]
+
+    def __len__(self):
+        return len(self.names)
+
+# The artist table shared by every song in the app.
+artists = ArtistTable()
+
+class Song:
+    """Represents a single song with a title and artist."""
+    # __slots__ stops every song from carrying its own __dict__, which saves a lot of memory.
+    __slots__ = ("title", "artist", "upvotes", "canonical_id")
+
+    def __init__(self, title, artist):
+        self.title = title
+        self.artist = artists.intern(artist)
+        self.upvotes = 0 #Added upvote counter for party mode
+        # The library index of the first version of this song, set by dedupe.py (None until then).
+        self.canonical_id = None
+
+    def __str__(self):
+        """String representation of the song."""
+        return f"{self.title} by {self.artist} (Upvotes: {self.upvotes})"
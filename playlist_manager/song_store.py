@@ -0,0 +1,88 @@
+# This file contains SongStore, a compact column-based way to hold a very large song catalogue.
+
+from array import array
+
+from .song import artists
+
+class SongView:
+    """A lightweight stand-in for a Song that reads its fields from a SongStore.
+    It behaves like a Song (title, artist, upvotes), but the data lives in the store's arrays."""
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def title(self):
+        return self.store.titles[self.index]
+
+    @property
+    def artist(self):
+        return artists.name_of(self.store.artist_ids[self.index])
+
+    @property
+    def upvotes(self):
+        return self.store.upvotes[self.index]
+
+    @upvotes.setter
+    def upvotes(self, value):
+        self.store.upvotes[self.index] = value
+
+    @property
+    def canonical_id(self):
+        canonical_id = self.store.canonical_ids[self.index]
+        return None if canonical_id < 0 else canonical_id
+
+    @canonical_id.setter
+    def canonical_id(self, value):
+        self.store.canonical_ids[self.index] = -1 if value is None else value
+
+    def __str__(self):
+        """String representation of the song."""
+        return f"{self.title} by {self.artist} (Upvotes: {self.upvotes})"
+
+class SongStore:
+    """Stores songs as columns instead of one object per song:
+    a list of titles, an array of artist IDs, an array of upvote counts and an array of
+    canonical IDs (-1 for none, see dedupe.py).
+    Song objects (views) are only created when a song is looked up."""
+
+    def __init__(self):
+        self.titles = []
+        self.artist_ids = array("I") # IDs from the shared artist table
+        self.upvotes = array("i")
+        self.canonical_ids = array("i")
+
+    def add(self, title, artist):
+        """Adds a song to the store and returns its index."""
+        self.titles.append(title)
+        self.artist_ids.append(artists.id_of(artist))
+        self.upvotes.append(0)
+        self.canonical_ids.append(-1)
+        return len(self.titles) - 1
+
+    def add_song(self, song):
+        """Copies an existing Song into the store and returns its index."""
+        index = self.add(song.title, song.artist)
+        self.upvotes[index] = song.upvotes
+        if song.canonical_id is not None:
+            self.canonical_ids[index] = song.canonical_id
+        return index
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, index):
+        """Returns a view of the song at an index, or a list of views for a slice."""
+        if isinstance(index, slice):
+            return [SongView(self, i) for i in range(*index.indices(len(self.titles)))]
+        if index < 0:
+            index += len(self.titles)
+        if not 0 <= index < len(self.titles):
+            raise IndexError("song index out of range")
+        return SongView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.titles)):
+            yield SongView(self, index)
@@ -0,0 +1,221 @@
+# This file contains the implementation of a stack for the playlist history.
+
+import json
+import os
+import time
+from collections import Counter
+
+from .metrics import instrumented
+from .song import Song
+
+@instrumented
+class PlaybackHistory:
+    """A stack to keep track of recently played songs.
+
+    The most recent plays are kept in a fixed-size ring buffer, so the history never grows
+    without limit. When the buffer is full, the oldest play is dropped, or written to a log
+    on disk if spill_dir is given. The log is split into segment files, and we remember the
+    time range of each segment so time queries only read the segments they need."""
+
+    def __init__(self, capacity=1000, spill_dir=None, segment_size=10000):
+        self.capacity = capacity
+        # The ring buffer of (timestamp, song) entries; `start` is the oldest entry.
+        # It grows as songs are played until it reaches capacity, so an unused history
+        # (like one per room) takes almost no memory.
+        self.history = []
+        self.start = 0
+        self.count = 0
+        # Play counts per (title, artist), kept up to date as songs are pushed.
+        self.play_counts = Counter()
+
+        self.spill_dir = spill_dir
+        self.segment_size = segment_size
+        # One [path, first timestamp, last timestamp, entry count] per segment, oldest first.
+        self.segments = []
+        # Segments from an earlier run that haven't been added to play_counts yet.
+        self.uncounted_segments = []
+        self.segment_file = None
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._index_segments()
+
+    def push(self, song, timestamp=None):
+        """Adds a song to the history stack, with the time it was played (defaults to now)."""
+        if timestamp is None:
+            timestamp = time.time()
+        if self.count == self.capacity:
+            # The buffer is full: the oldest entry makes room for the new one.
+            self._spill(self.history[self.start])
+            self.history[self.start] = (timestamp, song)
+            self.start = (self.start + 1) % self.capacity
+        else:
+            index = (self.start + self.count) % self.capacity
+            if index < len(self.history):
+                self.history[index] = (timestamp, song)
+            else:
+                self.history.append((timestamp, song))
+            self.count += 1
+        self.play_counts[(song.title, song.artist)] += 1
+
+    def pop(self):
+        """Removes and returns the last played song from history.
+        Only the plays still in memory can be popped."""
+        if self.count:
+            self.count -= 1
+            index = (self.start + self.count) % self.capacity
+            timestamp, song = self.history[index]
+            self.history[index] = None
+            key = (song.title, song.artist)
+            self.play_counts[key] -= 1
+            if not self.play_counts[key]:
+                del self.play_counts[key]
+            return song
+        return None
+    
+    def is_empty(self):
+        """Checks if the history stack is empty."""
+        return self.count == 0 and not self.segments
+
+    def __len__(self):
+        """The number of plays in memory and on disk."""
+        return self.count + sum(segment[3] for segment in self.segments)
+
+    def __iter__(self):
+        """Iterates over the songs still in memory, oldest first."""
+        for timestamp, song in self.entries():
+            yield song
+
+    def entries(self):
+        """Iterates over the plays still in memory as (timestamp, song) pairs, oldest first."""
+        for i in range(self.count):
+            yield self.history[(self.start + i) % self.capacity]
+
+    def last(self, n):
+        """Returns the last n plays as (timestamp, song) pairs, most recent first.
+        Only the newest segments on disk are read, and only if memory doesn't have enough."""
+        results = [self.history[(self.start + i) % self.capacity] for i in range(self.count - 1, max(self.count - n, 0) - 1, -1)]
+        for segment in reversed(self.segments):
+            if len(results) >= n:
+                break
+            entries = list(self._read_segment(segment[0]))
+            results.extend(reversed(entries[-(n - len(results)):]))
+        return results
+
+    def between(self, start_time, end_time):
+        """Returns the plays from start_time to end_time (inclusive) as (timestamp, song) pairs, oldest first.
+        Segments that end before start_time or begin after end_time are skipped without being read."""
+        results = []
+        for path, first, last, count in self.segments:
+            if last >= start_time and first <= end_time:
+                results.extend(entry for entry in self._read_segment(path) if start_time <= entry[0] <= end_time)
+        for i in range(self.count):
+            entry = self.history[(self.start + i) % self.capacity]
+            if start_time <= entry[0] <= end_time:
+                results.append(entry)
+        return results
+
+    def play_count(self, title, artist):
+        """Returns how many times a song has been played."""
+        if self.uncounted_segments:
+            # Count the plays logged by an earlier run, reading one line at a time.
+            for path in self.uncounted_segments:
+                for timestamp, song in self._read_segment(path):
+                    self.play_counts[(song.title, song.artist)] += 1
+            self.uncounted_segments = []
+        return self.play_counts[(title, artist)]
+
+    def close(self):
+        """Closes the open segment file, if any, and records it as finished."""
+        if self.segment_file:
+            self.segment_file.close()
+            self.segment_file = None
+            self._record_segment(self.segments[-1])
+
+    def view_history(self, limit=20):
+        """Displays the most recent plays, from most recent to oldest."""
+        if self.is_empty():
+            print("History is empty.")
+            return
+        
+        print("\n--- Playback History (Most Recent First) ---")
+        for i, (timestamp, song) in enumerate(self.last(limit)):
+            played_at = time.strftime("%H:%M:%S", time.localtime(timestamp))
+            print(f"{i+1}. [{played_at}] {song}")
+        if len(self) > limit:
+            print(f"... and {len(self) - limit} older plays")
+        print("------------------------------------------")   
+
+    def _spill(self, entry):
+        """Appends an entry that no longer fits in memory to the current segment file on disk."""
+        if not self.spill_dir:
+            return
+        timestamp, song = entry
+        if self.segment_file is None or self.segments[-1][3] >= self.segment_size:
+            self._start_segment(timestamp)
+        self.segment_file.write(json.dumps([timestamp, song.title, song.artist]) + "\n")
+        segment = self.segments[-1]
+        segment[2] = timestamp
+        segment[3] += 1
+
+    def _start_segment(self, timestamp):
+        self.close()
+        path = os.path.join(self.spill_dir, f"history-{len(self.segments) + 1:08d}.log")
+        self.segment_file = open(path, "a", encoding="utf-8")
+        self.segments.append([path, timestamp, timestamp, 0])
+
+    def _read_segment(self, path):
+        """Yields the (timestamp, song) entries of one segment file."""
+        if self.segment_file:
+            self.segment_file.flush()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                timestamp, title, artist = json.loads(line)
+                yield timestamp, Song(title, artist)
+
+    def _index_segments(self):
+        """Finds the segment files left by an earlier run and records their time ranges.
+        Finished segments are listed in segments.idx, so only a segment that was still
+        being written when the app stopped has to be read."""
+        finished = {}
+        index_path = os.path.join(self.spill_dir, "segments.idx")
+        if os.path.exists(index_path):
+            self._cut_torn_line(index_path)
+            with open(index_path, encoding="utf-8") as f:
+                for line in f:
+                    name, first, last, count = json.loads(line)
+                    finished[name] = [os.path.join(self.spill_dir, name), first, last, count]
+        for name in sorted(os.listdir(self.spill_dir)):
+            if not (name.startswith("history-") and name.endswith(".log")):
+                continue
+            segment = finished.get(name)
+            if segment is None:
+                path = os.path.join(self.spill_dir, name)
+                self._cut_torn_line(path)
+                timestamps = [timestamp for timestamp, song in self._read_segment(path)]
+                if not timestamps:
+                    continue
+                segment = [path, timestamps[0], timestamps[-1], len(timestamps)]
+                self._record_segment(segment)
+            self.segments.append(segment)
+            self.uncounted_segments.append(segment[0])
+
+    def _cut_torn_line(self, path):
+        """Cuts off a last line that was only partly written when the app stopped, so reading
+        the file doesn't fail and the next line appended to it starts on a line of its own."""
+        with open(path, "rb+") as f:
+            size = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                size += len(line)
+            f.truncate(size)
+
+    def _record_segment(self, segment):
+        """Adds a finished segment to segments.idx."""
+        path, first, last, count = segment
+        with open(os.path.join(self.spill_dir, "segments.idx"), "a", encoding="utf-8") as f:
+            f.write(json.dumps([os.path.basename(path), first, last, count]) + "\n")
@@ -0,0 +1,66 @@
+from playlist_manager.app import MusicManager
+from playlist_manager.song import Song
+
+
+def make_manager(songs):
+    manager = MusicManager(autoplay=False)
+    manager.song_library = songs
+    manager.search = None
+    return manager
+
+
+def test_digit_titles_are_found_before_library_numbers():
+    songs = [Song("Stay", "Blackpink"), Song("1999", "Prince"), Song("Blue", "Yung Kai")]
+    commands = make_manager(songs).commands
+    assert commands.resolve_song("1999")[0] is songs[1]
+    assert commands.resolve_song("2")[0] is songs[1]
+    assert commands.resolve_song("#1")[0] is songs[0]
+    assert commands.resolve_song(3)[0] is songs[2]
+    assert commands.resolve_song("#1999")[0] is None
+    assert commands.execute("add 1999").data["title"] == "1999"
+    assert commands.execute("add #3").data["title"] == "Blue"
+
+
+def test_exact_lookup_checks_every_song_with_the_title():
+    songs = [Song("Intro", f"Artist {i}") for i in range(200)]
+    commands = make_manager(songs).commands
+    assert commands.resolve_song(["Intro", "Artist 150"])[0] is songs[150]
+    assert commands.resolve_song(["Intro", "Nobody"])[0] is None
+
+
+def test_quoted_titles_keep_the_arguments_after_them():
+    songs = [Song("Die with a smile", "Bruno Mars"), Song("Stay", "Blackpink")]
+    manager = make_manager(songs)
+    commands = manager.commands
+    assert commands.execute("party Die with a smile").ok
+    result = commands.execute('upvote "Die with a smile" 5')
+    assert result.ok and result.data["upvotes"] == 5
+    assert commands.execute("upvote Die with a smile").data["upvotes"] == 6
+    assert commands.execute("upvote 'Stay' 2").data["upvotes"] == 2
+    assert not commands.execute('upvote "Stay" 0').ok
+    assert not commands.execute('upvote "Stay" lots').ok
+
+
+def test_history_view_has_a_default_page_size():
+    songs = [Song(f"Song {i}", "") for i in range(30)]
+    manager = make_manager(songs)
+    for song in songs:
+        manager.history.push(song)
+    entries = manager.commands.view("history").data
+    assert len(entries) == 20
+    assert entries[0]["title"] == "Song 29"
+    assert len(manager.commands.view("history", 25).data) == 25
+
+
+def test_library_votes_stay_in_their_room():
+    manager = MusicManager(autoplay=False)
+    song = manager.song_library[0]
+    assert manager.commands.upvote(song.title, 5).data["upvotes"] == 5
+    assert song.upvotes == 0
+    manager.commands.room("b")
+    result = manager.commands.party(song.title)
+    assert result.data["upvotes"] == 0
+    assert manager.party_queue.upvotes(song.title) == 0
+    manager.commands.room("main")
+    manager.commands.party(song.title)
+    assert manager.party_queue.upvotes(song.title) == 5
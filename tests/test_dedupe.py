@@ -0,0 +1,75 @@
+import pytest
+
+from playlist_manager import dedupe
+from playlist_manager.app import MusicManager
+from playlist_manager.dedupe import assign_canonical_ids, find_duplicates, normalise_artist, normalise_title
+from playlist_manager.song import Song
+
+
+@pytest.mark.parametrize("title", [
+    "Stay (Remastered 2011)", "Stay [2011 Remaster]", "Stay - Live", "Stay (Live at Wembley)",
+    "Stay (feat. Justin Bieber)", "Stay (with Justin Bieber)", "Stay ft. Justin Bieber", "STAY (Radio Edit)",
+    "Stay - Live from Tokyo", "Stay (Acoustic Version)",
+])
+def test_version_tags_are_removed(title):
+    assert normalise_title(title) == "stay"
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Stay (With Me)", "stay with me"),
+    ("Stay (Live Forever)", "stay live forever"),
+    ("Stay - Live Forever", "stay live forever"),
+    ("Stay (Withering)", "stay withering"),
+    ("Stay - With You", "stay with you"),
+    ("Live and Let Die", "live and let die"),
+])
+def test_words_that_only_look_like_tags_are_kept(title, expected):
+    assert normalise_title(title) == expected
+
+
+def test_artists_are_normalised():
+    assert normalise_artist("The Kid LAROI & Justin Bieber") == normalise_artist("Kid Laroi and justin bieber")
+    assert normalise_artist("Beyoncé feat. Jay-Z") == "beyonce"
+
+
+def test_every_bucket_member_is_compared(monkeypatch):
+    # With one band of one value, all three titles share a bucket. Only the last two are alike,
+    # so comparing each key with just the first one in its bucket would find no duplicates.
+    signatures = [b"\0" * 4 + letter * 116 for letter in (b"a", b"b", b"c")]
+    signed = [("zzzz", "a", signatures[0]), ("birds", "a", signatures[1]), ("birdz", "a", signatures[2])]
+    monkeypatch.setattr(dedupe, "BANDS", 1)
+    monkeypatch.setattr(dedupe, "ROWS", 1)
+    monkeypatch.setattr(dedupe, "sign_all", lambda pairs, workers=None: iter(signed))
+    monkeypatch.setattr(dedupe, "similarity", lambda first, second: float({first, second} == set(signatures[1:])))
+    groups, roots = find_duplicates([Song(title, artist) for title, artist, sig in signed], workers=1)
+    assert groups == [[1, 2]]
+
+
+def test_versions_are_grouped_by_artist():
+    songs = [Song("Stay", "Blackpink"), Song("Stay (Remastered)", "BLACKPINK"), Song("Stay", "Rihanna"),
+             Song("Birds of a Feather", "Billie Eilish"), Song("Birds of a Feather - Live", "Billie Eilish"),
+             Song("Stay (With Me)", "Blackpink")]
+    groups = assign_canonical_ids(songs, workers=1)
+    assert sorted(groups) == [[0, 1], [3, 4]]
+    assert [song.canonical_id for song in songs] == [0, 0, 2, 3, 3, 5]
+
+
+def test_playlists_recount_versions_after_dedupe():
+    manager = MusicManager(autoplay=False)
+    manager.song_library = [Song("Stay", "Blackpink"), Song("Stay (Remastered)", "Blackpink"), Song("Pretty", "JVKE")]
+    manager.search = None
+    assert manager.commands.add("Stay").ok
+    assert manager.commands.add("Pretty").ok
+    manager.dedupe_library(workers=1)
+    assert not manager.commands.add("Stay (Remastered)").ok
+    assert manager.commands.remove("Stay").ok
+    assert dict(manager.playlist.canonical) == {2: 1}
+    assert manager.commands.add("Stay (Remastered)").ok
+
+
+def test_titles_without_words_are_not_all_duplicates():
+    assert normalise_title(" (Live) ") == "(live)"
+    songs = [Song("🔥", "Artist"), Song("💔", "Artist"), Song("!!!", "Artist"), Song("???", "Artist"),
+             Song("(Live)", "Artist"), Song("(Remastered)", "Artist"), Song("🔥", "ARTIST")]
+    groups = assign_canonical_ids(songs, workers=1)
+    assert groups == [[0, 6]]
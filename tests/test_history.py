@@ -0,0 +1,53 @@
+import os
+
+from playlist_manager.song import Song
+from playlist_manager.stack import PlaybackHistory
+
+
+def test_ring_buffer_spills_to_segments_and_queries_them(tmp_path):
+    history = PlaybackHistory(capacity=3, spill_dir=str(tmp_path), segment_size=2)
+    songs = [Song(f"Song {i}", "Artist") for i in range(8)]
+    for i, song in enumerate(songs):
+        history.push(song, timestamp=100 + i)
+    assert len(history) == 8
+    assert [song.title for song in history] == ["Song 5", "Song 6", "Song 7"]
+    assert [timestamp for timestamp, song in history.last(5)] == [107, 106, 105, 104, 103]
+    assert [song.title for timestamp, song in history.between(102, 105)] == ["Song 2", "Song 3", "Song 4", "Song 5"]
+    history.close()
+
+    reopened = PlaybackHistory(capacity=3, spill_dir=str(tmp_path), segment_size=2)
+    assert len(reopened) == 5
+    assert reopened.play_count("Song 0", "Artist") == 1
+
+
+def test_pop_takes_the_play_off_the_counts():
+    history = PlaybackHistory()
+    song = Song("Stay", "Blackpink")
+    history.push(song)
+    history.push(song)
+    assert history.play_count("Stay", "Blackpink") == 2
+    assert history.pop() is song
+    assert history.play_count("Stay", "Blackpink") == 1
+    history.pop()
+    assert history.play_count("Stay", "Blackpink") == 0
+    assert history.pop() is None
+
+
+def test_a_torn_last_line_is_cut_off_at_startup(tmp_path):
+    history = PlaybackHistory(capacity=1, spill_dir=str(tmp_path), segment_size=10)
+    for i in range(4):
+        history.push(Song(f"Song {i}", "Artist"), timestamp=100 + i)
+    # The app stops while a line is being written, before the segment is recorded as finished.
+    history.segment_file.write('[103, "Song')
+    history.segment_file.flush()
+
+    reopened = PlaybackHistory(capacity=1, spill_dir=str(tmp_path), segment_size=10)
+    assert [song.title for timestamp, song in reopened.last(10)] == ["Song 2", "Song 1", "Song 0"]
+
+    # The same for segments.idx.
+    with open(os.path.join(tmp_path, "segments.idx"), "a", encoding="utf-8") as f:
+        f.write('["history-0000')
+    reopened = PlaybackHistory(capacity=1, spill_dir=str(tmp_path), segment_size=10)
+    assert len(reopened) == 3
+    with open(os.path.join(tmp_path, "segments.idx"), encoding="utf-8") as f:
+        assert all(line.endswith("\n") for line in f)
@@ -0,0 +1,50 @@
+import os
+
+from playlist_manager.doubly_linked_list import DoublyLinkedList
+from playlist_manager.importer import bulk_import, read_catalogue
+from playlist_manager.song import Song
+
+
+def write(tmp_path, name, text):
+    path = os.path.join(tmp_path, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def test_jsonl_bad_lines_are_skipped(tmp_path):
+    path = write(tmp_path, "songs.jsonl", "\n".join([
+        '{"title": "Stay", "artist": "Blackpink"}',
+        '["not", "an", "object"]',
+        '{"title": null, "artist": "Nobody"}',
+        '{"title": 1999, "artist": "Prince"}',
+        '{"title": "Alone"}',
+        '{"title": "Numbers", "artist": 7}',
+        'not json at all',
+        '{"title": "Stay", "artist": "BLACKPINK"}',
+    ]) + "\n")
+    library = []
+    assert bulk_import(read_catalogue(path), library) == (3, 5)
+    assert [(song.title, song.artist) for song in library] == [("Stay", "Blackpink"), ("Alone", ""), ("Numbers", "")]
+
+
+def test_csv_with_and_without_header(tmp_path):
+    with_header = write(tmp_path, "a.csv", "artist,title\nBTS,Dynamite\nJVKE\n,\n")
+    without_header = write(tmp_path, "b.csv", "Dynamite,BTS\nPretty,JVKE\n")
+    library = []
+    playlist = DoublyLinkedList()
+    assert bulk_import(read_catalogue(with_header), library, playlist) == (1, 2)
+    assert bulk_import(read_catalogue(without_header), library, playlist) == (1, 1)
+    assert [(song.title, song.artist) for song in library] == [("Dynamite", "BTS"), ("Pretty", "JVKE")]
+    assert playlist.size == 2
+
+
+def test_m3u_uses_extinf_or_file_name(tmp_path):
+    path = write(tmp_path, "list.m3u", "#EXTM3U\n#EXTINF:200,Bruno Mars - Die with a smile\nsong1.mp3\n"
+                                       "music/Yung Kai - Blue.mp3\n")
+    assert list(read_catalogue(path)) == [("Die with a smile", "Bruno Mars"), ("Blue", "Yung Kai")]
+
+
+def test_existing_library_songs_are_not_imported_again():
+    library = [Song("Stay", "Blackpink")]
+    assert bulk_import([("  stay ", "blackpink"), ("", "x")], library) == (0, 2)
@@ -0,0 +1,122 @@
+import os
+import time
+
+from playlist_manager.app import MusicManager
+from playlist_manager.journal import Journal
+
+
+def start(journal_dir, **options):
+    manager = MusicManager(journal_dir=str(journal_dir), autoplay=False, **options)
+    manager.start_session()
+    return manager
+
+
+def crash(manager):
+    """Stops a manager without the final snapshot, as if the process died."""
+    manager.journal.close()
+
+
+def test_commands_are_replayed_after_a_crash(tmp_path):
+    manager = start(tmp_path)
+    manager.commands.add("#5")
+    manager.commands.enqueue("#7")
+    manager.commands.next()
+    manager.commands.party("#8")
+    crash(manager)
+
+    recovered = start(tmp_path)
+    assert [node.song.title for node in recovered.playlist._nodes()] == \
+        [node.song.title for node in manager.playlist._nodes()]
+    assert recovered.playlist.current.song.title == manager.playlist.current.song.title
+    assert [song.title for song in recovered.history] == [song.title for song in manager.history]
+    assert [song.title for song, upvotes in recovered.party_queue.ranked()] == [manager.song_library[7].title]
+
+
+def test_replayed_votes_keep_the_time_they_were_cast(tmp_path, monkeypatch):
+    wall = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: wall[0])
+    manager = start(tmp_path, party_options={"half_life": 10})
+    title = manager.song_library[0].title
+    manager.commands.party("#1")
+    manager.commands.upvote(title, 4)
+    crash(manager)
+
+    # Recovered 20 seconds (two half-lives) later: the 4 votes are worth 1 now, not 4.
+    wall[0] = 1020.0
+    recovered = start(tmp_path, party_options={"half_life": 10})
+    assert recovered.party_queue.upvotes(title) == 1.0
+
+
+def test_replayed_votes_outside_the_window_have_expired(tmp_path, monkeypatch):
+    wall = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: wall[0])
+    manager = start(tmp_path, party_options={"window": 30})
+    titles = [manager.song_library[i].title for i in range(2)]
+    manager.commands.party("#1")
+    manager.commands.party("#2")
+    manager.commands.upvote(titles[0], 5)
+    wall[0] = 1020.0
+    manager.commands.upvote(titles[1], 2)
+    crash(manager)
+
+    wall[0] = 1040.0
+    recovered = start(tmp_path, party_options={"window": 30})
+    assert recovered.party_queue.upvotes(titles[0]) == 0
+    assert recovered.party_queue.upvotes(titles[1]) == 2
+
+
+def test_a_quiet_journal_is_synced_by_the_timer(tmp_path, monkeypatch):
+    manager = MusicManager(autoplay=False)
+    journal = Journal(manager, str(tmp_path), sync_every=1000, sync_interval=0.05)
+    journal.start()
+    journal.sync()
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+    journal.record("next")
+    assert journal.pending == 1 and not synced
+    deadline = time.monotonic() + 2
+    while journal.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert journal.pending == 0 and len(synced) == 1
+    journal.close()
+
+
+def test_snapshots_keep_shuffle_play_and_the_round_robin_credit(tmp_path):
+    options = {"weights": {"party": 1, "playlist": 2}}
+    reference = MusicManager(autoplay=False, **options)
+    reference.start_session()
+    manager = start(tmp_path, snapshot_every=3, **options)
+    commands = ["add #4", "add #5", "add #6", "add #7", "add #8", "party #9", "party #10", "enqueue #1",
+                "shuffle --lazy 7", "next", "next"]
+    for line in commands:
+        assert reference.commands.execute(line).ok
+        assert manager.commands.execute(line).ok
+    # Snapshots were taken along the way (one right after the shuffle), and play carries on as if they weren't.
+    assert manager.journal.snapshot_sequence == 9
+    played = [reference.commands.next().data["title"] for _ in range(3)]
+    assert [manager.commands.next().data["title"] for _ in range(3)] == played
+    assert manager.journal.snapshot_sequence == 12
+    crash(manager)
+
+    recovered = start(tmp_path, **options)
+    upcoming = [reference.commands.next().data["title"] for _ in range(3)]
+    assert [recovered.commands.next().data["title"] for _ in range(3)] == upcoming
+
+
+def test_replayed_next_plays_the_song_that_was_played(tmp_path, monkeypatch):
+    wall = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: wall[0])
+    manager = start(tmp_path, party_options={"window": 30})
+    quiet, voted = manager.song_library[8].title, manager.song_library[9].title
+    manager.commands.party("#9")
+    manager.commands.party("#10")
+    manager.commands.upvote(voted, 5)
+    assert manager.commands.next().data["title"] == voted
+    crash(manager)
+
+    # By now the votes have expired, but the song they made play next was still played.
+    wall[0] = 1100.0
+    recovered = start(tmp_path, party_options={"window": 30})
+    assert [song.title for song in recovered.history][-1] == voted
+    assert [song.title for song, upvotes in recovered.party_queue.ranked()] == [quiet]
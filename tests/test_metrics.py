@@ -0,0 +1,69 @@
+import json
+import time
+
+import pytest
+
+from playlist_manager import metrics
+from playlist_manager.app import MusicManager, main
+
+
+@metrics.instrumented
+class Slow:
+    def items(self, count):
+        for i in range(count):
+            time.sleep(0.002)
+            yield i
+
+    def call(self):
+        return 42
+
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_generator_methods_are_timed_while_iterating(enabled):
+    slow = Slow()
+    assert slow.call() == 42
+    generator = slow.items(5)
+    assert metrics.operations["Slow.items"].count == 0
+    assert list(generator) == [0, 1, 2, 3, 4]
+    stats = metrics.operations["Slow.items"]
+    assert stats.count == 1
+    assert stats.total_ns >= 5 * 2_000_000
+
+    # A generator that is closed early is recorded too, with the time it ran for.
+    partial = slow.items(100)
+    next(partial)
+    partial.close()
+    assert stats.count == 2
+    assert stats.total_ns < 50 * 2_000_000
+
+
+def test_disable_restores_the_original_methods(enabled):
+    assert vars(Slow)["call"].__wrapped__.__code__.co_name == "call"
+    metrics.disable()
+    assert not hasattr(vars(Slow)["call"], "__wrapped__")
+    Slow().call()
+    assert metrics.operations["Slow.call"].count == 0
+
+
+def test_metrics_are_written_when_the_session_fails(tmp_path, monkeypatch):
+    def crash(self):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(MusicManager, "run", crash)
+    path = tmp_path / "metrics.json"
+    try:
+        with pytest.raises(RuntimeError):
+            main(["--metrics", str(path), "--no-autoplay"])
+        assert path.exists()
+        json.loads(path.read_text())
+    finally:
+        metrics.disable()
+        metrics.reset()
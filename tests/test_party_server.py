@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+from playlist_manager.app import MusicManager
+from playlist_manager.party_server import PartyServer
+
+
+def make_server(**options):
+    manager = MusicManager(autoplay=False)
+    server = PartyServer(manager, **options)
+    return manager, server
+
+
+def test_upvotes_ignore_case_and_are_batched():
+    manager, server = make_server()
+    title = manager.song_library[0].title
+
+    async def scenario():
+        assert (await server.handle_request({"op": "enqueue", "title": title.upper()}))["ok"]
+        votes = [asyncio.create_task(server.handle_request({"op": "upvote", "title": spelling}, "guest"))
+                 for spelling in (title, title.lower(), title.upper())]
+        await asyncio.sleep(0)
+        assert server.pending_votes == {title: 3}
+        server.apply_votes()
+        return [await vote for vote in votes]
+
+    responses = asyncio.run(scenario())
+    assert all(response["ok"] and response["title"] == title for response in responses)
+    assert manager.party_queue.upvotes(title) == 3
+
+
+def test_bad_fields_are_named():
+    manager, server = make_server()
+
+    async def scenario():
+        return [await server.handle_request(request) for request in [
+            {"op": "upvote", "title": 7},
+            {"op": "enqueue", "title": None},
+            {"op": "enqueue"},
+            {"op": "view", "limit": "lots"},
+            {"op": "view", "limit": -1},
+        ]]
+
+    responses = asyncio.run(scenario())
+    assert [response["ok"] for response in responses] == [False] * 5
+    assert all("'title'" in response["error"] for response in responses[:3])
+    assert all("'limit'" in response["error"] for response in responses[3:])
+
+
+def test_a_connection_keeps_its_first_guest_name():
+    manager, server = make_server(vote_rate=0.001, vote_burst=1)
+    title = manager.song_library[0].title
+
+    async def scenario():
+        listener = await asyncio.start_server(server.handle_guest, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        applier = asyncio.create_task(server.apply_votes_forever())
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async def send(request):
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        responses = [
+            await send({"op": "enqueue", "title": title}),
+            await send({"op": "upvote", "title": title, "guest": "ann"}),
+            await send({"op": "upvote", "title": title, "guest": "bob"}),
+            await send({"op": "upvote", "title": title, "guest": "ann"}),
+            await send(["not", "an", "object"]),
+        ]
+        writer.close()
+        applier.cancel()
+        listener.close()
+        await listener.wait_closed()
+        return responses
+
+    enqueued, first, renamed, limited, bad = asyncio.run(scenario())
+    assert enqueued["ok"] and first["ok"]
+    assert not renamed["ok"] and "'ann'" in renamed["error"]
+    assert not limited["ok"] and "retry_after" in limited
+    assert not bad["ok"]
+
+
+def test_reconnecting_does_not_reset_the_vote_limit():
+    manager, server = make_server(vote_rate=0.001, vote_burst=1)
+    title = manager.song_library[0].title
+
+    async def scenario():
+        listener = await asyncio.start_server(server.handle_guest, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        applier = asyncio.create_task(server.apply_votes_forever())
+
+        async def send_once(request):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            writer.close()
+            return response
+
+        responses = [
+            await send_once({"op": "enqueue", "title": title}),
+            await send_once({"op": "upvote", "title": title}),
+            await send_once({"op": "upvote", "title": title}),
+            await send_once({"op": "upvote", "title": title, "guest": "ann"}),
+            await send_once({"op": "upvote", "title": title, "guest": "ann"}),
+        ]
+        applier.cancel()
+        listener.close()
+        await listener.wait_closed()
+        return responses
+
+    enqueued, first, again, named, named_again = asyncio.run(scenario())
+    assert enqueued["ok"] and first["ok"]
+    # A new connection from the same address shares the address's allowance.
+    assert not again["ok"] and "retry_after" in again
+    # A named guest at that address has an allowance of their own, kept across connections too.
+    assert named["ok"]
+    assert not named_again["ok"]
+    assert sorted(server.limiter.refill_times) == ["127.0.0.1", "127.0.0.1/ann"]
@@ -0,0 +1,128 @@
+import os
+
+from playlist_manager.app import MusicManager
+from playlist_manager.importer import bulk_import
+from playlist_manager.persistence import LibraryFile, save_library
+from playlist_manager.song import Song
+
+
+def make_library_file(tmp_path, count=100):
+    path = os.path.join(tmp_path, "library.bin")
+    songs = [Song(f"Song {i}", f"Artist {i % 7}") for i in range(count)]
+    songs[3].upvotes = 5
+    save_library(path, songs)
+    return path, songs
+
+
+def test_library_file_round_trip(tmp_path):
+    path, songs = make_library_file(tmp_path)
+    library = LibraryFile(path)
+    assert len(library) == len(songs)
+    assert library.songs == {}
+    assert (library[3].title, library[3].artist, library[3].upvotes) == ("Song 3", "Artist 3", 5)
+    assert library[3] is library[3]
+    assert library[-1].title == "Song 99"
+    assert [song.title for song in library[10:13]] == ["Song 10", "Song 11", "Song 12"]
+    assert library.index_of(library[42]) == 42
+    library.close()
+
+
+def test_importing_into_a_library_file_does_not_load_it(tmp_path):
+    path, songs = make_library_file(tmp_path)
+    library = LibraryFile(path)
+    library[0]
+    rows = [("Song 5", "Artist 5"), ("New Song", "New Artist"), ("new song", "new artist")]
+    assert bulk_import(rows, library) == (1, 2)
+    # Only the song looked up above and the new one have Song objects.
+    assert sorted(library.songs) == [0, 100]
+    assert len(library) == 101
+    assert library[100].title == "New Song"
+    assert library.index_of(library[100]) == 100
+    assert list(library.pairs())[-1] == ("New Song", "New Artist")
+    library.close()
+
+
+def test_session_round_trip_with_a_library_file(tmp_path):
+    path, songs = make_library_file(tmp_path)
+    session = os.path.join(tmp_path, "session.bin")
+    manager = MusicManager(library_path=path, autoplay=False)
+    for number in ["5", "9", "2"]:
+        manager.commands.add(number)
+    manager.commands.next()
+    manager.commands.enqueue("7")
+    manager.commands.party("8")
+    manager.commands.party("10")
+    manager.commands.upvote("Song 9", 3)
+    manager.commands.next()
+    manager.save_session(session)
+
+    restored = MusicManager(library_path=path, autoplay=False)
+    restored.load_session(session)
+    assert [node.song.title for node in restored.playlist._nodes()] == ["Song 4", "Song 8", "Song 1"]
+    assert restored.playlist.current.song.title == manager.playlist.current.song.title
+    assert [(timestamp, song.title) for timestamp, song in restored.history.entries()] == \
+        [(timestamp, song.title) for timestamp, song in manager.history.entries()]
+    assert [song.title for song in restored.play_next_queue] == [song.title for song in manager.play_next_queue]
+    assert [(song.title, count) for song, count in restored.party_queue.ranked()] == [("Song 7", 0)]
+
+
+def test_decayed_party_scores_are_saved_without_rounding(tmp_path):
+    now = [0.0]
+    manager = MusicManager(autoplay=False, party_options={"half_life": 10})
+    manager.party_queue.clock = lambda: now[0]
+    manager.party_queue.epoch = 0.0
+    manager.commands.party("1")
+    title = manager.song_library[0].title
+    manager.commands.upvote(title, 1)
+    now[0] = 15.0
+    score = manager.party_queue.upvotes(title)
+    assert 0 < score < 1
+    session = os.path.join(tmp_path, "session.bin")
+    manager.save_session(session)
+
+    restored = MusicManager(autoplay=False, party_options={"half_life": 10})
+    restored.party_queue.clock = lambda: now[0]
+    restored.load_session(session)
+    assert restored.party_queue.upvotes(title) == score
+
+
+def test_library_votes_are_saved_with_the_room(tmp_path):
+    path, songs = make_library_file(tmp_path)
+    session = os.path.join(tmp_path, "session.bin")
+    manager = MusicManager(library_path=path, autoplay=False)
+    manager.commands.upvote("Song 3", 2)
+    manager.save_session(session)
+
+    restored = MusicManager(library_path=path, autoplay=False)
+    restored.load_session(session)
+    song = restored.song_library[3]
+    # The library file's upvotes are unchanged; the room's votes come on top of them.
+    assert song.upvotes == 5
+    assert restored.room.library_upvotes(song) == 7
+    restored.commands.party("Song 3")
+    assert restored.party_queue.upvotes("Song 3") == 7
+
+
+def test_window_votes_are_saved_with_the_time_they_were_cast(tmp_path, monkeypatch):
+    import time
+    wall = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: wall[0])
+    now = [0.0]
+    manager = MusicManager(autoplay=False, party_options={"window": 30})
+    manager.party_queue.clock = lambda: now[0]
+    manager.commands.party("1")
+    title = manager.song_library[0].title
+    manager.commands.upvote(title, 5)
+    now[0], wall[0] = 20.0, 1020.0
+    session = os.path.join(tmp_path, "session.bin")
+    manager.save_session(session)
+
+    # The restored queue's clock starts somewhere else; the votes still expire 30 seconds after being cast.
+    restored_now = [500.0]
+    restored = MusicManager(autoplay=False, party_options={"window": 30})
+    restored.party_queue.clock = lambda: restored_now[0]
+    restored.load_session(session)
+    restored_now[0] = 509.0
+    assert restored.party_queue.upvotes(title) == 5
+    restored_now[0] = 511.0
+    assert restored.party_queue.upvotes(title) == 0
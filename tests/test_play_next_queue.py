@@ -0,0 +1,53 @@
+from playlist_manager.app import MusicManager
+from playlist_manager.play_next_queue import PlayNextQueue
+from playlist_manager.song import Song
+
+
+def titles(queue):
+    return [song.title for song in queue]
+
+
+def test_remove_and_move_pick_the_frontmost_duplicate():
+    queue = PlayNextQueue()
+    a, b, c = Song("A", "x"), Song("B", "x"), Song("C", "x")
+    queue.enqueue(a)
+    queue.enqueue(b)
+    queue.enqueue(Song("a", "y"))
+    # Move the first "A" behind its duplicate: the index now lists them out of queue order.
+    queue.move("A", 3)
+    assert [(song.title, song.artist) for song in queue] == [("B", "x"), ("a", "y"), ("A", "x")]
+    queue.enqueue(c)
+    assert queue.remove("a")
+    assert [(song.title, song.artist) for song in queue] == [("B", "x"), ("A", "x"), ("C", "x")]
+    assert queue.move("c", 0)
+    assert titles(queue) == ["C", "B", "A"]
+    assert not queue.remove("missing")
+
+
+def test_insert_from_either_end():
+    queue = PlayNextQueue()
+    for title in "ABCDE":
+        queue.enqueue(Song(title, ""))
+    queue.insert(1, Song("x", ""))
+    queue.insert(5, Song("y", ""))
+    queue.insert(99, Song("z", ""))
+    queue.insert(-3, Song("w", ""))
+    assert titles(queue) == ["w", "A", "x", "B", "C", "D", "y", "E", "z"]
+    assert queue.tail.song.title == "z" and queue.head.prev is None
+
+
+def test_queue_commands():
+    manager = MusicManager(autoplay=False)
+    commands = manager.commands
+    first, second, third = (manager.song_library[i].title for i in range(3))
+    assert commands.enqueue("1").ok
+    assert commands.enqueue("2").ok
+    result = commands.execute(f"insert 1 {third}")
+    assert result.ok and result.data["position"] == 1
+    assert titles(manager.play_next_queue) == [third, first, second]
+    assert commands.execute(f'move "{third}" 9').data["position"] == 3
+    assert titles(manager.play_next_queue) == [first, second, third]
+    assert commands.execute(f"unqueue {first}").ok
+    assert titles(manager.play_next_queue) == [second, third]
+    assert not commands.unqueue(first).ok
+    assert not commands.insert(0, "1").ok
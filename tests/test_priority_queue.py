@@ -0,0 +1,93 @@
+import random
+
+from playlist_manager.priority_queue import PartyModeQueue
+from playlist_manager.song import Song
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def check_heap(queue):
+    """Checks the heap order and that every recorded position points at its song."""
+    entries = queue.queue
+    for index in range(1, len(entries)):
+        assert not entries[index] < entries[(index - 1) // 2]
+    assert len(queue.position) == len(entries) == len(queue.song_map)
+    for title, index in queue.position.items():
+        assert entries[index][2].title == title
+
+
+def test_random_operations_keep_the_heap_and_index_valid():
+    rng = random.Random(1)
+    queue = PartyModeQueue(verbose=False)
+    songs = [Song(f"Song {i}", "Artist") for i in range(200)]
+    for song in songs[:100]:
+        queue.enqueue(song, rng.randrange(5))
+    for step in range(2000):
+        action = rng.random()
+        if action < 0.7:
+            queue.upvote_song(rng.choice(songs).title, rng.randint(1, 3))
+        elif action < 0.85:
+            queue.enqueue(rng.choice(songs))
+        elif action < 0.93:
+            song = rng.choice(songs)
+            queued = song.title in queue.song_map
+            assert (queue.remove(song.title) is song) == queued
+        else:
+            queue.dequeue()
+        check_heap(queue)
+
+
+def test_dequeue_plays_most_upvoted_first_and_ties_in_order():
+    queue = PartyModeQueue(verbose=False)
+    for title in ["A", "B", "C"]:
+        queue.enqueue(Song(title, "Artist"))
+    queue.upvote_song("B", 2)
+    assert [queue.dequeue().title for _ in range(3)] == ["B", "A", "C"]
+    assert queue.dequeue() is None
+
+
+def test_top_matches_full_sort():
+    rng = random.Random(2)
+    queue = PartyModeQueue(verbose=False)
+    for i in range(300):
+        queue.enqueue(Song(f"Song {i}", "Artist"), rng.randrange(50))
+    everything = queue.ranked()
+    for k in [0, 1, 7, 50, 300, 400]:
+        assert list(queue.top(k)) == everything[:k]
+
+
+def test_half_life_starts_new_songs_at_their_decayed_score():
+    clock = FakeClock()
+    queue = PartyModeQueue(verbose=False, half_life=10, clock=clock)
+    queue.enqueue(Song("Old", "Artist"), 8)
+    clock.now = 10
+    queue.enqueue(Song("New", "Artist"), 3)
+    queue.enqueue(Song("Quiet", "Artist"), 0)
+    assert queue.upvotes("Old") == 4
+    assert queue.upvotes("New") == 3
+    assert queue.upvotes("Quiet") == 0
+    assert all(abs(entry[0]) < 2000 for entry in queue.queue)
+    assert [song.title for song, score in queue.ranked()] == ["Old", "New", "Quiet"]
+    queue.upvote_song("Quiet", 5)
+    assert queue.upvotes("Quiet") == 5
+    check_heap(queue)
+
+
+def test_window_only_counts_recent_votes():
+    clock = FakeClock()
+    queue = PartyModeQueue(verbose=False, window=60, clock=clock)
+    queue.enqueue(Song("A", "Artist"))
+    queue.enqueue(Song("B", "Artist"))
+    queue.upvote_song("A", 5)
+    clock.now = 30
+    queue.upvote_song("B", 2)
+    clock.now = 61
+    assert queue.upvotes("A") == 0
+    assert queue.upvotes("B") == 2
+    assert queue.dequeue().title == "B"
@@ -0,0 +1,76 @@
+from playlist_manager.app import MusicManager
+from playlist_manager.doubly_linked_list import DoublyLinkedList
+from playlist_manager.recommend import AutoplaySource, Recommender
+from playlist_manager.song import Song
+from playlist_manager.stack import PlaybackHistory
+
+
+def make_recommender(songs):
+    by_key = {(song.title, song.artist): song for song in songs}
+    return Recommender(lambda title, artist: by_key.get((title, artist)))
+
+
+def test_suggestions_follow_plays_and_votes():
+    a, b, c = songs = [Song("A", "Artist"), Song("B", "Artist"), Song("C", "Artist")]
+    recommender = make_recommender(songs)
+    recommender.learn_history([a, b, c, a, b])
+    # A was followed by B twice, and by C once with a song in between.
+    assert recommender.suggest(a) == [b, c]
+    recommender.observe_vote(c, 4, playing=a)
+    assert recommender.suggest(a) == [c, b]
+    assert recommender.suggest(a, exclude={"C"}) == [b]
+    # A and B were played twice each, and A first.
+    assert recommender.popular(1) == [a]
+    assert recommender.popular(2, exclude={"A"}) == [b, c]
+
+
+def test_suggestions_are_the_library_songs():
+    stay, love = library = [Song("Stay", "Blackpink"), Song("Love", "Wave to Earth")]
+    recommender = make_recommender(library)
+    # Plays read back from the history log are copies of the library's songs.
+    recommender.observe_play(stay, [Song("Love", "Wave to Earth")])
+    recommender.observe_play(love, [stay])
+    assert recommender.suggest(stay)[0] is love
+    # A song the library doesn't have is never suggested.
+    recommender.observe_play(Song("Gone", "Nobody"), [stay])
+    assert [song.title for song in recommender.suggest(stay)] == ["Love"]
+    assert "Gone" not in [song.title for song in recommender.popular(5)]
+
+
+def test_autoplay_adds_a_suggestion_that_is_not_in_the_playlist_or_recent():
+    a, b, c, d = songs = [Song(title, "Artist") for title in "ABCD"]
+    recommender = make_recommender(songs)
+    recommender.learn_history([a, b, a, c, a, d])
+    playlist = DoublyLinkedList()
+    playlist.add_song(a)
+    history = PlaybackHistory()
+    history.push(b)
+    history.push(a)
+    autoplay = AutoplaySource("autoplay", recommender, playlist, history, avoid_recent=2)
+    # After A, B is excluded as a recent play, so C (tied with B and D, but seen first) comes next.
+    assert autoplay.peek(3) == [c]
+    assert not autoplay.is_empty()
+    assert autoplay.take() is c
+    assert playlist.tail.song is c and playlist.current is playlist.tail
+    playlist.add_song(d)
+    playlist.add_song(b)
+    assert autoplay.take() is None
+    assert autoplay.is_empty()
+
+
+def test_autoplay_after_a_restart_with_a_history_log_plays_library_songs(tmp_path):
+    with open(tmp_path / "history-00000001.log", "w", encoding="utf-8") as f:
+        f.write('[1.0, "Love", "Wave to Earth"]\n')
+    manager = MusicManager(history_dir=str(tmp_path))
+    manager.scheduler.fallback.avoid_recent = 1
+    love = manager.find_song("Love")
+    manager.commands.add("Stay")
+    manager.commands.enqueue("Love")
+    manager.commands.next()
+    manager.commands.enqueue("Dynamite")
+    manager.commands.next()
+    result = manager.commands.next()
+    assert result.data["source"] == "autoplay" and result.data["title"] == "Love"
+    assert manager.playlist.tail.song is love
+    manager.save_session(str(tmp_path / "session.bin"))
+    manager.end_session()
@@ -0,0 +1,74 @@
+import pytest
+
+from playlist_manager.app import MusicManager, main, parse_weights
+from playlist_manager.play_next_queue import PlayNextQueue
+from playlist_manager.scheduler import PlaybackScheduler, QueueSource
+from playlist_manager.song import Song
+
+
+def queue_source(name, count):
+    queue = PlayNextQueue()
+    for i in range(count):
+        queue.enqueue(Song(f"{name} {i}", ""))
+    return QueueSource(name, queue)
+
+
+def test_weights_interleave_sources_and_missing_ones_count_as_1():
+    scheduler = PlaybackScheduler([queue_source("a", 10), queue_source("b", 10), queue_source("c", 10)],
+                                  weights={"a": 2, "c": 0})
+    picks = [scheduler.next()[1] for _ in range(6)]
+    assert picks == ["a", "b", "a", "a", "b", "a"]
+    assert [(song.title, source) for song, source in scheduler.upcoming(3)] == [("a 4", "a"), ("b 2", "b"), ("a 5", "a")]
+    # "c" has a weight of 0, so it only plays once the others are empty.
+    rest = [scheduler.next()[1] for _ in range(25)]
+    assert "c" not in rest[:14]
+    assert rest[14:24] == ["c"] * 10
+    assert rest[24] is None
+
+
+def test_weight_0_party_queue_still_plays_when_the_playlist_ends():
+    manager = MusicManager(weights={"party": 0}, autoplay=False)
+    manager.add_initial_songs()
+    manager.commands.party("5")
+    titles = [manager.commands.next().data["title"] for _ in range(3)]
+    assert titles == [manager.song_library[1].title, manager.song_library[2].title, manager.song_library[4].title]
+    assert not manager.commands.next().ok
+
+
+def test_parse_weights():
+    assert parse_weights("party=1, playlist = 3") == {"party": 1, "playlist": 3}
+    for text in ["party=x", "party", "partty=1", "playlist=-1"]:
+        with pytest.raises(ValueError):
+            parse_weights(text)
+
+
+def test_bad_weights_are_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--weights", "party=lots"])
+    assert exit_info.value.code == 2
+    assert "--weights" in capsys.readouterr().err
+
+
+def test_history_lists_every_song_as_it_starts():
+    manager = MusicManager(autoplay=False)
+    manager.add_initial_songs()
+    first, second, third = (manager.song_library[i] for i in range(3))
+    manager.commands.enqueue("5")
+    for _ in range(3):
+        manager.commands.next()
+    # The first song was current before anything was picked, and the queued song is recorded too.
+    assert [song.title for song in manager.history] == [first.title, manager.song_library[4].title,
+                                                          second.title, third.title]
+    assert not manager.commands.next().ok
+    assert len(manager.history) == 4
+
+
+def test_first_song_is_recorded_when_older_plays_are_logged_on_disk(tmp_path):
+    with open(tmp_path / "history-00000001.log", "w", encoding="utf-8") as f:
+        f.write('[1.0, "Old Song", "Old Artist"]\n')
+    manager = MusicManager(history_dir=str(tmp_path), autoplay=False)
+    manager.add_initial_songs()
+    manager.commands.next()
+    assert [song.title for timestamp, song in manager.history.last(3)] == [
+        manager.song_library[1].title, manager.song_library[0].title, "Old Song"]
+    manager.history.close()
@@ -0,0 +1,76 @@
+import os
+
+from playlist_manager.app import MusicManager
+from playlist_manager.persistence import LibraryFile, save_library
+from playlist_manager.search import PrefixTrie, SongSearch, TrigramIndex
+from playlist_manager.song import Song
+
+
+def test_trie_bursts_full_buckets_and_completes_in_key_order():
+    trie = PrefixTrie(bucket_size=4)
+    keys = [f"song {i:02d}" for i in range(30)] + ["solo", "stay", "s"]
+    for song_id, key in enumerate(keys):
+        trie.add(key, song_id)
+    # The root bucket burst, so keys now live in child nodes.
+    assert "" in trie.root
+    assert [keys[i] for i in trie.complete("song 1", limit=3)] == ["song 10", "song 11", "song 12"]
+    assert [keys[i] for i in trie.complete("s", limit=3)] == ["s", "solo", "song 00"]
+    assert trie.complete("song 29", limit=5) == [29]
+    assert trie.complete("x") == []
+
+
+def test_trigram_candidates_use_the_shortest_posting_list():
+    grams = TrigramIndex()
+    for song_id, key in enumerate(["golden river", "silver river", "golden hour"]):
+        grams.add(key, song_id)
+    assert list(grams.candidates("river")) == [0, 1]
+    # "n h" is only in "golden hour", so that is the only candidate.
+    assert list(grams.candidates("golden h")) == [2]
+    assert list(grams.candidates("ocean")) == []
+    counts, total = grams.overlap("golden rivr")
+    assert counts.most_common(1)[0][0] == 0
+
+
+def test_search_finds_exact_prefix_substring_and_fuzzy_matches():
+    songs = [Song("Stay", "Rihanna"), Song("Stayin' Alive", "Bee Gees"), Song("Love Story", "Taylor Swift"),
+             Song("stay", "Other Artist")]
+    search = SongSearch(songs)
+    search.update()
+    assert search.find("STAY") is songs[0]
+    assert search.find_all("stay") == [songs[0], songs[3]]
+    assert search.search("stay") == [songs[0], songs[3], songs[1]]
+    assert search.substring("story") == [songs[2]]
+    assert search.fuzzy("Lvoe Story")[0] is songs[2]
+
+    songs.append(Song("Stay Gold", "First Aid Kit"))
+    search.update()
+    assert len(search) == 5
+    assert songs[4] in search.autocomplete("stay g")
+
+
+def test_indexing_a_library_file_does_not_load_its_songs(tmp_path):
+    path = os.path.join(tmp_path, "library.bin")
+    save_library(path, [Song(f"Title {i}", f"Artist {i % 7}") for i in range(500)])
+    library = LibraryFile(path)
+    search = SongSearch(library)
+    search.update()
+    assert library.songs == {}
+    song = search.find("title 5")
+    assert song is library[5]
+    # Only the song that was returned has been read from the file, and an exact lookup
+    # doesn't need the trie or trigram index.
+    assert sorted(library.songs) == [5]
+    assert search.text_indexed == 0
+    assert search.substring("title 49")[0].title == "Title 49"
+    assert search.text_indexed == 500
+    library.close()
+
+
+def test_manager_rebuilds_the_index_when_the_library_is_replaced(tmp_path):
+    path = os.path.join(tmp_path, "library.bin")
+    save_library(path, [Song("Only In The File", "Someone")])
+    manager = MusicManager(autoplay=False)
+    assert manager.find_song("Only In The File") is None
+    manager.song_library = LibraryFile(path)
+    assert manager.find_song("only in the file").artist == "Someone"
+    manager.song_library.close()
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from playlist_manager.app import MusicManager
+from playlist_manager.doubly_linked_list import DoublyLinkedList
+from playlist_manager.song import Song
+
+
+def make_playlist(count):
+    playlist = DoublyLinkedList()
+    playlist.add_songs([Song(f"Song {i}", "Artist") for i in range(count)])
+    return playlist
+
+
+def titles(playlist):
+    return [node.song.title for node in playlist._nodes()]
+
+
+def test_shuffle_keeps_every_song_and_the_links():
+    playlist = make_playlist(50)
+    before = sorted(titles(playlist))
+    playlist.shuffle(seed=3)
+    assert sorted(titles(playlist)) == before
+    node = playlist.tail
+    backwards = []
+    while node:
+        backwards.append(node.song.title)
+        node = node.prev
+    assert backwards[::-1] == titles(playlist)
+    assert playlist.current is playlist.head
+
+
+def test_shuffle_is_uniform():
+    # Every one of the 6 orders of 3 songs should come up about equally often.
+    counts = Counter()
+    for seed in range(6000):
+        playlist = make_playlist(3)
+        playlist.shuffle(seed)
+        counts[tuple(titles(playlist))] += 1
+    assert len(counts) == 6
+    assert all(800 < count < 1200 for count in counts.values())
+
+
+def test_shuffle_on_demand_is_uniform_and_leaves_the_playlist_alone():
+    playlist = make_playlist(3)
+    counts = Counter(tuple(song.title for song in playlist.shuffle_on_demand(seed)) for seed in range(6000))
+    assert len(counts) == 6
+    assert all(800 < count < 1200 for count in counts.values())
+    assert titles(playlist) == ["Song 0", "Song 1", "Song 2"]
+
+
+def test_lazy_shuffle_command_plays_every_song_once_then_continues():
+    manager = MusicManager(autoplay=False)
+    manager.song_library = [Song(f"Song {i}", "Artist") for i in range(10)]
+    for song in manager.song_library:
+        manager.commands.add(song)
+    assert manager.commands.execute("shuffle --lazy 7").ok
+    played = [manager.commands.next().data["title"] for _ in range(9)]
+    assert sorted(played + ["Song 0"]) == sorted(song.title for song in manager.song_library)
+    assert played != [f"Song {i}" for i in range(1, 10)]
+    assert titles(manager.playlist) == [f"Song {i}" for i in range(10)]
+    assert manager.scheduler.upcoming(3) == []
+
+
+def test_lazy_shuffle_skips_removed_songs():
+    manager = MusicManager(autoplay=False)
+    manager.song_library = [Song(f"Song {i}", "Artist") for i in range(6)]
+    for song in manager.song_library:
+        manager.commands.add(song)
+    manager.commands.shuffle("--lazy", 1)
+    manager.commands.remove("Song 3")
+    played = [manager.commands.next().data["title"] for _ in range(4)]
+    assert "Song 3" not in played
+    assert len(set(played)) == 4